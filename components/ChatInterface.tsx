@@ -16,6 +16,7 @@ interface Manual {
   brand?: string | null;
   model?: string | null;
   year?: string | null;
+  serving?: boolean;
 }
 
 interface ManualListResponse {
@@ -96,7 +97,7 @@ export default function ChatInterface() {
     fetchManuals();
   }, [fetchManuals]);
 
-  const readyManuals = useMemo(() => manuals.filter((manual) => manual.status === "ready"), [manuals]);
+  const readyManuals = useMemo(() => manuals.filter((manual) => manual.status === "ready" || manual.serving), [manuals]);
 
   useEffect(() => {
     const manual = readyManuals.find((item) => item.manual_id === selectedManualId);
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Generic, List, Optional, Sequence, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class EncodingCancelledError(Exception):
+    """Raised by :func:`encode_in_buckets` when its cancel callback fires between batches."""
+
+
+def encode_in_buckets(
+    encode_fn: Callable[[List[T]], Sequence[R]],
+    items: Sequence[T],
+    *,
+    batch_size: int = 32,
+    length_fn: Optional[Callable[[Sequence[T]], Sequence[int]]] = None,
+    cancel_callback: Optional[Callable[[], bool]] = None,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+) -> List[R]:
+    """Encode ``items`` in length-sorted batches and return results in the original order.
+
+    Sorting by length (``length_fn`` returns one length per item, default
+    ``len``) groups similar-length inputs so batches carry little padding.
+    Cancellation is checked before each batch and progress is reported after it.
+    """
+    total = len(items)
+    lengths = list(length_fn(items)) if length_fn is not None else [len(item) for item in items]  # type: ignore[arg-type]
+    order = sorted(range(total), key=lambda index: lengths[index])
+    results: List[Optional[R]] = [None] * total
+    batch_size = max(1, batch_size)
+    for start in range(0, total, batch_size):
+        if cancel_callback is not None and cancel_callback():
+            raise EncodingCancelledError(f"Encoding cancelled after {start} of {total} items.")
+        indices = order[start:start + batch_size]
+        outputs = encode_fn([items[index] for index in indices])
+        for index, output in zip(indices, outputs):
+            results[index] = output
+        if progress_callback is not None:
+            progress_callback(min(start + batch_size, total), total)
+    return results  # type: ignore[return-value]
+
+
+class MicroBatcher(Generic[T, R]):
+    """Coalesces concurrent single-item calls into batched calls of ``batch_fn``.
+
+    The first request to arrive opens a batch; it is flushed once ``max_batch``
+    items are waiting or ``max_wait_ms`` has elapsed, whichever comes first.
+    ``batch_fn`` receives the items in arrival order and must return one result
+    per item. An exception fails every request in that batch.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[T]], Sequence[R]],
+        *,
+        max_batch: int = 32,
+        max_wait_ms: float = 5.0,
+        name: str = "micro-batcher",
+    ) -> None:
+        self._batch_fn = batch_fn
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.name = name
+        self._cond = threading.Condition()
+        self._pending: List[Tuple[T, Future]] = []
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, item: T) -> "Future[R]":
+        future: Future = Future()
+        with self._cond:
+            self._pending.append((item, future))
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return future
+
+    def __call__(self, item: T, timeout: Optional[float] = None) -> R:
+        return self.submit(item).result(timeout)
+
+    def _next_batch(self) -> List[Tuple[T, Future]]:
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+            deadline = time.monotonic() + self.max_wait
+            while len(self._pending) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch = self._pending[: self.max_batch]
+            del self._pending[: self.max_batch]
+        return batch
+
+    def _loop(self) -> None:
+        while True:
+            batch = self._next_batch()
+            batch = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                results = list(self._batch_fn([item for item, _ in batch]))
+                if len(results) != len(batch):
+                    raise RuntimeError(f"{self.name}: batch function returned {len(results)} results for {len(batch)} items")
+            except Exception as exc:
+                logger.debug("%s: batch of %s failed: %s", self.name, len(batch), exc)
+                for _, future in batch:
+                    future.set_exception(exc)
+                continue
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
@@ -0,0 +1,72 @@
+"""
+Import-time benchmark for the ingestion modules.
+
+Runs ``python -X importtime -c "import <module>"`` in a fresh interpreter,
+reports the slowest imports and fails when the total exceeds a budget or
+when a module that should only load lazily (NLTK, unstructured) shows up.
+
+Usage:
+    python bench_import_time.py                      # document_loader, 1500 ms budget
+    python bench_import_time.py --module main --budget-ms 3000
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import List, Tuple
+
+LAZY_MODULES = ("nltk", "unstructured", "langchain_text_splitters")
+
+
+def measure(module: str) -> List[Tuple[int, int, str]]:
+    """Return (self_us, cumulative_us, name) rows reported by -X importtime."""
+    env = dict(os.environ, MANUALAI_OFFLINE="1")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=Path(__file__).parent,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="document_loader")
+    parser.add_argument("--budget-ms", type=float, default=1500.0)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    rows = measure(args.module)
+    total_ms = next((cum for _, cum, name in rows if name.strip() == args.module), 0) / 1000
+    print(f"import {args.module}: {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    print(f"{'cumulative ms':>14}  module")
+    for _, cumulative, name in sorted(rows, key=lambda row: row[1], reverse=True)[: args.top]:
+        print(f"{cumulative / 1000:>14.1f}  {name}")
+
+    eager = sorted({name.strip() for _, _, name in rows if name.strip().split(".")[0] in LAZY_MODULES})
+    failed = False
+    if eager:
+        print(f"\n❌ Lazily-loaded modules imported eagerly: {', '.join(eager[:10])}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"\n❌ Import time {total_ms:.0f} ms exceeds budget {args.budget_ms:.0f} ms")
+        failed = True
+    if not failed:
+        print("\n✅ Import time within budget")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""
+Inference backend benchmark: torch vs ONNX vs int8-quantized ONNX.
+
+For each backend this loads the embedding models (and the ms-marco
+cross-encoder) via inference_backend and reports:
+  - load time
+  - encode throughput over the manual's chunks
+  - single-query latency
+  - retrieval accuracy on data/evaluation_set.json (predicted page == correct page)
+
+Usage:
+    python bench_inference_backends.py
+    python bench_inference_backends.py --backends torch,onnx-int8 --models all-MiniLM-L6-v2 --no-rerank
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from inference_backend import load_cross_encoder, load_sentence_transformer
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+EVAL_SET_PATH = DATA_DIR / "evaluation_set.json"
+RERANKER_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+CHUNK_CHARS = 1000
+RERANK_CANDIDATES = 16
+
+
+def load_chunks(pdf_path: Path) -> List[Tuple[str, int]]:
+    """(text, 1-based page number) chunks of roughly CHUNK_CHARS characters."""
+    import fitz  # type: ignore
+
+    chunks: List[Tuple[str, int]] = []
+    with fitz.open(pdf_path) as pdf:
+        for index, page in enumerate(pdf, start=1):
+            text = " ".join(page.get_text("text").split())
+            for start in range(0, len(text), CHUNK_CHARS):
+                piece = text[start:start + CHUNK_CHARS]
+                if len(piece) > 50:
+                    chunks.append((piece, index))
+    return chunks
+
+
+def bench_embedding(model_name: str, backend: str, chunks, questions) -> Tuple[Dict[str, float], np.ndarray, np.ndarray]:
+    started = time.perf_counter()
+    model = load_sentence_transformer(model_name, backend=backend)
+    load_s = time.perf_counter() - started
+
+    texts = [text for text, _ in chunks]
+    model.encode(texts[:32])  # warm-up
+    started = time.perf_counter()
+    chunk_vectors = model.encode(texts, batch_size=32, normalize_embeddings=True)
+    encode_s = time.perf_counter() - started
+
+    latencies = []
+    question_vectors = []
+    for item in questions:
+        started = time.perf_counter()
+        question_vectors.append(model.encode([item["question"]], normalize_embeddings=True)[0])
+        latencies.append(time.perf_counter() - started)
+
+    scores = np.asarray(question_vectors) @ np.asarray(chunk_vectors).T
+    ranked = np.argsort(-scores, axis=1)
+    pages = np.asarray([page for _, page in chunks])
+    expected = np.asarray([item["correct_page_number"] for item in questions])
+    result = {
+        "load_s": load_s,
+        "chunks_per_s": len(texts) / encode_s,
+        "query_p50_ms": statistics.median(latencies) * 1000,
+        "hit@1": float(np.mean(pages[ranked[:, 0]] == expected)),
+        "hit@5": float(np.mean([expected[i] in pages[ranked[i, :5]] for i in range(len(questions))])),
+    }
+    return result, ranked, pages
+
+
+def bench_rerank(backend: str, chunks, questions, ranked: np.ndarray, pages: np.ndarray) -> Dict[str, float]:
+    started = time.perf_counter()
+    model = load_cross_encoder(RERANKER_MODEL, 256, backend=backend)
+    load_s = time.perf_counter() - started
+
+    hits = 0
+    latencies = []
+    for i, item in enumerate(questions):
+        candidates = ranked[i, :RERANK_CANDIDATES]
+        pairs = [(item["question"], chunks[index][0]) for index in candidates]
+        started = time.perf_counter()
+        scores = model.predict(pairs, batch_size=len(pairs), show_progress_bar=False)
+        latencies.append(time.perf_counter() - started)
+        hits += int(pages[candidates[int(np.argmax(scores))]] == item["correct_page_number"])
+    return {"load_s": load_s, "rerank_p50_ms": statistics.median(latencies) * 1000, "hit@1": hits / len(questions)}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", default="torch,onnx,onnx-int8")
+    parser.add_argument("--models", default="all-MiniLM-L6-v2,all-mpnet-base-v2")
+    parser.add_argument("--no-rerank", action="store_true")
+    args = parser.parse_args()
+
+    evaluation = json.loads(EVAL_SET_PATH.read_text(encoding="utf-8"))
+    questions = evaluation["questions"]
+    pdf_path = DATA_DIR / evaluation["source_manual"]
+    if not pdf_path.exists():
+        print(f"❌ Manual not found: {pdf_path}")
+        return 1
+    chunks = load_chunks(pdf_path)
+    print(f"{len(chunks)} chunks from {pdf_path.name}, {len(questions)} questions\n")
+
+    print(f"{'model':<20} {'backend':<10} {'load s':>7} {'chunks/s':>9} {'query ms':>9} {'hit@1':>6} {'hit@5':>6}")
+    for model_name in args.models.split(","):
+        for backend in args.backends.split(","):
+            result, ranked, pages = bench_embedding(model_name, backend, chunks, questions)
+            print(
+                f"{model_name:<20} {backend:<10} {result['load_s']:>7.1f} {result['chunks_per_s']:>9.1f} "
+                f"{result['query_p50_ms']:>9.1f} {result['hit@1']:>6.0%} {result['hit@5']:>6.0%}"
+            )
+            if not args.no_rerank and model_name == args.models.split(",")[0]:
+                rerank = bench_rerank(backend, chunks, questions, ranked, pages)
+                print(
+                    f"{'  + rerank':<20} {backend:<10} {rerank['load_s']:>7.1f} {'':>9} "
+                    f"{rerank['rerank_p50_ms']:>9.1f} {rerank['hit@1']:>6.0%}"
+                )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+"""
+OCR backend throughput benchmark (pages per second).
+
+Renders pages of a PDF the same way ingestion does and runs every available
+OCR backend over them with the same worker count. The OCR cache is bypassed.
+Without a PDF, synthetic text pages are generated with Pillow.
+
+--adaptive instead compares the loader's adaptive OCR (low DPI, then high DPI
+for low-confidence pages) against a single fixed-DPI pass, reporting wall time
+and word recall against each page's vector text. Without --pdf it builds a PDF
+of known text in several font sizes so recall is always measurable.
+
+Usage:
+    python bench_ocr.py --pdf ../data/2023-Toyota-4runner-Manual.pdf --pages 40
+    python bench_ocr.py --synthetic 24 --workers 4 --backends batch,pytesseract
+    python bench_ocr.py --adaptive --pdf ../data/2023-Toyota-4runner-Manual.pdf --pages 40
+"""
+
+import argparse
+import io
+import os
+import re
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from ocr_engine import OCREngine, OCRResult, create_engine, is_better_ocr, select_for_rerender
+
+_LANG = os.getenv("MANUAL_OCR_LANG", "eng")
+_CONFIG = os.getenv("MANUAL_OCR_CONFIG", "--psm 6 --oem 1")
+_TIMEOUT = float(os.getenv("MANUAL_OCR_TIMEOUT", "12.0"))
+
+_SAMPLE = (
+    "WARNING: Do not drive with the brake system warning light on. "
+    "Check the tire pressure when the tires are cold. Recommended pressure 32 psi (220 kPa). "
+    "Engine oil capacity with filter 6.2 L (6.6 qt)."
+)
+
+
+def render_pdf(path: Path, pages: int, dpi: int) -> List[bytes]:
+    import fitz  # type: ignore
+
+    images = []
+    with fitz.open(path) as pdf:
+        step = max(1, pdf.page_count // pages)
+        for index in list(range(0, pdf.page_count, step))[:pages]:
+            zoom = dpi / 72
+            pix = pdf.load_page(index).get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY, alpha=False)
+            images.append(pix.tobytes("png"))
+    return images
+
+
+def synthetic_pages(count: int) -> List[bytes]:
+    from PIL import Image, ImageDraw  # type: ignore
+
+    images = []
+    for page in range(count):
+        img = Image.new("L", (1400, 1800), color=255)
+        draw = ImageDraw.Draw(img)
+        for line in range(40):
+            offset = (page + line) % len(_SAMPLE)
+            draw.text((60, 40 + line * 42), (_SAMPLE[offset:] + " " + _SAMPLE)[:90], fill=0)
+        buffer = io.BytesIO()
+        img.save(buffer, format="PNG")
+        images.append(buffer.getvalue())
+    return images
+
+
+def synthetic_pdf(count: int):
+    """Text pages at 7-11pt, the sizes where low-DPI renders start losing characters."""
+    import fitz  # type: ignore
+
+    pdf = fitz.open()
+    for page_number in range(count):
+        page = pdf.new_page()
+        size = 7 + page_number % 5
+        text = "\n".join((_SAMPLE[line % 40:] + " " + _SAMPLE)[:100] for line in range(int(700 / (size * 1.4))))
+        page.insert_textbox(fitz.Rect(36, 36, 576, 756), text, fontsize=size)
+    return pdf
+
+
+def word_recall(reference: str, text: str) -> Optional[float]:
+    """Share of the reference's words (with multiplicity) that the OCR text contains."""
+    expected = Counter(re.findall(r"[a-z0-9]+", reference.lower()))
+    if not expected:
+        return None
+    found = Counter(re.findall(r"[a-z0-9]+", text.lower()))
+    return sum(min(count, found[word]) for word, count in expected.items()) / sum(expected.values())
+
+
+def _render(pdf, indices: Sequence[int], dpi: int) -> List[bytes]:
+    import fitz  # type: ignore
+
+    zoom = dpi / 72
+    return [
+        pdf.load_page(index).get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY, alpha=False).tobytes("png")
+        for index in indices
+    ]
+
+
+def _recognize(engine: OCREngine, images: List[bytes], workers: int) -> Tuple[List[OCRResult], float]:
+    """OCR ``images`` in engine-sized groups; returns results and engine-seconds spent."""
+    groups = [images[i:i + engine.batch_size] for i in range(0, len(images), engine.batch_size)]
+
+    def timed(group: List[bytes]) -> Tuple[List[OCRResult], float]:
+        started = time.perf_counter()
+        return engine.recognize(group), time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        outputs = list(executor.map(timed, groups))
+    return [result for batch, _ in outputs for result in batch], sum(seconds for _, seconds in outputs)
+
+
+def compare_adaptive(engine: OCREngine, pdf, indices: List[int], workers: int, args: argparse.Namespace) -> None:
+    references = [pdf.load_page(index).get_text() for index in indices]
+
+    started = time.perf_counter()
+    fixed, _ = _recognize(engine, _render(pdf, indices, args.dpi), workers)
+    fixed_seconds = time.perf_counter() - started
+
+    # Same policy as document_loader._ocr_document_pages
+    started = time.perf_counter()
+    first, spent = _recognize(engine, _render(pdf, indices, args.low_dpi), workers)
+    by_page: Dict[int, OCRResult] = dict(zip(indices, first))
+    per_page = (args.high_dpi / args.low_dpi) ** 2 * spent / max(1, len(indices))
+    budget = args.cpu_budget - spent if args.cpu_budget > 0 else None
+    retry = select_for_rerender({page: result.confidence for page, result in by_page.items()}, args.min_confidence, budget, per_page)
+    if retry:
+        second, _ = _recognize(engine, _render(pdf, retry, args.high_dpi), workers)
+        for page, result in zip(retry, second):
+            current = by_page[page]
+            if is_better_ocr(result.text, result.confidence, current.text, current.confidence):
+                by_page[page] = result
+    adaptive_seconds = time.perf_counter() - started
+
+    def mean_recall(results: Sequence[OCRResult]) -> str:
+        scores = [score for score in map(word_recall, references, (r.text for r in results)) if score is not None]
+        return f"{sum(scores) / len(scores):.3f}" if scores else "n/a"
+
+    print(f"{'mode':<28} {'seconds':>9} {'recall':>8}")
+    print(f"{f'fixed {args.dpi}dpi':<28} {fixed_seconds:>9.1f} {mean_recall(fixed):>8}")
+    label = f"adaptive {args.low_dpi}->{args.high_dpi}dpi ({len(retry)} redone)"
+    print(f"{label:<28} {adaptive_seconds:>9.1f} {mean_recall([by_page[page] for page in indices]):>8}")
+
+
+def run_backend(name: str, images: List[bytes], workers: int) -> None:
+    engine = create_engine(_LANG, _CONFIG, _TIMEOUT, backend=name)
+    if engine is None:
+        print(f"{name:<12} unavailable")
+        return
+    groups = [images[i:i + engine.batch_size] for i in range(0, len(images), engine.batch_size)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        outputs = [result for batch in executor.map(engine.recognize, groups) for result in batch]
+    elapsed = time.perf_counter() - started
+    characters = sum(len(result.text.strip()) for result in outputs)
+    print(f"{name:<12} {len(images) / elapsed:>8.2f} {elapsed:>9.1f} {characters:>10}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdf", type=Path)
+    parser.add_argument("--pages", type=int, default=24)
+    parser.add_argument("--synthetic", type=int, default=0, help="number of generated pages instead of a PDF")
+    parser.add_argument("--dpi", type=int, default=int(os.getenv("MANUAL_OCR_DPI", "170")))
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--backends", default="tesserocr,batch,pytesseract")
+    parser.add_argument("--adaptive", action="store_true", help="compare adaptive OCR against one --dpi pass")
+    parser.add_argument("--low-dpi", type=int, default=int(os.getenv("MANUAL_OCR_LOW_DPI", "110")))
+    parser.add_argument("--high-dpi", type=int, default=int(os.getenv("MANUAL_OCR_HIGH_DPI", "300")))
+    parser.add_argument("--min-confidence", type=float, default=float(os.getenv("MANUAL_OCR_MIN_CONFIDENCE", "80")))
+    parser.add_argument("--cpu-budget", type=float, default=float(os.getenv("MANUAL_OCR_CPU_BUDGET", "0")))
+    args = parser.parse_args()
+
+    if args.adaptive:
+        import fitz  # type: ignore
+
+        engine = next(filter(None, (create_engine(_LANG, _CONFIG, _TIMEOUT, backend=name) for name in args.backends.split(","))), None)
+        if engine is None:
+            print("no OCR backend available")
+            return 1
+        pdf = fitz.open(args.pdf) if args.pdf else synthetic_pdf(args.synthetic or args.pages)
+        step = max(1, pdf.page_count // args.pages)
+        indices = list(range(0, pdf.page_count, step))[:args.pages]
+        print(f"{len(indices)} pages, {args.workers} workers, backend {engine.name}\n")
+        compare_adaptive(engine, pdf, indices, args.workers, args)
+        return 0
+
+    if args.pdf:
+        images = render_pdf(args.pdf, args.pages, args.dpi)
+    else:
+        images = synthetic_pages(args.synthetic or args.pages)
+    print(f"{len(images)} pages, {args.workers} workers\n")
+    print(f"{'backend':<12} {'pages/s':>8} {'seconds':>9} {'characters':>10}")
+    for name in args.backends.split(","):
+        run_backend(name, images, args.workers)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
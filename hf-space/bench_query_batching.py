@@ -0,0 +1,114 @@
+"""
+Query-embedding micro-batching benchmark.
+
+Runs closed-loop clients at increasing concurrency. Each client embeds one
+query at a time, either directly (batch size 1) or through the MicroBatcher
+used by vector_store. The benchmark reports throughput and p50/p99 latency.
+
+Usage:
+    python bench_query_batching.py                         # real embedding model
+    python bench_query_batching.py --synthetic             # simulated model, no downloads
+    python bench_query_batching.py --max-batch 16 --max-wait-ms 2 --concurrency 1,4,16,64
+"""
+
+import argparse
+import statistics
+import sys
+import threading
+import time
+from typing import Callable, Dict, List
+
+from batching import MicroBatcher
+
+QUERIES = [
+    "how do I reset the oil life indicator",
+    "what is the recommended tire pressure",
+    "where is the spare tire located",
+    "how do I pair my phone with bluetooth",
+    "what does the check engine light mean",
+    "how often should I replace the cabin air filter",
+]
+
+
+def synthetic_encoder(overhead_ms: float, per_item_ms: float) -> Callable[[List[str]], List[List[float]]]:
+    """Fixed per-call cost plus a small per-item cost, like a CPU forward pass."""
+
+    lock = threading.Lock()
+
+    def encode(texts: List[str]) -> List[List[float]]:
+        with lock:  # one forward pass at a time, as on a shared CPU
+            time.sleep((overhead_ms + per_item_ms * len(texts)) / 1000)
+        return [[float(len(text))] for text in texts]
+
+    return encode
+
+
+def model_encoder() -> Callable[[List[str]], List[List[float]]]:
+    from vector_store import _as_lists, _get_encoder
+
+    encoder = _get_encoder()
+    encoder.encode(QUERIES)
+    return lambda texts: _as_lists(encoder.encode(texts, batch_size=len(texts)))
+
+
+def run(embed_one: Callable[[str], object], concurrency: int, duration: float) -> Dict[str, float]:
+    latencies: List[float] = []
+    lock = threading.Lock()
+    stop = time.perf_counter() + duration
+
+    def client(index: int) -> None:
+        local: List[float] = []
+        i = index
+        while time.perf_counter() < stop:
+            started = time.perf_counter()
+            embed_one(QUERIES[i % len(QUERIES)])
+            local.append(time.perf_counter() - started)
+            i += 1
+        with lock:
+            latencies.extend(local)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "qps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--synthetic", action="store_true", help="simulate the model instead of loading it")
+    parser.add_argument("--overhead-ms", type=float, default=8.0, help="synthetic per-call cost")
+    parser.add_argument("--per-item-ms", type=float, default=0.5, help="synthetic per-item cost")
+    parser.add_argument("--max-batch", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=4.0)
+    parser.add_argument("--concurrency", default="1,2,4,8,16,32")
+    parser.add_argument("--duration", type=float, default=3.0, help="seconds per measurement")
+    args = parser.parse_args()
+
+    encode = synthetic_encoder(args.overhead_ms, args.per_item_ms) if args.synthetic else model_encoder()
+    batcher = MicroBatcher(encode, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+    modes = {
+        "unbatched": lambda text: encode([text])[0],
+        "batched": batcher,
+    }
+
+    print(f"max_batch={args.max_batch} max_wait_ms={args.max_wait_ms}")
+    print(f"{'clients':>7} {'mode':<10} {'qps':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for concurrency in [int(value) for value in args.concurrency.split(",")]:
+        for name, embed_one in modes.items():
+            result = run(embed_one, concurrency, args.duration)
+            print(f"{concurrency:>7} {name:<10} {result['qps']:>8.1f} {result['p50_ms']:>8.1f} {result['p99_ms']:>8.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""
+Memory-per-worker benchmark for the embedding serving modes.
+
+Starts N worker processes that each embed a query, then reads their
+proportional set size (PSS, shared pages split between the processes that map
+them) from /proc/<pid>/smaps_rollup. Modes:
+
+    local    every worker loads its own SentenceTransformer (the default setup)
+    prefork  a master loads the model and forks the workers (copy-on-write)
+    sidecar  workers call embedding_server.py over a Unix socket
+
+Only the embedding model is loaded. Workers started with MANUAL_RERANK on
+also hold their own cross-encoder, which the sidecar does not share.
+
+Usage:
+    python bench_worker_memory.py --workers 4
+    python bench_worker_memory.py --modes local,sidecar --workers 1,2,4
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+HERE = Path(__file__).parent
+
+# Each worker embeds one query, reports its pid and blocks until stdin closes.
+_WORKER = """
+import os, sys
+from vector_store import _get_encoder
+_get_encoder().encode(["how do I reset the oil life indicator"])
+print(os.getpid(), flush=True)
+sys.stdin.read()
+"""
+
+_PREFORK = """
+import os, sys
+from vector_store import _get_model
+model = _get_model()
+model.encode(["warm up"])
+for _ in range({workers}):
+    if os.fork() == 0:
+        model.encode(["how do I reset the oil life indicator"])
+        print(os.getpid(), flush=True)
+        sys.stdin.read()
+        os._exit(0)
+print(os.getpid(), flush=True)
+sys.stdin.read()
+"""
+
+
+def pss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/smaps_rollup", "r", encoding="ascii") as handle:
+        for line in handle:
+            if line.startswith("Pss:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def _spawn(code: str, env: Dict[str, str]) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-c", code],
+        cwd=HERE,
+        env=env,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+
+
+def _wait_for_socket(path: Path, process: subprocess.Popen, timeout: float = 300.0) -> None:
+    deadline = time.time() + timeout
+    while not path.exists():
+        if process.poll() is not None or time.time() > deadline:
+            raise SystemExit("Embedding sidecar failed to start")
+        time.sleep(0.2)
+
+
+def measure(mode: str, workers: int) -> Dict[str, float]:
+    """Return total PSS and the share attributable to the model host for one run."""
+    env = dict(os.environ)
+    env.pop("MANUAL_EMBEDDING_SOCKET", None)
+    processes: List[subprocess.Popen] = []
+    pids: List[int] = []
+    host_pids: List[int] = []
+    try:
+        if mode == "prefork":
+            master = _spawn(_PREFORK.format(workers=workers), env)
+            processes.append(master)
+            pids = [int(master.stdout.readline()) for _ in range(workers + 1)]
+            host_pids = [master.pid]
+            pids = [pid for pid in pids if pid != master.pid]
+        else:
+            if mode == "sidecar":
+                socket_path = Path(tempfile.mkdtemp()) / "embed.sock"
+                sidecar = subprocess.Popen(
+                    [sys.executable, "embedding_server.py", "--socket", str(socket_path)],
+                    cwd=HERE,
+                    env=env,
+                )
+                processes.append(sidecar)
+                _wait_for_socket(socket_path, sidecar)
+                host_pids = [sidecar.pid]
+                env["MANUAL_EMBEDDING_SOCKET"] = str(socket_path)
+            for _ in range(workers):
+                worker = _spawn(_WORKER, env)
+                processes.append(worker)
+                pids.append(int(worker.stdout.readline()))
+
+        worker_mb = sum(pss_mb(pid) for pid in pids)
+        host_mb = sum(pss_mb(pid) for pid in host_pids)
+        return {"workers": worker_mb, "host": host_mb, "total": worker_mb + host_mb}
+    finally:
+        for process in reversed(processes):
+            if process.stdin:
+                process.stdin.close()
+            process.terminate()
+            process.wait(timeout=30)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", default="local,prefork,sidecar")
+    parser.add_argument("--workers", default="1,4", help="comma-separated worker counts")
+    args = parser.parse_args()
+
+    if not Path("/proc/self/smaps_rollup").exists():
+        print("❌ /proc/<pid>/smaps_rollup is required (Linux 4.14+)")
+        return 1
+
+    counts = sorted({int(value) for value in args.workers.split(",")})
+    print(f"{'mode':<8} {'workers':>7} {'total MB':>9} {'host MB':>8} {'MB/extra worker':>16}")
+    for mode in args.modes.split(","):
+        baseline = None
+        for count in counts:
+            result = measure(mode, count)
+            marginal = "-"
+            if baseline is not None:
+                marginal = f"{(result['total'] - baseline[1]) / (count - baseline[0]):.1f}"
+            baseline = (count, result["total"])
+            print(f"{mode:<8} {count:>7} {result['total']:>9.1f} {result['host']:>8.1f} {marginal:>16}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
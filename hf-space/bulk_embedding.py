@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import logging
+import os
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from batching import encode_in_buckets
+
+logger = logging.getLogger(__name__)
+
+# Multi-process encoding for large embedding jobs (manual ingestion, experiment re-indexing).
+# Below MIN_CHUNKS the cost of spawning workers and loading the model in each outweighs the gain.
+BULK_EMBED_ENABLED = os.getenv("MANUAL_BULK_EMBED", "false").lower() in ("true", "1", "yes")
+BULK_EMBED_MIN_CHUNKS = int(os.getenv("MANUAL_BULK_EMBED_MIN_CHUNKS", "1500"))
+BULK_EMBED_PROCESSES = int(os.getenv("MANUAL_BULK_EMBED_PROCESSES", "0"))  # 0 = derived from cores
+# Items handed to the pool per round; cancellation and progress are checked between rounds.
+BULK_EMBED_ROUND = int(os.getenv("MANUAL_BULK_EMBED_ROUND", "1024"))
+
+_THREAD_ENV = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+
+def pool_layout(processes: int = BULK_EMBED_PROCESSES, cores: Optional[int] = None) -> Tuple[int, int]:
+    """(processes, torch threads per process) that together use each core once."""
+    cores = cores or os.cpu_count() or 1
+    if processes <= 0:
+        # Two-thread workers keep matmul kernels efficient while still spreading out.
+        processes = max(1, cores // 2)
+    processes = max(1, min(processes, cores))
+    return processes, max(1, cores // processes)
+
+
+@contextmanager
+def multi_process_pool(model, processes: int = BULK_EMBED_PROCESSES, cores: Optional[int] = None) -> Iterator[Dict[str, object]]:
+    """Start a SentenceTransformer encode pool whose workers each get a bounded thread count.
+
+    Workers are spawned processes and read the thread limits from the
+    environment at import time, so the variables are set only while they start.
+    """
+    processes, threads = pool_layout(processes, cores)
+    saved = {name: os.environ.get(name) for name in _THREAD_ENV}
+    os.environ.update({name: str(threads) for name in _THREAD_ENV})
+    try:
+        pool = model.start_multi_process_pool(target_devices=["cpu"] * processes)
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+    logger.info("Started embedding pool: %s processes x %s threads", processes, threads)
+    try:
+        yield pool
+    finally:
+        model.stop_multi_process_pool(pool)
+
+
+def _encode_in_process(model, texts, batch_size, length_fn, cancel_callback, progress_callback) -> List[List[float]]:
+    return encode_in_buckets(
+        lambda batch: model.encode(batch, batch_size=batch_size, show_progress_bar=False).tolist(),
+        texts,
+        batch_size=batch_size,
+        length_fn=length_fn,
+        cancel_callback=cancel_callback,
+        progress_callback=progress_callback,
+    )
+
+
+def encode_bulk(
+    model,
+    texts: Sequence[str],
+    *,
+    batch_size: int = 32,
+    processes: int = BULK_EMBED_PROCESSES,
+    cores: Optional[int] = None,
+    length_fn: Optional[Callable[[Sequence[str]], Sequence[int]]] = None,
+    cancel_callback: Optional[Callable[[], bool]] = None,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+) -> List[List[float]]:
+    """Embed ``texts`` with ``model`` across a process pool, in input order.
+
+    ``cores`` limits the pool (default: all cores); ``length_fn`` orders the
+    items as in :func:`encode_in_buckets`. Falls back to in-process encoding
+    for small inputs or when the pool can't start.
+
+    The pool is sized once, when it starts. Unlike in-process encoding it does
+    not shrink when chat traffic arrives mid-job, so the governor's serving
+    cores are only respected if they were already reserved when ``cores`` was
+    computed. Leave MANUAL_BULK_EMBED off where chat must stay responsive
+    during ingestion.
+    """
+    texts = list(texts)
+    if len(texts) < BULK_EMBED_MIN_CHUNKS or pool_layout(processes, cores)[0] < 2:
+        return _encode_in_process(model, texts, batch_size, length_fn, cancel_callback, progress_callback)
+    try:
+        with multi_process_pool(model, processes, cores) as pool:
+            return encode_in_buckets(
+                lambda batch: model.encode_multi_process(batch, pool, batch_size=batch_size).tolist(),
+                texts,
+                batch_size=BULK_EMBED_ROUND,
+                length_fn=length_fn,
+                cancel_callback=cancel_callback,
+                progress_callback=progress_callback,
+            )
+    except (AttributeError, OSError, RuntimeError) as exc:
+        logger.warning("Multi-process embedding unavailable, encoding in-process: %s", exc)
+        return _encode_in_process(model, texts, batch_size, length_fn, cancel_callback, progress_callback)
+
+
+def encode_chunks(
+    model,
+    texts: Sequence[str],
+    *,
+    batch_size: int = 32,
+    length_fn: Optional[Callable[[Sequence[str]], Sequence[int]]] = None,
+) -> List[List[float]]:
+    """Embed a whole index's chunks: :func:`encode_bulk` when MANUAL_BULK_EMBED is on, else in-process.
+
+    The entry point for scripts that re-index outside the app.
+    """
+    texts = list(texts)
+    if BULK_EMBED_ENABLED:
+        return encode_bulk(model, texts, batch_size=batch_size, length_fn=length_fn)
+    return _encode_in_process(model, texts, batch_size, length_fn, None, None)
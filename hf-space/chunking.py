@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import bisect
+import os
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
+
+# Whole-manual chunker: chunks may cross page boundaries and carry their exact page span.
+PAGE_CHUNKER_ENABLED = os.getenv("MANUAL_PAGE_CHUNKER", "true").lower() in ("true", "1", "yes")
+CHUNK_SIZE = int(os.getenv("MANUAL_CHUNK_SIZE", "800"))
+CHUNK_OVERLAP = int(os.getenv("MANUAL_CHUNK_OVERLAP", "150"))
+SEPARATORS = ("\n\n", "\n", ". ", ", ", " ")
+
+
+@dataclass
+class Chunk:
+    text: str
+    start: int  # offsets into the concatenated manual
+    end: int
+    start_page: int
+    end_page: int
+
+
+class PageText:
+    """All pages concatenated once, with a sorted offset array for page lookups."""
+
+    def __init__(self, pages: Sequence[Tuple[int, str]], joiner: str = "\n") -> None:
+        parts: List[str] = []
+        self.offsets: List[int] = []
+        self.pages: List[int] = []
+        position = 0
+        for page_number, text in pages:
+            if parts:
+                parts.append(joiner)
+                position += len(joiner)
+            self.offsets.append(position)
+            self.pages.append(page_number)
+            parts.append(text)
+            position += len(text)
+        self.text = "".join(parts)
+
+    def page_at(self, offset: int) -> int:
+        return self.pages[max(0, bisect.bisect_right(self.offsets, offset) - 1)]
+
+
+def _cut(text: str, start: int, limit: int, min_size: int, separators: Sequence[str]) -> int:
+    """End offset for a chunk starting at ``start``: after the highest-priority separator in range."""
+    if limit >= len(text):
+        return len(text)
+    for separator in separators:
+        found = text.rfind(separator, start + min_size, limit)
+        if found != -1:
+            return found + len(separator)
+    return limit
+
+
+def chunk_pages(
+    pages: Sequence[Tuple[int, str]],
+    *,
+    chunk_size: int = CHUNK_SIZE,
+    chunk_overlap: int = CHUNK_OVERLAP,
+    separators: Sequence[str] = SEPARATORS,
+) -> List[Chunk]:
+    """Split ``(page_number, text)`` pages into overlapping chunks in one left-to-right pass.
+
+    Each cut is placed after the highest-priority separator in the back three
+    quarters of the window (or hard at ``chunk_size``), and the next chunk starts
+    ``chunk_overlap`` characters earlier, moved forward to a word boundary. Every
+    search is bounded by the window, so the pass is linear in the manual length.
+    """
+    if chunk_overlap >= chunk_size:
+        raise ValueError("chunk_overlap must be smaller than chunk_size")
+    manual = PageText(pages)
+    text = manual.text
+    min_size = chunk_size // 4
+    chunks: List[Chunk] = []
+    start = 0
+    while start < len(text):
+        end = _cut(text, start, start + chunk_size, min_size, separators)
+        piece = text[start:end]
+        stripped = piece.strip()
+        if stripped:
+            first = start + len(piece) - len(piece.lstrip())
+            last = first + len(stripped)
+            chunks.append(Chunk(stripped, first, last, manual.page_at(first), manual.page_at(last - 1)))
+        if end >= len(text):
+            break
+        next_start = end - chunk_overlap
+        space = text.find(" ", next_start, end)
+        next_start = space + 1 if space != -1 else next_start
+        start = max(next_start, start + 1)
+    return chunks
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import logging
+import os
+import random
+import re
+import zlib
+from typing import Any, Dict, FrozenSet, List, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Ingest-time near-duplicate collapsing (repeated safety boilerplate, overlapping chunks).
+INGEST_DEDUP_ENABLED = os.getenv("MANUAL_INGEST_DEDUP", "true").lower() in ("true", "1", "yes")
+DEDUP_THRESHOLD = float(os.getenv("MANUAL_DEDUP_THRESHOLD", "0.85"))  # Jaccard similarity of shingle sets
+
+_PRIME = (1 << 61) - 1
+# Permutation coefficients stay below 2**32 so a * x + b (x is a crc32) fits in uint64
+_MAX_COEFFICIENT = 1 << 32
+
+
+def shingles(text: str, k: int = 5) -> FrozenSet[int]:
+    """Hashed word ``k``-shingles of ``text`` (whole text as one shingle when shorter)."""
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    if len(words) < k:
+        return frozenset([zlib.crc32(" ".join(words).encode())]) if words else frozenset()
+    return frozenset(zlib.crc32(" ".join(words[i:i + k]).encode()) for i in range(len(words) - k + 1))
+
+
+def jaccard(a: FrozenSet[int], b: FrozenSet[int]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class MinHashLSH:
+    """MinHash signatures banded into LSH buckets.
+
+    Bands only propose candidate pairs; callers confirm them with the exact
+    Jaccard similarity, so the band layout trades recall for speed, not
+    precision. 8 bands of 4 rows find pairs at 0.8 similarity ~98% of the time.
+
+    Signatures are computed for all permutations in one numpy broadcast when
+    numpy is available (~0.15 s for 3000 chunks of 130 words, versus ~4 s in
+    pure Python); the pure-Python fallback computes the same values.
+    """
+
+    def __init__(self, num_perm: int = 32, bands: int = 8, seed: int = 1) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        rng = random.Random(seed)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._perms = [(rng.randrange(1, _MAX_COEFFICIENT), rng.randrange(0, _MAX_COEFFICIENT)) for _ in range(num_perm)]
+        self._buckets: Dict[tuple, List[int]] = {}
+        try:
+            import numpy as np
+        except ImportError:  # pragma: no cover - numpy ships with the embedding stack
+            self._np = None
+        else:
+            self._np = np
+            self._a = np.array([a for a, _ in self._perms], dtype=np.uint64)[:, None]
+            self._b = np.array([b for _, b in self._perms], dtype=np.uint64)[:, None]
+
+    def signature(self, hashed: FrozenSet[int]) -> List[int]:
+        if not hashed:
+            return [0] * len(self._perms)
+        if self._np is None:
+            return [min((a * value + b) % _PRIME for value in hashed) for a, b in self._perms]
+        values = self._np.fromiter(hashed, dtype=self._np.uint64, count=len(hashed))
+        return ((self._a * values + self._b) % self._np.uint64(_PRIME)).min(axis=1).tolist()
+
+    def _band_keys(self, signature: Sequence[int]) -> List[tuple]:
+        return [(band, *signature[band * self.rows:(band + 1) * self.rows]) for band in range(self.bands)]
+
+    def query(self, signature: Sequence[int]) -> List[int]:
+        """Keys sharing at least one band with ``signature``."""
+        return sorted({key for band in self._band_keys(signature) for key in self._buckets.get(band, ())})
+
+    def add(self, key: int, signature: Sequence[int]) -> None:
+        for band in self._band_keys(signature):
+            self._buckets.setdefault(band, []).append(key)
+
+
+def _pages(metadata: Dict[str, Any]) -> List[int]:
+    if not metadata.get("pages") and metadata.get("start_page") is not None and metadata.get("end_page") is not None:
+        return list(range(int(metadata["start_page"]), int(metadata["end_page"]) + 1))
+    raw = metadata.get("pages") or metadata.get("page") or metadata.get("page_number")
+    if raw is None:
+        return []
+    return [int(part) for part in str(raw).split(",") if part.strip().isdigit()]
+
+
+def collapse_near_duplicates(docs: Sequence[Any], threshold: float = DEDUP_THRESHOLD) -> List[Any]:
+    """Keep the first of each group of near-duplicate documents, in input order.
+
+    A kept document's metadata gains ``pages``: the sorted union of the page
+    references of every document it absorbed (comma-separated, so it stays a
+    valid vector-store metadata value), and ``duplicates``: how many it absorbed.
+    """
+    lsh = MinHashLSH()
+    kept: List[Any] = []
+    kept_shingles: List[FrozenSet[int]] = []
+    absorbed: Dict[int, List[Any]] = {}
+    for doc in docs:
+        hashed = shingles(getattr(doc, "page_content", ""))
+        signature = lsh.signature(hashed)
+        match = next(
+            (candidate for candidate in lsh.query(signature) if jaccard(hashed, kept_shingles[candidate]) >= threshold),
+            None,
+        )
+        if match is not None:
+            absorbed.setdefault(match, []).append(doc)
+            continue
+        lsh.add(len(kept), signature)
+        kept.append(doc)
+        kept_shingles.append(hashed)
+
+    for index, duplicates in absorbed.items():
+        metadata = kept[index].metadata
+        pages = sorted({page for item in (kept[index], *duplicates) for page in _pages(item.metadata)})
+        if pages:
+            metadata["pages"] = ",".join(str(page) for page in pages)
+        metadata["duplicates"] = len(duplicates)
+    if len(kept) < len(docs):
+        logger.info("Collapsed %s near-duplicate chunks (%s -> %s)", len(docs) - len(kept), len(docs), len(kept))
+    return kept
@@ -1,67 +1,31 @@
 from __future__ import annotations
 
-import io
 import hashlib
 import logging
 import os
 import re
+import sys
+import tempfile
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import types
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import lru_cache
 from pathlib import Path
+from threading import Lock
 from types import SimpleNamespace
-from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 from xml.etree import ElementTree as ET
 
-# CRITICAL: Prevent unstructured from downloading NLTK data to /nltk_data
-# unstructured.nlp.tokenize calls download_nltk_packages() at import time
-# We monkeypatch it to do nothing, then set up NLTK ourselves
-
-import tempfile
-_NLTK_DIR = Path(os.getenv("NLTK_DATA", tempfile.gettempdir() + "/manualai_nltk"))
-try:
-    _NLTK_DIR.mkdir(parents=True, exist_ok=True)
-except:
-    _NLTK_DIR = Path(tempfile.mkdtemp(prefix="manualai_nltk_"))
-
-os.environ["NLTK_DATA"] = str(_NLTK_DIR)
-
-# Import NLTK and set up paths
-import nltk
-import nltk.downloader
-nltk.data.path = [str(_NLTK_DIR)]
-
-# Download NLTK packages to our temp directory
-try:
-    nltk.download('punkt', download_dir=str(_NLTK_DIR), quiet=True)
-    nltk.download('averaged_perceptron_tagger_eng', download_dir=str(_NLTK_DIR), quiet=True)
-except Exception as e:
-    print(f"NLTK download to {_NLTK_DIR} failed: {e}")
-
-# Monkeypatch unstructured's download function to prevent it from trying
-import sys
-import types
-
-# Create fake module with ALL the functions unstructured needs
-unstructured_nlp = types.ModuleType('unstructured.nlp.tokenize')
-
-# No-op download function
-unstructured_nlp.download_nltk_packages = lambda: None
-
-# Provide the actual NLTK functions (from our configured NLTK)
-import nltk
-from nltk import pos_tag as _pos_tag, sent_tokenize as _sent_tokenize, word_tokenize as _word_tokenize
-unstructured_nlp.pos_tag = _pos_tag
-unstructured_nlp.sent_tokenize = _sent_tokenize
-unstructured_nlp.word_tokenize = _word_tokenize
-
-# Register BEFORE unstructured imports
-sys.modules['unstructured.nlp.tokenize'] = unstructured_nlp
-
 from langchain_core.documents import Document
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from unstructured.partition.auto import partition
-from unstructured.partition.pdf import partition_pdf
-from unstructured.partition.image import partition_image
+
+from chunking import CHUNK_OVERLAP, CHUNK_SIZE, PAGE_CHUNKER_ENABLED, SEPARATORS, chunk_pages
+from dedup import INGEST_DEDUP_ENABLED, collapse_near_duplicates
+from ocr_engine import OCRCancelledError, OCREngine, create_engine, is_better_ocr, novel_text, select_for_rerender, select_image_regions
+from page_analysis import classify_navigation_page, find_boilerplate, strip_boilerplate
+from page_model import PageModel, open_page_model
+from resource_governor import WorkBudget, governor
+from sections import Section, SectionIndex, extract_sections
+from warning_index import WarningIndex, message_context, page_messages
 
 
 logger = logging.getLogger(__name__)
@@ -81,7 +45,36 @@ _HTML_NS = {"html": "http://www.w3.org/1999/xhtml"}
 
 _MIN_FAST_TEXT = 100
 _MIN_PAGE_TEXT = 64
+# Drop running headers/footers/page numbers from per-page text before chunking
+_STRIP_BOILERPLATE = os.getenv("MANUAL_STRIP_BOILERPLATE", "true").lower() in ("true", "1", "yes")
+# Keep table-of-contents and alphabetical-index pages out of the index (they match every query lexically)
+_EXCLUDE_NAVIGATION_PAGES = os.getenv("MANUAL_EXCLUDE_NAVIGATION_PAGES", "true").lower() in ("true", "1", "yes")
+# hi_res (layout model) fallback: only pages still under _MIN_PAGE_TEXT after vector text and
+# OCR, a few pages per batch, stopping before a batch would overrun the wall/CPU budget (0 = unlimited).
+_HIRES_BATCH_PAGES = max(1, int(os.getenv("MANUAL_HIRES_BATCH_PAGES", "4")))
+_HIRES_TIME_BUDGET = float(os.getenv("MANUAL_HIRES_TIME_BUDGET", "180"))
+_HIRES_CPU_BUDGET = float(os.getenv("MANUAL_HIRES_CPU_BUDGET", "0"))
 _OCR_DPI = int(os.getenv("MANUAL_OCR_DPI", "170"))
+# Adaptive DPI: OCR everything at a low DPI first, then re-render only pages whose
+# mean word confidence is below the threshold at the high DPI, within a per-manual budget.
+# Opt-in: a low-confidence page costs a low- and a high-DPI pass, and pages that pass keep
+# lower-resolution text than the fixed MANUAL_OCR_DPI pass. Measure with bench_ocr.py --adaptive.
+_OCR_ADAPTIVE = os.getenv("MANUAL_OCR_ADAPTIVE", "false").lower() in ("true", "1", "yes")
+_OCR_LOW_DPI = int(os.getenv("MANUAL_OCR_LOW_DPI", "110"))
+_OCR_HIGH_DPI = int(os.getenv("MANUAL_OCR_HIGH_DPI", "300"))
+_OCR_MIN_CONFIDENCE = float(os.getenv("MANUAL_OCR_MIN_CONFIDENCE", "80"))
+_OCR_CPU_BUDGET = float(os.getenv("MANUAL_OCR_CPU_BUDGET", "0"))  # engine-seconds per manual, 0 = unlimited
+# Region OCR: on pages that already have vector text, OCR only embedded images
+# (diagrams, label photos) and append any text they contain that the page lacks.
+# Off by default: most images in owner's manuals are photos and icons, and the extra
+# renders cost more than the text they recover. Pages whose worthwhile images cover
+# less than MIN_COVERAGE of the page are skipped even when it is on.
+_OCR_REGIONS = os.getenv("MANUAL_OCR_REGIONS", "false").lower() in ("true", "1", "yes")
+_OCR_REGION_MIN_COVERAGE = float(os.getenv("MANUAL_OCR_REGION_MIN_COVERAGE", "0.1"))
+_OCR_REGION_DPI = int(os.getenv("MANUAL_OCR_REGION_DPI", "200"))
+_OCR_REGION_MIN_SIDE = float(os.getenv("MANUAL_OCR_REGION_MIN_SIDE", "48"))  # PDF points
+_OCR_REGION_MAX_PER_PAGE = int(os.getenv("MANUAL_OCR_REGION_MAX_PER_PAGE", "6"))
+_OCR_REGION_MIN_CONFIDENCE = float(os.getenv("MANUAL_OCR_REGION_MIN_CONFIDENCE", "60"))
 _OCR_MAX_WORKERS = max(1, min(int(os.getenv("MANUAL_OCR_WORKERS", str(os.cpu_count() or 1))), 6))
 
 # Lazy initialization of OCR cache dir to avoid permission errors at module import time
@@ -122,6 +115,67 @@ def _get_ocr_cache_dir():
 _OCR_TIMEOUT = float(os.getenv("MANUAL_OCR_TIMEOUT", "12.0"))
 _OCR_CONFIG = os.getenv("MANUAL_OCR_CONFIG", "--psm 6 --oem 1")
 
+# Offline mode: never reach the network for NLTK data (or HF models, see vector_store).
+_OFFLINE = os.getenv("MANUALAI_OFFLINE", os.getenv("HF_HUB_OFFLINE", "false")).lower() in ("true", "1", "yes")
+_NLTK_PACKAGES = (("punkt", "tokenizers/punkt"), ("averaged_perceptron_tagger_eng", "taggers/averaged_perceptron_tagger_eng"))
+
+
+def _prepare_nltk() -> None:
+    """Point NLTK at a writable data dir and make sure the packages unstructured needs are there."""
+    nltk_dir = Path(os.getenv("NLTK_DATA", tempfile.gettempdir() + "/manualai_nltk"))
+    try:
+        nltk_dir.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        nltk_dir = Path(tempfile.mkdtemp(prefix="manualai_nltk_"))
+    os.environ["NLTK_DATA"] = str(nltk_dir)
+
+    import nltk
+
+    nltk.data.path = [str(nltk_dir)]
+    for package, resource in _NLTK_PACKAGES:
+        try:
+            nltk.data.find(resource)
+            continue
+        except LookupError:
+            pass
+        if _OFFLINE:
+            logger.warning("NLTK package %s missing from %s and offline mode is on; skipping download", package, nltk_dir)
+            continue
+        try:
+            nltk.download(package, download_dir=str(nltk_dir), quiet=True)
+        except Exception as exc:
+            logger.warning("NLTK download of %s to %s failed: %s", package, nltk_dir, exc)
+
+
+@lru_cache(maxsize=1)
+def _unstructured() -> SimpleNamespace:
+    """Import the unstructured partitioners on first use.
+
+    The production PDF path only needs PyMuPDF, so the NLTK setup and the
+    unstructured/layout stack are loaded only when a file actually falls
+    through to partitioning.
+    """
+    start = time.perf_counter()
+    _prepare_nltk()
+
+    # unstructured.nlp.tokenize downloads NLTK data at import time; register a
+    # stand-in that exposes the same functions backed by our configured NLTK.
+    from nltk import pos_tag, sent_tokenize, word_tokenize
+
+    tokenize = types.ModuleType("unstructured.nlp.tokenize")
+    tokenize.download_nltk_packages = lambda: None
+    tokenize.pos_tag = pos_tag
+    tokenize.sent_tokenize = sent_tokenize
+    tokenize.word_tokenize = word_tokenize
+    sys.modules["unstructured.nlp.tokenize"] = tokenize
+
+    from unstructured.partition.auto import partition
+    from unstructured.partition.image import partition_image
+    from unstructured.partition.pdf import partition_pdf
+
+    logger.info("Loaded unstructured partitioners in %.2fs", time.perf_counter() - start)
+    return SimpleNamespace(partition=partition, partition_pdf=partition_pdf, partition_image=partition_image)
+
 
 class ManualLoadCancelledError(Exception):
     """Raised when manual ingestion is cancelled by the caller."""
@@ -130,12 +184,19 @@ class ManualLoadCancelledError(Exception):
 class _OCRElement:
     """Lightweight element to unify OCR text with Unstructured output."""
 
-    __slots__ = ("text", "metadata")
+    __slots__ = ("text", "metadata", "confidence")
 
-    def __init__(self, text: str, page_number: int) -> None:
+    def __init__(self, text: str, page_number: int, confidence: Optional[float] = None) -> None:
         self.text = text
         self.metadata = SimpleNamespace()
         self.metadata.page_number = page_number
+        self.confidence = confidence
+
+
+class _TextBlock(_OCRElement):
+    """Vector-text block taken from the shared page model."""
+
+    __slots__ = ()
 
 
 
@@ -180,10 +241,14 @@ def _load_plain_text(path: Path) -> List[Document]:
 
 
 
-def _load_warning_tables(path: Path) -> List[Document]:
-    """Try to load structured warning/specification tables (placeholder)."""
-    # This is a placeholder for future structured data extraction
-    return []
+def _load_warning_tables(model: PageModel, index: WarningIndex) -> WarningIndex:
+    """Index dashboard messages and indicator names (quoted or heading a line) with their pages."""
+    for info in model.pages:
+        text = info.text
+        for message, kind in page_messages(text):
+            index.add(message, kind, info.number, message_context(text, message))
+    logger.info("PDF %s: indexed %s dashboard messages and indicators", model.name, len(index))
+    return index
 
 
 
@@ -236,164 +301,333 @@ def _merge_elements(existing: Sequence[object], extra: Sequence[object]) -> List
 
 
 
-def _render_pages_for_ocr(path: Path, pages: Sequence[int], cancel_callback: Optional[Callable[[], bool]]) -> List[Tuple[int, bytes]]:
-    if not pages:
-        return []
-    logger.info("PDF %s: rendering %s pages at %sdpi for OCR", path, len(pages), _OCR_DPI)
-    try:
-        import fitz  # type: ignore
-    except ImportError as exc:
-        logger.warning("PyMuPDF not available for OCR fallback: %s", exc)
-        return []
+def _render_pages(pdf, pages: Sequence[int], dpi: int, cancel_callback: Optional[Callable[[], bool]]) -> List[Tuple[int, bytes]]:
+    """Render pages of an open fitz document to grayscale PNGs for OCR."""
+    import fitz  # type: ignore
+
+    zoom = dpi / 72
+    matrix = fitz.Matrix(zoom, zoom)
     images: List[Tuple[int, bytes]] = []
-    with fitz.open(path) as pdf:
-        for page_number in pages:
-            _check_cancel(cancel_callback)
-            if page_number < 1 or page_number > pdf.page_count:
-                logger.warning("PDF %s: requested OCR for invalid page %s", path, page_number)
-                continue
-            page = pdf.load_page(page_number - 1)
-            zoom = _OCR_DPI / 72
-            matrix = fitz.Matrix(zoom, zoom)
-            pix = page.get_pixmap(matrix=matrix, colorspace=fitz.csGRAY, alpha=False)
-            images.append((page_number, pix.tobytes("png")))
-    logger.info("PDF %s: prepared %s page images for OCR", path, len(images))
+    for page_number in pages:
+        _check_cancel(cancel_callback)
+        if page_number < 1 or page_number > pdf.page_count:
+            logger.warning("PDF %s: requested OCR for invalid page %s", pdf.name, page_number)
+            continue
+        pix = pdf.load_page(page_number - 1).get_pixmap(matrix=matrix, colorspace=fitz.csGRAY, alpha=False)
+        images.append((page_number, pix.tobytes("png")))
     return images
 
 
-def _run_ocr_on_images(images: Sequence[Tuple[int, bytes]], cancel_callback: Optional[Callable[[], bool]]) -> List[_OCRElement]:
-    if not images:
+def _ocr_document_pages(pdf, pages: Sequence[int], cancel_callback: Optional[Callable[[], bool]]) -> List[_OCRElement]:
+    """OCR pages of an open fitz document, adaptively re-rendering low-confidence pages."""
+    if not pages:
         return []
+    if not _OCR_ADAPTIVE:
+        logger.info("PDF %s: rendering %s pages at %sdpi for OCR", pdf.name, len(pages), _OCR_DPI)
+        return _run_ocr_on_images(_render_pages(pdf, pages, _OCR_DPI, cancel_callback), cancel_callback)
+
+    stats: Dict[str, float] = {}
+    logger.info("PDF %s: first OCR pass over %s pages at %sdpi", pdf.name, len(pages), _OCR_LOW_DPI)
+    first = _run_ocr_on_images(_render_pages(pdf, pages, _OCR_LOW_DPI, cancel_callback), cancel_callback, stats=stats)
+    by_page = {int(element.metadata.page_number): element for element in first}
+    confidences = {page: by_page[page].confidence if page in by_page else 0.0 for page in pages}
+
+    spent = stats.get("engine_seconds", 0.0)
+    scale = (_OCR_HIGH_DPI / _OCR_LOW_DPI) ** 2
+    per_page = scale * spent / max(1.0, stats.get("pages", 0.0))
+    retry = select_for_rerender(confidences, _OCR_MIN_CONFIDENCE, _OCR_CPU_BUDGET - spent if _OCR_CPU_BUDGET > 0 else None, per_page)
+    skipped = sum(1 for conf in confidences.values() if conf is not None and conf < _OCR_MIN_CONFIDENCE) - len(retry)
+    if skipped > 0:
+        logger.warning("PDF %s: OCR budget exhausted, %s low-confidence pages keep their %sdpi text", pdf.name, skipped, _OCR_LOW_DPI)
+    if retry:
+        logger.info("PDF %s: re-rendering %s low-confidence pages at %sdpi", pdf.name, len(retry), _OCR_HIGH_DPI)
+        second = _run_ocr_on_images(_render_pages(pdf, retry, _OCR_HIGH_DPI, cancel_callback), cancel_callback, stats=stats)
+        for element in second:
+            page = int(element.metadata.page_number)
+            current = by_page.get(page)
+            if current is None or is_better_ocr(element.text, element.confidence, current.text, current.confidence):
+                by_page[page] = element
+    logger.info("PDF %s: adaptive OCR used %.1f engine-seconds", pdf.name, stats.get("engine_seconds", 0.0))
+    return [by_page[page] for page in sorted(by_page)]
+
+
+def _ocr_image_regions(model: PageModel, page_texts: Dict[int, str], cancel_callback: Optional[Callable[[], bool]]) -> Dict[int, str]:
+    """OCR the image regions of pages that have vector text; returns new text per page.
+
+    Only the clipped image boxes are rendered, so a page with a small wiring
+    diagram costs a fraction of a full-page render. Low-confidence results
+    (photos, line art) and text the page already contains are dropped.
+    """
+    import fitz  # type: ignore
+
+    zoom = _OCR_REGION_DPI / 72
+    matrix = fitz.Matrix(zoom, zoom)
+    images: List[Tuple[int, bytes]] = []
+    region_pages: Dict[int, int] = {}
+    labels: Dict[int, str] = {}
+    for page_number in sorted(page_texts):
+        _check_cancel(cancel_callback)
+        info = model.page(page_number)
+        regions = select_image_regions(
+            info.box,
+            info.image_boxes,
+            min_side=_OCR_REGION_MIN_SIDE,
+            max_regions=_OCR_REGION_MAX_PER_PAGE,
+        )
+        page_area = (info.box[2] - info.box[0]) * (info.box[3] - info.box[1])
+        covered = sum((box[2] - box[0]) * (box[3] - box[1]) for box in regions)
+        if not regions or covered < _OCR_REGION_MIN_COVERAGE * page_area:
+            continue
+        page = model.pdf.load_page(page_number - 1)
+        for index, box in enumerate(regions, start=1):
+            pix = page.get_pixmap(matrix=matrix, clip=fitz.Rect(box), colorspace=fitz.csGRAY, alpha=False)
+            # Region ids stand in for page numbers while the crops go through the OCR pool
+            region_pages[len(images)] = page_number
+            labels[len(images)] = f"page {page_number} image {index}"
+            images.append((len(images), pix.tobytes("png")))
+    if not images:
+        return {}
+
+    logger.info("PDF %s: OCR of %s image regions on %s text pages", model.name, len(images), len(set(region_pages.values())))
+    extra: Dict[int, List[str]] = {}
+    for element in _run_ocr_on_images(images, cancel_callback, labels=labels):
+        if element.confidence is not None and element.confidence < _OCR_REGION_MIN_CONFIDENCE:
+            continue
+        page_number = region_pages[int(element.metadata.page_number)]
+        text = novel_text(_clean_text(element.text), page_texts[page_number])
+        if text:
+            extra.setdefault(page_number, []).append(text)
+    logger.info("PDF %s: image regions added text to %s pages", model.name, len(extra))
+    return {page: " ".join(parts) for page, parts in extra.items()}
+
+
+def _ocr_model_pages(model: PageModel, pages: Sequence[int], cancel_callback: Optional[Callable[[], bool]]) -> List[_OCRElement]:
+    """OCR ``pages`` of the model, reusing results from earlier stages of the same load."""
+    pending = [page for page in pages if page not in model.ocr]
+    if pending:
+        found = {int(element.metadata.page_number): element for element in _ocr_document_pages(model.pdf, pending, cancel_callback)}
+        for page in pending:
+            model.ocr[page] = found.get(page)
+    return [model.ocr[page] for page in pages if model.ocr.get(page) is not None]
+
+
+@lru_cache(maxsize=1)
+def _ocr_engine() -> Optional[OCREngine]:
+    return create_engine(os.getenv("MANUAL_OCR_LANG", "eng"), _OCR_CONFIG, _OCR_TIMEOUT)
+
+
+@lru_cache(maxsize=1)
+def _ocr_executor() -> ThreadPoolExecutor:
+    """OCR worker threads shared by every pass and every manual.
+
+    Long-lived so per-thread engine state (tesserocr's loaded language
+    models) survives between calls; the governor's OCR slots still decide
+    how many run at once.
+    """
+    return ThreadPoolExecutor(max_workers=min(_OCR_MAX_WORKERS, governor.max_ocr_workers()), thread_name_prefix="ocr")
+
+
+def _read_ocr_cache(digest: str) -> Tuple[str, Optional[float]]:
+    cache_path = _get_ocr_cache_dir() / f"{digest}.txt"
+    if not cache_path.exists():
+        return "", None
     try:
-        import pytesseract  # type: ignore
-    except ImportError as exc:
-        logger.warning("pytesseract not available for OCR fallback: %s", exc)
-        return []
+        text = cache_path.read_text(encoding="utf-8").strip()
+        conf_path = cache_path.with_suffix(".conf")
+        confidence = float(conf_path.read_text(encoding="utf-8")) if conf_path.exists() else None
+        return text, confidence
+    except Exception as exc:  # pragma: no cover
+        logger.debug("Failed to read OCR cache %s: %s", cache_path, exc)
+        return "", None
+
+
+def _write_ocr_cache(digest: str, text: str, confidence: Optional[float] = None) -> None:
     try:
-        from PIL import Image  # type: ignore
-    except ImportError as exc:
-        logger.warning("Pillow not available for OCR fallback: %s", exc)
+        cache_path = _get_ocr_cache_dir() / f"{digest}.txt"
+        cache_path.write_text(text, encoding="utf-8")
+        if confidence is not None:
+            cache_path.with_suffix(".conf").write_text(f"{confidence:.2f}", encoding="utf-8")
+    except Exception as exc:  # pragma: no cover
+        logger.debug("Failed to write OCR cache %s: %s", digest, exc)
+
+
+def _run_ocr_on_images(
+    images: Sequence[Tuple[int, bytes]],
+    cancel_callback: Optional[Callable[[], bool]],
+    stats: Optional[Dict[str, float]] = None,
+    labels: Optional[Dict[int, str]] = None,
+) -> List[_OCRElement]:
+    """OCR rendered pages; ``stats`` accumulates engine-seconds and pages actually recognized.
+
+    Images are keyed by page number unless ``labels`` names them for the logs
+    (region crops are keyed by region id).
+    """
+    if not images:
+        return []
+    engine = _ocr_engine()
+    if engine is None:
         return []
-    logger.info("Running OCR on %s rendered pages", len(images))
-    results: Dict[int, str] = {}
-    lang = os.getenv("MANUAL_OCR_LANG", "eng")
+    labels = labels or {}
 
-    def worker(page_number: int, png_bytes: bytes) -> Tuple[int, str]:
-        _check_cancel(cancel_callback)
+    def label(key: int) -> str:
+        return labels.get(key, f"page {key}")
+
+    logger.info("Running OCR on %s rendered images", len(images))
+    results: Dict[int, Tuple[str, Optional[float]]] = {}
+    stats = stats if stats is not None else {}
+    stats_lock = Lock()
+
+    pending: List[Tuple[int, bytes, str]] = []
+    for page_number, png_bytes in images:
         digest = hashlib.md5(png_bytes).hexdigest()
-        cache_path = _get_ocr_cache_dir() / f"{digest}.txt"
-        if cache_path.exists():
-            try:
-                cached = cache_path.read_text(encoding="utf-8").strip()
-                if cached:
-                    logger.info("OCR cache hit for page %s", page_number)
-                    return page_number, cached
-            except Exception as exc:  # pragma: no cover
-                logger.debug("Failed to read OCR cache for page %s: %s", page_number, exc)
-        with Image.open(io.BytesIO(png_bytes)) as img:
-            img = img.convert("L")
+        cached, confidence = _read_ocr_cache(digest)
+        if cached:
+            logger.info("OCR cache hit for %s", label(page_number))
+            results[page_number] = (cached, confidence)
+        else:
+            pending.append((page_number, png_bytes, digest))
+
+    def worker(group: List[Tuple[int, bytes, str]]) -> List[Tuple[int, str, Optional[float]]]:
+        _check_cancel(cancel_callback)
+        # Each engine call holds one core from the governor's ingestion budget
+        with governor.ocr_slot():
+            started = time.perf_counter()
             try:
-                text = pytesseract.image_to_string(
-                    img,
-                    lang=lang,
-                    timeout=_OCR_TIMEOUT,
-                    config=_OCR_CONFIG,
-                )
-            except RuntimeError as exc:
-                logger.warning("OCR timed out for page %s: %s", page_number, exc)
-                return page_number, ""
-        cleaned = _clean_text(text)
-        try:
-            cache_path.write_text(cleaned, encoding="utf-8")
-        except Exception as exc:  # pragma: no cover
-            logger.debug("Failed to write OCR cache for page %s: %s", page_number, exc)
-        logger.info("OCR extracted %s characters from page %s", len(cleaned), page_number)
-        return page_number, cleaned
-
-    with ThreadPoolExecutor(max_workers=_OCR_MAX_WORKERS) as executor:
-        futures = {executor.submit(worker, page, data): page for page, data in images}
-        for future in as_completed(futures):
+                outputs = engine.recognize([png_bytes for _, png_bytes, _ in group], cancel_callback)
+            except OCRCancelledError as exc:
+                raise ManualLoadCancelledError("Manual ingestion cancelled by user.") from exc
+            elapsed = time.perf_counter() - started
+        with stats_lock:
+            stats["engine_seconds"] = stats.get("engine_seconds", 0.0) + elapsed
+            stats["pages"] = stats.get("pages", 0.0) + len(group)
+        extracted: List[Tuple[int, str, Optional[float]]] = []
+        for (page_number, _, digest), output in zip(group, outputs):
+            cleaned = _clean_text(output.text)
+            if cleaned:
+                _write_ocr_cache(digest, cleaned, output.confidence)
+            logger.info("OCR extracted %s characters from %s (confidence %s)", len(cleaned), label(page_number),
+                        "n/a" if output.confidence is None else f"{output.confidence:.0f}")
+            extracted.append((page_number, cleaned, output.confidence))
+        return extracted
+
+    groups = [pending[i:i + engine.batch_size] for i in range(0, len(pending), engine.batch_size)]
+    executor = _ocr_executor()
+    futures: Dict[Future, List[int]] = {executor.submit(worker, group): [page for page, _, _ in group] for group in groups}
+    try:
+        remaining = set(futures)
+        while remaining:
+            done, remaining = wait(remaining, return_when=FIRST_COMPLETED)
             _check_cancel(cancel_callback)
-            page_number = futures[future]
-            try:
-                page, text = future.result()
-            except ManualLoadCancelledError:
-                raise
-            except Exception as exc:  # pragma: no cover
-                logger.warning("OCR failed for page %s: %s", page_number, exc)
-                continue
-            if text:
-                results[page] = text
+            for future in done:
+                try:
+                    extracted = future.result()
+                except ManualLoadCancelledError:
+                    raise
+                except Exception as exc:  # pragma: no cover
+                    logger.warning("OCR failed for %s: %s", ", ".join(label(key) for key in futures[future]), exc)
+                    continue
+                for page, text, confidence in extracted:
+                    if text:
+                        results[page] = (text, confidence)
+    finally:
+        # The pool outlives this call; don't leave a cancelled manual's groups queued in it
+        for future in futures:
+            future.cancel()
     elements: List[_OCRElement] = []
     for page_number in sorted(results):
-        cleaned = results[page_number].strip()
+        cleaned, confidence = results[page_number]
+        cleaned = cleaned.strip()
         if not cleaned:
             continue
-        elements.append(_OCRElement(cleaned, page_number))
-    logger.info("OCR produced text for %s/%s pages", len(elements), len(images))
+        elements.append(_OCRElement(cleaned, page_number, confidence))
+    logger.info("OCR produced text for %s/%s images", len(elements), len(images))
     return elements
 
 
 
-def _partition_pdf(path: Path, cancel_callback: Optional[Callable[[], bool]] = None, disable_ocr: bool = False):
-    """Partition a PDF using the fast strategy with selective OCR fallbacks."""
+def _model_elements(model: PageModel) -> List[object]:
+    return [_TextBlock(_clean_text(block.text), page.number) for page in model.pages for block in page.blocks]
+
+
+def _hi_res_pages(
+    model: PageModel,
+    pages: Sequence[int],
+    cancel_callback: Optional[Callable[[], bool]],
+) -> Iterator[Tuple[int, List[object]]]:
+    """Run Unstructured's hi_res strategy on ``pages`` only, yielding each page's elements as its batch completes.
+
+    Each batch is copied into a small temporary PDF so the layout model never
+    sees the rest of the file. Stops early when the next batch, estimated from
+    the ones so far, would exceed the time/CPU budget.
+    """
+    import fitz  # type: ignore
+
+    budget = WorkBudget(_HIRES_TIME_BUDGET, _HIRES_CPU_BUDGET)
+    batches = [list(pages[i:i + _HIRES_BATCH_PAGES]) for i in range(0, len(pages), _HIRES_BATCH_PAGES)]
+    for done, batch in enumerate(batches):
+        _check_cancel(cancel_callback)
+        wall, cpu = budget.spent()
+        if done and not budget.can_afford(wall / done, cpu / done):
+            remaining = sum(len(rest) for rest in batches[done:])
+            logger.warning("PDF %s: hi_res budget reached after %.0fs (%.0f CPU-s); %s pages left without layout text",
+                           model.name, wall, cpu, remaining)
+            return
+        with tempfile.TemporaryDirectory(prefix="manualai_hires_") as workdir:
+            subset_path = Path(workdir) / "pages.pdf"
+            with fitz.open() as subset:
+                for page_number in batch:
+                    subset.insert_pdf(model.pdf, from_page=page_number - 1, to_page=page_number - 1)
+                subset.save(str(subset_path))
+            try:
+                with governor.ocr_slot():
+                    elements = _unstructured().partition_pdf(filename=str(subset_path), strategy="hi_res", infer_table_structure=True)
+            except Exception as exc:  # pragma: no cover - best effort logging
+                logger.warning("PDF %s: hi_res failed for pages %s: %s", model.name, batch, exc)
+                continue
+        by_page: Dict[int, List[object]] = {page_number: [] for page_number in batch}
+        for element in elements:
+            local = getattr(element.metadata, "page_number", None) or 1
+            page_number = batch[min(int(local), len(batch)) - 1]
+            element.metadata.page_number = page_number
+            by_page[page_number].append(element)
+        for page_number in batch:
+            yield page_number, by_page[page_number]
+
+
+def _partition_pdf(
+    path: Path,
+    cancel_callback: Optional[Callable[[], bool]] = None,
+    disable_ocr: bool = False,
+    model: Optional[PageModel] = None,
+):
+    """Partition a PDF from the shared page model with selective OCR fallbacks.
+
+    Without a model (PyMuPDF missing) Unstructured's fast strategy is used as-is.
+    """
     _check_cancel(cancel_callback)
 
     start_time = time.perf_counter()
-    logger.info("PDF %s: running fast partition (OCR %s)", path, "DISABLED" if disable_ocr else "enabled")
+    if model is None:
+        logger.info("PDF %s: no page model, running Unstructured fast partition", path)
+        return _unstructured().partition_pdf(filename=str(path), strategy="fast")
 
-    fast_elements = partition_pdf(filename=str(path), strategy="fast")
-    fast_text = _total_text_length(fast_elements)
-    page_lengths = _collect_page_lengths(fast_elements)
-    logger.info("PDF %s: fast strategy produced %s characters across %s pages", path, fast_text, len(page_lengths))
+    elements = _model_elements(model)
+    text_length = _total_text_length(elements)
+    logger.info("PDF %s: page model holds %s characters across %s pages", path, text_length, len(model.text_pages()))
 
-    # If OCR is disabled, return fast results immediately
+    # If OCR is disabled, return the vector text immediately
     if disable_ocr:
-        logger.info("PDF %s: OCR disabled, returning fast partition results (%s chars)", path, fast_text)
-        return fast_elements
-
-    text_replacements: List[_OCRElement] = []
-    ocr_pages: List[int] = []
-
-    try:
-        import fitz  # type: ignore
-    except ImportError as exc:  # pragma: no cover - optional dependency
-        if fast_text < _MIN_FAST_TEXT:
-            logger.warning("PyMuPDF unavailable; returning fast output without OCR fallback: %s", exc)
-        return fast_elements
-
-    with fitz.open(path) as pdf:
-        total_pages = pdf.page_count
-        logger.info("PDF %s: scanning %s pages for inline text", path, total_pages)
-        for index in range(total_pages):
-            page_number = index + 1
-            _check_cancel(cancel_callback)
-            if page_lengths.get(page_number, 0) > 0:
-                continue
-            raw_text = pdf[index].get_text("text").strip()
-            if raw_text:
-                cleaned = _clean_text(raw_text)
-                if cleaned:
-                    text_replacements.append(_OCRElement(cleaned, page_number))
-                    logger.info("PDF %s: extracted %s chars directly from page %s", path, len(cleaned), page_number)
-                continue
-            ocr_pages.append(page_number)
+        logger.info("PDF %s: OCR disabled, returning page-model text (%s chars)", path, text_length)
+        return elements
 
+    ocr_pages = model.textless_pages()
     if ocr_pages:
         logger.info("PDF %s: %s pages require OCR fallback", path, len(ocr_pages))
     else:
         logger.info("PDF %s: all pages contained extractable text", path)
 
-    pages_to_replace = {int(element.metadata.page_number) for element in text_replacements}
-    pages_to_replace.update(int(page) for page in ocr_pages)
-
-    filtered_fast = _filter_elements_by_pages(fast_elements, pages_to_replace)
-
-    rendered_images = _render_pages_for_ocr(path, sorted(ocr_pages), cancel_callback)
-    ocr_elements = _run_ocr_on_images(rendered_images, cancel_callback)
-
-    extra_elements: List[object] = [*text_replacements, *ocr_elements]
-    combined = _merge_elements(filtered_fast, extra_elements) if extra_elements else filtered_fast
+    ocr_elements = _ocr_model_pages(model, ocr_pages, cancel_callback)
+    combined = _merge_elements(elements, ocr_elements) if ocr_elements else elements
     combined_length = _total_text_length(combined)
     logger.info("PDF %s: combined text after OCR contains %s characters", path, combined_length)
 
@@ -401,77 +635,82 @@ def _partition_pdf(path: Path, cancel_callback: Optional[Callable[[], bool]] = N
         logger.info("PDF %s: returning combined output without hi_res fallback (elapsed %.2fs)", path, time.perf_counter() - start_time)
         return combined
 
-    _check_cancel(cancel_callback)
-    try:
-        logger.info("PDF %s: invoking hi_res fallback", path)
-        hi_res = partition_pdf(filename=str(path), strategy="hi_res", infer_table_structure=True)
-    except Exception as exc:  # pragma: no cover - best effort logging
-        logger.warning("PDF %s: hi_res OCR fallback failed: %s", path, exc)
-        return combined
-
-    hi_res_length = _total_text_length(hi_res)
-    logger.info("PDF %s: hi_res fallback returned %s characters (elapsed %.2fs)", path, hi_res_length, time.perf_counter() - start_time)
-    return hi_res if hi_res_length > combined_length else combined
-
-
-def _partition_file(path: Path, cancel_callback: Optional[Callable[[], bool]] = None, disable_ocr: bool = False):
+    lengths = _collect_page_lengths(combined)
+    weak_pages = [page.number for page in model.pages if lengths.get(page.number, 0) < _MIN_PAGE_TEXT]
+    logger.info("PDF %s: hi_res fallback on %s/%s weak pages", path, len(weak_pages), model.page_count)
+    improved = 0
+    for page_number, page_elements in _hi_res_pages(model, weak_pages, cancel_callback):
+        # Merge each page as it completes so an early stop still keeps what was recovered
+        if _total_text_length(page_elements) > lengths.get(page_number, 0):
+            combined = _merge_elements(_filter_elements_by_pages(combined, [page_number]), page_elements)
+            improved += 1
+
+    logger.info("PDF %s: hi_res fallback improved %s pages, %s characters total (elapsed %.2fs)",
+                path, improved, _total_text_length(combined), time.perf_counter() - start_time)
+    return combined
+
+
+def _partition_file(
+    path: Path,
+    cancel_callback: Optional[Callable[[], bool]] = None,
+    disable_ocr: bool = False,
+    model: Optional[PageModel] = None,
+):
     suffix = path.suffix.lower()
     if suffix == ".pdf":
-        return _partition_pdf(path, cancel_callback=cancel_callback, disable_ocr=disable_ocr)
+        return _partition_pdf(path, cancel_callback=cancel_callback, disable_ocr=disable_ocr, model=model)
     _check_cancel(cancel_callback)
     if suffix in {".png", ".jpg", ".jpeg", ".heic", ".bmp", ".tif", ".tiff"}:
         if disable_ocr:
             logger.warning("Image file %s requires OCR but OCR is disabled", path)
             return []
-        return partition_image(filename=str(path))
-    return partition(filename=str(path))
+        return _unstructured().partition_image(filename=str(path))
+    return _unstructured().partition(filename=str(path))
 
 
 
-def _load_pdf_fast(path: Path, cancel_callback: Optional[Callable[[], bool]] = None, disable_ocr: bool = False) -> List[Document]:
-    try:
-        import fitz  # type: ignore
-    except ImportError as exc:
-        logger.warning("PyMuPDF not available for fast PDF pipeline: %s", exc)
-        return []
+def _load_pdf_fast(
+    path: Path,
+    cancel_callback: Optional[Callable[[], bool]] = None,
+    disable_ocr: bool = False,
+    model: Optional[PageModel] = None,
+    keep_lines: bool = False,
+) -> List[Document]:
+    """One Document per page. ``keep_lines`` keeps vector-text line breaks (for boilerplate detection)."""
+    if model is None:
+        with open_page_model(path, lambda: _check_cancel(cancel_callback)) as opened:
+            if opened is None:
+                return []
+            return _load_pdf_fast(path, cancel_callback=cancel_callback, disable_ocr=disable_ocr, model=opened, keep_lines=keep_lines)
 
     _check_cancel(cancel_callback)
     documents: List[Document] = []
-    ocr_targets: List[int] = []
     page_texts: Dict[int, str] = {}
-
-    with fitz.open(path) as pdf:
-        total_pages = pdf.page_count
-        logger.info("PDF %s: fast pipeline opened with %s pages (OCR %s)", path, total_pages, "DISABLED" if disable_ocr else "enabled")
-        for index in range(total_pages):
-            page_number = index + 1
-            _check_cancel(cancel_callback)
-            page = pdf.load_page(index)
-            extracted = page.get_text("text") or ""
-            cleaned = _clean_text(extracted)
-            if cleaned:
-                page_texts[page_number] = cleaned
-                continue
-            # Skip OCR if disabled
-            if not disable_ocr:
-                ocr_targets.append(page_number)
-
-        if ocr_targets and not disable_ocr:
+    logger.info("PDF %s: fast pipeline over %s pages (OCR %s)", path, model.page_count, "DISABLED" if disable_ocr else "enabled")
+    for page in model.pages:
+        if keep_lines:
+            cleaned = "\n".join(line for line in map(_clean_text, page.text.splitlines()) if line)
+        else:
+            cleaned = _clean_text(page.text)
+        if cleaned:
+            page_texts[page.number] = cleaned
+
+    if not disable_ocr:
+        ocr_targets = model.textless_pages()
+        if ocr_targets:
             logger.info("PDF %s: %s pages require OCR in fast pipeline", path, len(ocr_targets))
-            images: List[Tuple[int, bytes]] = []
-            zoom = _OCR_DPI / 72
-            matrix = fitz.Matrix(zoom, zoom)
-            for page_number in ocr_targets:
-                _check_cancel(cancel_callback)
-                page = pdf.load_page(page_number - 1)
-                pix = page.get_pixmap(matrix=matrix, colorspace=fitz.csGRAY, alpha=False)
-                images.append((page_number, pix.tobytes("png")))
-            ocr_elements = _run_ocr_on_images(images, cancel_callback)
-            for element in ocr_elements:
+            for element in _ocr_model_pages(model, ocr_targets, cancel_callback):
                 text = _clean_text(element.text)
                 if text:
                     page_texts[int(element.metadata.page_number)] = text
 
+        if _OCR_REGIONS:
+            scanned = set(ocr_targets)
+            text_pages = {page: text for page, text in page_texts.items() if page not in scanned}
+            separator = "\n" if keep_lines else " "
+            for page_number, region_text in _ocr_image_regions(model, text_pages, cancel_callback).items():
+                page_texts[page_number] = page_texts[page_number] + separator + region_text
+
     for page_number in sorted(page_texts):
         documents.append(
             Document(
@@ -483,15 +722,56 @@ def _load_pdf_fast(path: Path, cancel_callback: Optional[Callable[[], bool]] = N
     logger.info("PDF %s: fast pipeline produced %s document chunks", path, len(documents))
     return documents
 
-def _load_unstructured(path: Path, cancel_callback: Optional[Callable[[], bool]] = None, disable_ocr: bool = False) -> List[Document]:
+def _section_index(model: PageModel) -> SectionIndex:
+    try:
+        return extract_sections(model)
+    except Exception as exc:  # pragma: no cover - best effort
+        logger.warning("PDF %s: section extraction failed: %s", model.name, exc)
+        return SectionIndex()
+
+
+def _tag_sections(docs: List[Document], index: SectionIndex) -> List[Document]:
+    """Set ``section_id``/``section`` from the document's (first) page."""
+    for doc in docs:
+        page = doc.metadata.get("page") or str(doc.metadata.get("pages", "")).split(",")[0]
+        section = index.section_at(int(page)) if str(page).isdigit() else None
+        if section is not None:
+            doc.metadata["section_id"] = section.id
+            doc.metadata["section"] = section.title
+    return docs
+
+
+def _load_unstructured(
+    path: Path,
+    cancel_callback: Optional[Callable[[], bool]] = None,
+    disable_ocr: bool = False,
+    sections: Optional[List[Section]] = None,
+    warnings: Optional[WarningIndex] = None,
+) -> List[Document]:
+    """Per-page (or per-element-group) documents.
+
+    For PDFs, sections are appended to ``sections`` and dashboard messages added to ``warnings``.
+    """
     suffix = path.suffix.lower()
     if suffix in {".txt", ".md"}:
         return _load_plain_text(path)
     if suffix == ".pdf":
-        fast_docs = _load_pdf_fast(path, cancel_callback=cancel_callback, disable_ocr=disable_ocr)
-        if fast_docs:
-            return fast_docs
-    elements = _partition_file(path, cancel_callback=cancel_callback, disable_ocr=disable_ocr)
+        # One parse of the PDF serves the fast pipeline and, if that comes up empty, the fallbacks.
+        with open_page_model(path, lambda: _check_cancel(cancel_callback)) as model:
+            index = _section_index(model) if model is not None else SectionIndex()
+            if sections is not None:
+                sections.extend(index.sections)
+            if warnings is not None and model is not None:
+                _load_warning_tables(model, warnings)
+            if model is not None:
+                # Line breaks are only needed by the page-level analyses in load_manual
+                keep_lines = _STRIP_BOILERPLATE or _EXCLUDE_NAVIGATION_PAGES
+                fast_docs = _load_pdf_fast(path, cancel_callback=cancel_callback, disable_ocr=disable_ocr, model=model, keep_lines=keep_lines)
+                if fast_docs:
+                    return _tag_sections(fast_docs, index)
+            elements = _partition_file(path, cancel_callback=cancel_callback, disable_ocr=disable_ocr, model=model)
+    else:
+        elements = _partition_file(path, cancel_callback=cancel_callback, disable_ocr=disable_ocr)
 
     docs: List[Document] = []
     buffer: List[str] = []
@@ -537,7 +817,53 @@ def _load_unstructured(path: Path, cancel_callback: Optional[Callable[[], bool]]
         buffer_chars += len(cleaned)
 
     flush_buffer()
-    return docs
+    return _tag_sections(docs, index) if suffix == ".pdf" else docs
+
+def _drop_navigation_pages(docs: List[Document]) -> Tuple[List[Document], Dict[int, str]]:
+    """Remove contents/index pages from per-page documents; returns (docs, {page: kind})."""
+    kept: List[Document] = []
+    dropped: Dict[int, str] = {}
+    for doc in docs:
+        kind = classify_navigation_page(doc.page_content.splitlines()) if "page" in doc.metadata else None
+        if kind:
+            dropped[int(doc.metadata["page"])] = kind
+        else:
+            kept.append(doc)
+    return kept, dropped
+
+
+def _strip_page_boilerplate(docs: List[Document]) -> Tuple[List[Document], int]:
+    """Remove lines repeated at the same edge position across pages; returns (docs, lines removed)."""
+    paged = [doc for doc in docs if "page" in doc.metadata]
+    boilerplate = find_boilerplate([doc.page_content.splitlines() for doc in paged])
+    if not boilerplate:
+        return docs, 0
+    stripped: List[Document] = []
+    removed = 0
+    for doc in docs:
+        if "page" not in doc.metadata:
+            stripped.append(doc)
+            continue
+        lines = doc.page_content.splitlines()
+        kept = strip_boilerplate(lines, boilerplate)
+        removed += len(lines) - len(kept)
+        if kept:
+            stripped.append(Document(page_content="\n".join(kept), metadata=dict(doc.metadata)))
+    return stripped, removed
+
+
+def _chunk_page_documents(docs: List[Document]) -> List[Document]:
+    """Chunk per-page documents across page boundaries; each chunk records its page span.
+
+    Other metadata (source, section) comes from the chunk's start page.
+    """
+    by_page = {int(doc.metadata["page"]): doc.metadata for doc in docs}
+    chunks: List[Document] = []
+    for chunk in chunk_pages([(int(doc.metadata["page"]), doc.page_content) for doc in docs]):
+        metadata = dict(by_page[chunk.start_page], page=chunk.start_page, start_page=chunk.start_page, end_page=chunk.end_page)
+        chunks.append(Document(page_content=chunk.text, metadata=metadata))
+    return chunks
+
 
 def _enrich_metadata(chunk: Document) -> Document:
     """Enrich document metadata with extracted information"""
@@ -572,13 +898,22 @@ def _enrich_metadata(chunk: Document) -> Document:
     return chunk
 
 
-def load_manual(filepath: str, *, cancel_callback: Optional[Callable[[], bool]] = None, disable_ocr: bool = False) -> List[Document]:
+def load_manual(
+    filepath: str,
+    *,
+    cancel_callback: Optional[Callable[[], bool]] = None,
+    disable_ocr: bool = False,
+    sections: Optional[List[Section]] = None,
+    warnings: Optional[WarningIndex] = None,
+) -> List[Document]:
     """Load and process a car manual with intelligent chunking and metadata enrichment.
     
     Args:
         filepath: Path to the manual file
         cancel_callback: Callback to check if processing should be cancelled
         disable_ocr: If True, skip OCR processing (text-only PDFs, faster on free tier)
+        sections: If given, receives the PDF's sections (chunks carry their ``section_id``)
+        warnings: If given, receives the PDF's dashboard messages and indicator names
     """
     path = Path(filepath)
     _check_cancel(cancel_callback)
@@ -586,26 +921,49 @@ def load_manual(filepath: str, *, cancel_callback: Optional[Callable[[], bool]]
     if disable_ocr:
         logger.info("Manual %s: OCR DISABLED - text-only mode", path)
 
-    # Try to load structured warning tables first
-    table_docs = _load_warning_tables(path)
-    if table_docs:
-        # Enrich table documents
-        return [_enrich_metadata(doc) for doc in table_docs]
-
     # Load unstructured content
     _check_cancel(cancel_callback)
-    raw_docs = _load_unstructured(path, cancel_callback=cancel_callback, disable_ocr=disable_ocr)
+    raw_docs = _load_unstructured(path, cancel_callback=cancel_callback, disable_ocr=disable_ocr, sections=sections, warnings=warnings)
     if not raw_docs:
         return []
 
-    # Use semantic chunking with overlap for better context preservation
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=800,
-        chunk_overlap=150,
-        separators=["\n\n", "\n", ". ", ", ", " ", ""],
-        keep_separator=True,
-    )
-    chunks = splitter.split_documents(raw_docs)
+    if _EXCLUDE_NAVIGATION_PAGES:
+        raw_docs, navigation = _drop_navigation_pages(raw_docs)
+        if navigation:
+            logger.info("Manual %s: excluded %s contents/index pages from indexing: %s",
+                        path, len(navigation), ",".join(str(page) for page in sorted(navigation)))
+        if not raw_docs:
+            return []
+
+    if _STRIP_BOILERPLATE:
+        before = sum(len(doc.page_content) for doc in raw_docs)
+        raw_docs, removed_lines = _strip_page_boilerplate(raw_docs)
+        if removed_lines:
+            saved = before - sum(len(doc.page_content) for doc in raw_docs)
+            # ~4 characters per token is close enough for sizing embedding work
+            logger.info("Manual %s: stripped %s boilerplate lines, %s chars (~%s tokens, ~%s chunks)",
+                        path, removed_lines, saved, saved // 4, saved // (CHUNK_SIZE - CHUNK_OVERLAP))
+    elif _EXCLUDE_NAVIGATION_PAGES:
+        # Lines were kept only to spot contents/index pages; chunk the same text as without them
+        raw_docs = [
+            Document(page_content=_clean_text(doc.page_content), metadata=doc.metadata) if "page" in doc.metadata else doc
+            for doc in raw_docs
+        ]
+
+    if PAGE_CHUNKER_ENABLED and all("page" in doc.metadata for doc in raw_docs):
+        # Per-page documents: chunk the manual as one text so procedures can span pages
+        chunks = _chunk_page_documents(raw_docs)
+    else:
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+        # Use semantic chunking with overlap for better context preservation
+        splitter = RecursiveCharacterTextSplitter(
+            chunk_size=CHUNK_SIZE,
+            chunk_overlap=CHUNK_OVERLAP,
+            separators=[*SEPARATORS, ""],
+            keep_separator=True,
+        )
+        chunks = splitter.split_documents(raw_docs)
 
     # Clean and enrich chunks
     cleaned_chunks: List[Document] = []
@@ -619,5 +977,9 @@ def load_manual(filepath: str, *, cancel_callback: Optional[Callable[[], bool]]
         # Enrich with metadata
         chunk = _enrich_metadata(chunk)
         cleaned_chunks.append(chunk)
-    
+
+    if INGEST_DEDUP_ENABLED:
+        # One indexed record per group of near-identical chunks, carrying all their pages
+        cleaned_chunks = collapse_near_duplicates(cleaned_chunks)
+
     return cleaned_chunks
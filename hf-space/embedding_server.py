@@ -0,0 +1,208 @@
+"""
+Embedding sidecar: one process owns the SentenceTransformer weights and serves
+encode requests to every API worker over a Unix socket.
+
+Start it next to the API workers and point them at it:
+    python embedding_server.py --socket /tmp/manualai-embed.sock
+    MANUAL_EMBEDDING_SOCKET=/tmp/manualai-embed.sock uvicorn main:app --workers 4
+
+Only the embedding model is shared. With MANUAL_RERANK on, every worker still
+loads its own cross-encoder.
+
+Wire format (both directions): ``!II`` header length and payload length, then
+a JSON header, then the payload. Requests carry ``{"texts": [...]}``; responses
+carry ``{"rows": n, "dim": d}`` (or ``{"error": "..."}``) and float32 vectors.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import socket
+import socketserver
+import struct
+import threading
+from array import array
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_SOCKET = os.getenv("MANUAL_EMBEDDING_SOCKET", "")
+EMBEDDING_TIMEOUT = float(os.getenv("MANUAL_EMBEDDING_TIMEOUT", "120"))
+
+_FRAME = struct.Struct("!II")
+
+
+class EmbeddingServiceError(RuntimeError):
+    """Raised by the client when the sidecar reports an error or cannot be reached."""
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    buffer = bytearray()
+    while len(buffer) < size:
+        chunk = sock.recv(size - len(buffer))
+        if not chunk:
+            raise ConnectionError("embedding socket closed mid-message")
+        buffer.extend(chunk)
+    return bytes(buffer)
+
+
+def send_message(sock: socket.socket, header: Dict[str, object], payload: bytes = b"") -> None:
+    encoded = json.dumps(header).encode("utf-8")
+    sock.sendall(_FRAME.pack(len(encoded), len(payload)) + encoded + payload)
+
+
+def recv_message(sock: socket.socket) -> Tuple[Dict[str, object], bytes]:
+    header_size, payload_size = _FRAME.unpack(_recv_exact(sock, _FRAME.size))
+    header = json.loads(_recv_exact(sock, header_size).decode("utf-8"))
+    payload = _recv_exact(sock, payload_size) if payload_size else b""
+    return header, payload
+
+
+def _pack_vectors(vectors) -> Tuple[int, int, bytes]:
+    """Serialise a 2-D array (numpy or nested lists) as native float32 bytes."""
+    if hasattr(vectors, "astype"):
+        rows, dim = vectors.shape
+        return rows, dim, vectors.astype("float32").tobytes()
+    rows = len(vectors)
+    dim = len(vectors[0]) if rows else 0
+    flat = array("f")
+    for vector in vectors:
+        flat.extend(float(value) for value in vector)
+    return rows, dim, flat.tobytes()
+
+
+def _unpack_vectors(rows: int, dim: int, payload: bytes) -> List[List[float]]:
+    flat = array("f")
+    flat.frombytes(payload)
+    return [flat[row * dim:(row + 1) * dim].tolist() for row in range(rows)]
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self) -> None:
+        server: EmbeddingServer = self.server  # type: ignore[assignment]
+        while True:
+            try:
+                request, _ = recv_message(self.request)
+            except (ConnectionError, OSError, struct.error):
+                return
+            try:
+                texts = [str(text) for text in request.get("texts", [])]  # type: ignore[union-attr]
+                batch_size = int(request.get("batch_size") or 32)  # type: ignore[arg-type]
+                rows, dim, payload = _pack_vectors(server.encode(texts, batch_size))
+                send_message(self.request, {"rows": rows, "dim": dim}, payload)
+            except (ConnectionError, OSError):
+                return
+            except Exception as exc:
+                logger.exception("Embedding request failed")
+                send_message(self.request, {"error": str(exc)})
+
+
+class EmbeddingServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Serves ``encode_fn(texts, batch_size)`` over a Unix socket, one thread per connection."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, encode_fn: Callable[[List[str], int], object]) -> None:
+        path = Path(socket_path)
+        if path.exists():
+            # A socket left behind by a crashed sidecar would make bind() fail.
+            path.unlink()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._encode_fn = encode_fn
+        # Forward passes already use every core; serialising them avoids thread oversubscription.
+        self._encode_lock = threading.Lock()
+        super().__init__(str(path), _Handler)
+        os.chmod(path, 0o660)
+
+    def encode(self, texts: List[str], batch_size: int):
+        if not texts:
+            return []
+        with self._encode_lock:
+            return self._encode_fn(texts, batch_size)
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            os.unlink(self.server_address)  # type: ignore[arg-type]
+        except OSError:
+            pass
+
+
+class EmbeddingClient:
+    """Drop-in for ``SentenceTransformer.encode`` that forwards to the sidecar.
+
+    Each thread keeps its own persistent connection; a broken connection is
+    reopened once before the error is surfaced.
+    """
+
+    def __init__(self, socket_path: str, timeout: float = EMBEDDING_TIMEOUT) -> None:
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> socket.socket:
+        sock: Optional[socket.socket] = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            self._local.sock = sock
+        return sock
+
+    def _reset(self) -> None:
+        sock = getattr(self._local, "sock", None)
+        self._local.sock = None
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    def encode(self, texts: Sequence[str], batch_size: int = 32) -> List[List[float]]:
+        texts = list(texts)
+        if not texts:
+            return []
+        for attempt in (1, 2):
+            try:
+                sock = self._connection()
+                send_message(sock, {"texts": texts, "batch_size": batch_size})
+                header, payload = recv_message(sock)
+                break
+            except (ConnectionError, OSError) as exc:
+                self._reset()
+                if attempt == 2:
+                    raise EmbeddingServiceError(f"Embedding sidecar at {self.socket_path} unavailable: {exc}") from exc
+        if "error" in header:
+            raise EmbeddingServiceError(str(header["error"]))
+        return _unpack_vectors(int(header["rows"]), int(header["dim"]), payload)  # type: ignore[arg-type]
+
+    def close(self) -> None:
+        self._reset()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve embeddings to API workers over a Unix socket")
+    parser.add_argument("--socket", default=EMBEDDING_SOCKET or "/tmp/manualai-embed.sock")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=os.getenv("MANUALAI_LOG_LEVEL", "INFO").upper(), format="[%(levelname)s] %(name)s: %(message)s")
+    # Loading through vector_store keeps the HF cache/offline settings identical to the workers.
+    from vector_store import EMBEDDING_MODEL, _get_model, warm_up
+
+    model = _get_model()
+    # The sidecar may share the workers' environment, socket variable included; never call itself.
+    warm_up(remote=False)
+    server = EmbeddingServer(args.socket, lambda texts, batch_size: model.encode(texts, batch_size=batch_size))
+    logger.info("Embedding sidecar serving %s on %s", EMBEDDING_MODEL, args.socket)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
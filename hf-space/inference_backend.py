@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# torch (default), onnx, or onnx-int8 (dynamically quantized ONNX; needs `sentence-transformers[onnx]`)
+INFERENCE_BACKEND = os.getenv("MANUAL_INFERENCE_BACKEND", "torch").lower()
+# Instruction-set target for int8 quantization: arm64, avx2, avx512 or avx512_vnni
+ONNX_QUANT_CONFIG = os.getenv("MANUAL_ONNX_QUANT_CONFIG", "avx2")
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+
+def _export_dir(cache_folder: Optional[str], model_name: str, kind: str) -> Path:
+    root = Path(cache_folder or os.getenv("HF_HOME", "/tmp/manualai_hf_cache"))
+    return root / "onnx-exports" / kind / re.sub(r"[^A-Za-z0-9_.-]+", "--", model_name)
+
+
+def _quantized(load, export, model_name: str, export_dir: Path, **kwargs):
+    """Export ``model_name`` to ONNX once, quantize it to int8 and load the quantized file.
+
+    ``load`` is SentenceTransformer or CrossEncoder.
+    """
+    file_name = f"onnx/model_qint8_{ONNX_QUANT_CONFIG}.onnx"
+    if not (export_dir / file_name).exists():
+        logger.info("Exporting %s to int8 ONNX (%s) in %s", model_name, ONNX_QUANT_CONFIG, export_dir)
+        model = load(model_name, backend="onnx", **kwargs)
+        model.save(str(export_dir))
+        export(model, quantization_config=ONNX_QUANT_CONFIG, model_name_or_path=str(export_dir), push_to_hub=False)
+    return load(str(export_dir), backend="onnx", model_kwargs={"file_name": file_name}, **kwargs)
+
+
+def _check(backend: str) -> str:
+    backend = backend.lower()
+    if backend not in BACKENDS:
+        logger.warning("Unknown inference backend %r, using torch", backend)
+        return "torch"
+    return backend
+
+
+def load_sentence_transformer(model_name: str, cache_folder: Optional[str] = None, backend: str = INFERENCE_BACKEND):
+    from sentence_transformers import SentenceTransformer
+
+    backend = _check(backend)
+    if backend != "torch":
+        try:
+            if backend == "onnx":
+                return SentenceTransformer(model_name, cache_folder=cache_folder, backend="onnx")
+            from sentence_transformers import export_dynamic_quantized_onnx_model
+
+            return _quantized(
+                SentenceTransformer,
+                export_dynamic_quantized_onnx_model,
+                model_name,
+                _export_dir(cache_folder, model_name, "embedding"),
+                cache_folder=cache_folder,
+            )
+        except Exception as exc:
+            logger.warning("Falling back to torch for %s, %s backend unavailable: %s", model_name, backend, exc)
+    return SentenceTransformer(model_name, cache_folder=cache_folder)
+
+
+def load_cross_encoder(model_name: str, max_length: int, backend: str = INFERENCE_BACKEND):
+    from sentence_transformers import CrossEncoder
+
+    backend = _check(backend)
+    if backend != "torch":
+        # CrossEncoder accepts backend= from sentence-transformers 4.x; older versions raise TypeError here.
+        try:
+            if backend == "onnx":
+                return CrossEncoder(model_name, max_length=max_length, backend="onnx")
+            from sentence_transformers import export_dynamic_quantized_onnx_model
+
+            return _quantized(
+                CrossEncoder,
+                export_dynamic_quantized_onnx_model,
+                model_name,
+                _export_dir(None, model_name, "reranker"),
+                max_length=max_length,
+            )
+        except Exception as exc:
+            logger.warning("Falling back to torch for %s, %s backend unavailable: %s", model_name, backend, exc)
+    return CrossEncoder(model_name, max_length=max_length)
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+_SAMPLE_PAGES = int(os.getenv("MANUAL_PREFLIGHT_SAMPLES", "24"))
+_HISTORY_LIMIT = 200
+_TEXT_BYTES_PER_PAGE = 3000
+
+# Timeout = max(floor, predicted * factor + slack), capped at MANUAL_INGEST_TIMEOUT_MAX.
+TIMEOUT_FACTOR = float(os.getenv("MANUAL_INGEST_TIMEOUT_FACTOR", "3.0"))
+TIMEOUT_SLACK = 30.0
+TIMEOUT_MAX = float(os.getenv("MANUAL_INGEST_TIMEOUT_MAX", "1800"))
+
+# Feature order: intercept, text pages, OCR pages, embedded images.
+_PRIOR_SECONDS = (5.0, 0.05, 1.5, 0.01)
+_PRIOR_MEMORY_MB = (150.0, 0.2, 2.0, 0.05)
+# Ridge strength pulling calibrated weights towards the priors; keeps a handful
+# of noisy timings from producing absurd predictions.
+_RIDGE = 5.0
+
+
+@dataclass
+class PreflightReport:
+    page_count: int
+    sampled_pages: int
+    text_pages: float
+    ocr_pages: float
+    image_count: float
+    file_size_mb: float
+
+    def features(self, ocr_enabled: bool = True) -> List[float]:
+        ocr_pages = self.ocr_pages if ocr_enabled else 0.0
+        return [1.0, self.text_pages, ocr_pages, self.image_count]
+
+
+@dataclass
+class IngestionEstimate:
+    seconds: float
+    memory_mb: float
+    timeout: float
+    report: PreflightReport
+
+
+def preflight(path: Path) -> PreflightReport:
+    """Sample pages of a manual to estimate how much text extraction and OCR it needs."""
+    path = Path(path)
+    try:
+        size_bytes = path.stat().st_size
+    except OSError:
+        size_bytes = 0
+    size_mb = size_bytes / (1024 * 1024)
+
+    if path.suffix.lower() != ".pdf":
+        pages = max(1.0, size_bytes / _TEXT_BYTES_PER_PAGE)
+        return PreflightReport(0, 0, pages, 0.0, 0.0, size_mb)
+
+    try:
+        import fitz  # type: ignore
+    except ImportError as exc:
+        logger.warning("PyMuPDF not available for ingestion preflight: %s", exc)
+        return PreflightReport(0, 0, 0.0, 0.0, 0.0, size_mb)
+
+    try:
+        with fitz.open(path) as pdf:
+            total_pages = pdf.page_count
+            if total_pages == 0:
+                return PreflightReport(0, 0, 0.0, 0.0, 0.0, size_mb)
+            step = max(1, total_pages // max(1, _SAMPLE_PAGES))
+            sampled = list(range(0, total_pages, step))[:_SAMPLE_PAGES]
+            textless = 0
+            images = 0
+            for index in sampled:
+                page = pdf.load_page(index)
+                if not page.get_text("text").strip():
+                    textless += 1
+                images += len(page.get_images(full=False))
+    except Exception as exc:  # pragma: no cover - defensive
+        logger.warning("Preflight failed for %s: %s", path, exc)
+        return PreflightReport(0, 0, 0.0, 0.0, 0.0, size_mb)
+
+    scale = total_pages / len(sampled)
+    ocr_pages = textless * scale
+    return PreflightReport(
+        page_count=total_pages,
+        sampled_pages=len(sampled),
+        text_pages=total_pages - ocr_pages,
+        ocr_pages=ocr_pages,
+        image_count=images * scale,
+        file_size_mb=size_mb,
+    )
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MB (0.0 when unavailable)."""
+    try:
+        with open("/proc/self/statm", "r", encoding="ascii") as handle:
+            resident_pages = int(handle.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+class RssSampler:
+    """Samples this process's RSS on a background thread while in use; ``peak_mb`` is the highest value seen.
+
+    Catches short allocation spikes that a caller polling once a second between
+    other work would miss.
+    """
+
+    def __init__(self, interval: float = 0.2) -> None:
+        self.interval = interval
+        self.peak_mb = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self) -> None:
+        self.peak_mb = max(self.peak_mb, current_rss_mb())
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self) -> "RssSampler":
+        self._sample()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._sample()
+
+
+def _solve(matrix: List[List[float]], vector: List[float]) -> Optional[List[float]]:
+    """Solve a small dense linear system with Gaussian elimination."""
+    size = len(vector)
+    rows = [list(matrix[i]) + [vector[i]] for i in range(size)]
+    for col in range(size):
+        pivot = max(range(col, size), key=lambda r: abs(rows[r][col]))
+        if abs(rows[pivot][col]) < 1e-12:
+            return None
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        for r in range(size):
+            if r == col:
+                continue
+            factor = rows[r][col] / rows[col][col]
+            for c in range(col, size + 1):
+                rows[r][c] -= factor * rows[col][c]
+    return [rows[i][size] / rows[i][i] for i in range(size)]
+
+
+def _fit(samples: Sequence[Sequence[float]], targets: Sequence[float], prior: Sequence[float]) -> List[float]:
+    """Ridge regression towards ``prior``: (XᵀX + λI)w = Xᵀy + λ·prior."""
+    size = len(prior)
+    gram = [[_RIDGE if i == j else 0.0 for j in range(size)] for i in range(size)]
+    rhs = [_RIDGE * value for value in prior]
+    for features, target in zip(samples, targets):
+        for i in range(size):
+            rhs[i] += features[i] * target
+            for j in range(size):
+                gram[i][j] += features[i] * features[j]
+    weights = _solve(gram, rhs)
+    if weights is None:
+        return list(prior)
+    return [max(0.0, weight) for weight in weights]
+
+
+class IngestionCostModel:
+    """Predicts ingestion time and memory from a preflight report.
+
+    Starts from conservative priors and is recalibrated from the timings of
+    completed ingestions, which are appended to ``history_path``. Runs whose
+    memory use could not be attributed to the job are recorded without
+    ``memory_mb`` and only calibrate the time model.
+    """
+
+    def __init__(self, history_path: Path) -> None:
+        self.history_path = Path(history_path)
+        self._lock = threading.Lock()
+        self._history: List[Dict[str, object]] = self._load_history()
+        self._seconds_weights = list(_PRIOR_SECONDS)
+        self._memory_weights = list(_PRIOR_MEMORY_MB)
+        self._refit()
+
+    def _load_history(self) -> List[Dict[str, object]]:
+        if not self.history_path.exists():
+            return []
+        try:
+            data = json.loads(self.history_path.read_text(encoding="utf-8"))
+        except Exception as exc:  # pragma: no cover - defensive
+            logger.warning("Unable to read ingestion history: %s", exc)
+            return []
+        return [item for item in data.get("runs", []) if isinstance(item, dict)]
+
+    def _refit(self) -> None:
+        samples: List[List[float]] = []
+        seconds: List[float] = []
+        memory_samples: List[List[float]] = []
+        memory: List[float] = []
+        for run in self._history:
+            try:
+                features = [float(value) for value in run["features"]]  # type: ignore[union-attr]
+                run_seconds = float(run["seconds"])  # type: ignore[arg-type]
+            except (KeyError, TypeError, ValueError):
+                continue
+            samples.append(features)
+            seconds.append(run_seconds)
+            if run.get("memory_mb") is not None:
+                try:
+                    memory.append(float(run["memory_mb"]))  # type: ignore[arg-type]
+                except (TypeError, ValueError):
+                    continue
+                memory_samples.append(features)
+        self._seconds_weights = _fit(samples, seconds, _PRIOR_SECONDS)
+        self._memory_weights = _fit(memory_samples, memory, _PRIOR_MEMORY_MB)
+
+    def predict(self, report: PreflightReport, *, ocr_enabled: bool = True, timeout_floor: float = 0.0) -> IngestionEstimate:
+        features = report.features(ocr_enabled)
+        with self._lock:
+            seconds = sum(w * x for w, x in zip(self._seconds_weights, features))
+            memory_mb = sum(w * x for w, x in zip(self._memory_weights, features))
+        timeout = min(TIMEOUT_MAX, max(timeout_floor, seconds * TIMEOUT_FACTOR + TIMEOUT_SLACK))
+        return IngestionEstimate(seconds=seconds, memory_mb=memory_mb, timeout=timeout, report=report)
+
+    def record(self, report: PreflightReport, seconds: float, memory_mb: Optional[float], *, ocr_enabled: bool = True) -> None:
+        run = {
+            "features": report.features(ocr_enabled),
+            "seconds": round(seconds, 3),
+            "memory_mb": round(max(0.0, memory_mb), 1) if memory_mb is not None else None,
+            "report": asdict(report),
+        }
+        with self._lock:
+            self._history.append(run)
+            self._history = self._history[-_HISTORY_LIMIT:]
+            self._refit()
+            payload = json.dumps({"runs": self._history}, indent=2)
+        try:
+            self.history_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.history_path.with_suffix(".tmp")
+            tmp_path.write_text(payload, encoding="utf-8")
+            os.replace(tmp_path, self.history_path)
+        except Exception as exc:  # pragma: no cover - best effort persistence
+            logger.warning("Unable to persist ingestion history: %s", exc)
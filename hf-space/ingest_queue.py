@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+INGEST_CONCURRENCY = max(1, int(os.getenv("MANUAL_INGEST_CONCURRENCY", "1")))
+# Seconds of priority credit a queued job earns per second waited, so a large
+# manual is never starved indefinitely by a stream of small uploads.
+INGEST_AGING_RATE = float(os.getenv("MANUAL_INGEST_AGING", "0.5"))
+
+
+@dataclass
+class IngestionJob:
+    manual_id: str
+    cost: float
+    payload: Dict[str, object]
+    estimate: Dict[str, object] = field(default_factory=dict)
+    enqueued_at: float = field(default_factory=time.time)
+    sequence: int = 0
+
+
+class IngestionScheduler:
+    """Runs ingestion jobs on a bounded pool, shortest estimated job first.
+
+    Queued and running jobs are persisted to ``state_path`` so that work lost
+    to a restart can be resubmitted by the caller via :meth:`restore`.
+    """
+
+    def __init__(
+        self,
+        runner: Callable[[IngestionJob], None],
+        state_path: Path,
+        concurrency: int = INGEST_CONCURRENCY,
+    ) -> None:
+        self._runner = runner
+        self.state_path = Path(state_path)
+        self.concurrency = max(1, concurrency)
+        self._cond = threading.Condition()
+        self._queue: List[IngestionJob] = []
+        self._running: Dict[str, Tuple[IngestionJob, float]] = {}
+        self._sequence = 0
+        self._workers: List[threading.Thread] = []
+
+    def restore(self) -> List[IngestionJob]:
+        """Return jobs persisted by a previous process (not yet resubmitted)."""
+        if not self.state_path.exists():
+            return []
+        try:
+            data = json.loads(self.state_path.read_text(encoding="utf-8"))
+        except Exception as exc:  # pragma: no cover - defensive
+            logger.warning("Unable to read ingestion queue state: %s", exc)
+            return []
+        jobs: List[IngestionJob] = []
+        for item in data.get("jobs", []):
+            try:
+                jobs.append(IngestionJob(**item))
+            except TypeError:  # pragma: no cover - defensive
+                logger.warning("Skipping malformed queue entry: %s", item)
+        return jobs
+
+    def submit(
+        self,
+        manual_id: str,
+        cost: float,
+        payload: Dict[str, object],
+        estimate: Optional[Dict[str, object]] = None,
+    ) -> IngestionJob:
+        with self._cond:
+            self._queue = [job for job in self._queue if job.manual_id != manual_id]
+            self._sequence += 1
+            job = IngestionJob(
+                manual_id=manual_id,
+                cost=float(cost),
+                payload=payload,
+                estimate=dict(estimate or {}),
+                sequence=self._sequence,
+            )
+            self._queue.append(job)
+            self._persist_locked()
+            self._ensure_workers_locked()
+            self._cond.notify()
+        logger.info("Manual %s: queued for ingestion (estimated %.1fs, queue=%s)", manual_id, cost, len(self._queue))
+        return job
+
+    def cancel(self, manual_id: str) -> bool:
+        """Drop a job that has not started yet. Returns True if one was removed."""
+        with self._cond:
+            before = len(self._queue)
+            self._queue = [job for job in self._queue if job.manual_id != manual_id]
+            removed = len(self._queue) != before
+            if removed:
+                self._persist_locked()
+        return removed
+
+    def backlog_seconds(self) -> float:
+        """Estimated seconds of work queued or still running, per worker slot."""
+        with self._cond:
+            now = time.time()
+            remaining = sum(job.cost for job in self._queue)
+            remaining += sum(max(0.0, job.cost - (now - started)) for job, started in self._running.values())
+        return remaining / self.concurrency
+
+    def is_queued(self, manual_id: str) -> bool:
+        with self._cond:
+            return any(job.manual_id == manual_id for job in self._queue)
+
+    def queue_info(self, manual_id: str) -> Tuple[Optional[int], Optional[float]]:
+        """Return (queue position, ETA seconds) for a job; position 0 means running."""
+        with self._cond:
+            now = time.time()
+            running = self._running.get(manual_id)
+            if running is not None:
+                job, started_at = running
+                return 0, max(0.0, job.cost - (now - started_at))
+
+            ordered = self._ordered_locked(now)
+            if not any(job.manual_id == manual_id for job in ordered):
+                return None, None
+
+            # Simulate the pool: each slot frees up when its current job ends.
+            slots = sorted(max(0.0, job.cost - (now - started)) for job, started in self._running.values())
+            slots.extend([0.0] * (self.concurrency - len(slots)))
+            for position, job in enumerate(ordered, start=1):
+                slots.sort()
+                start = slots[0]
+                slots[0] = start + job.cost
+                if job.manual_id == manual_id:
+                    return position, start + job.cost
+        return None, None
+
+    def _priority(self, job: IngestionJob, now: float) -> Tuple[float, int]:
+        waited = max(0.0, now - job.enqueued_at)
+        return job.cost - waited * INGEST_AGING_RATE, job.sequence
+
+    def _ordered_locked(self, now: float) -> List[IngestionJob]:
+        return sorted(self._queue, key=lambda job: self._priority(job, now))
+
+    def _persist_locked(self) -> None:
+        jobs = [asdict(job) for job in self._queue]
+        jobs.extend(asdict(job) for job, _ in self._running.values())
+        try:
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.state_path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps({"jobs": jobs}, indent=2), encoding="utf-8")
+            os.replace(tmp_path, self.state_path)
+        except Exception as exc:  # pragma: no cover - best effort persistence
+            logger.warning("Unable to persist ingestion queue: %s", exc)
+
+    def _ensure_workers_locked(self) -> None:
+        self._workers = [worker for worker in self._workers if worker.is_alive()]
+        while len(self._workers) < self.concurrency:
+            worker = threading.Thread(
+                target=self._worker_loop,
+                name=f"ingest-worker-{len(self._workers)}",
+                daemon=True,
+            )
+            worker.start()
+            self._workers.append(worker)
+
+    def _worker_loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                now = time.time()
+                job = min(self._queue, key=lambda item: self._priority(item, now))
+                self._queue.remove(job)
+                self._running[job.manual_id] = (job, now)
+                self._persist_locked()
+            logger.info("Manual %s: ingestion job started (estimated %.1fs)", job.manual_id, job.cost)
+            try:
+                self._runner(job)
+            except Exception:  # pragma: no cover - runner reports its own failures
+                logger.exception("Manual %s: ingestion job raised", job.manual_id)
+            finally:
+                with self._cond:
+                    current = self._running.get(job.manual_id)
+                    if current is not None and current[0] is job:
+                        self._running.pop(job.manual_id, None)
+                    self._persist_locked()
@@ -8,7 +8,7 @@ from dataclasses import asdict, dataclass
 from enum import Enum
 from pathlib import Path
 import shutil
-from threading import Event, Lock
+from threading import Event, Lock, Thread
 from typing import Dict, List, Optional, Set
 from uuid import uuid4
 from collections import deque
@@ -34,10 +34,19 @@ _buffer_handler = _BufferLogHandler()
 _buffer_handler.setFormatter(logging.Formatter(LOG_FORMAT))
 logging.getLogger().addHandler(_buffer_handler)
 
-from fastapi import BackgroundTasks, FastAPI, File, Form, HTTPException, Response, UploadFile
+from fastapi import FastAPI, File, Form, Header, HTTPException, Request, Response, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
+from batching import EncodingCancelledError
+from ingest_estimator import IngestionCostModel, PreflightReport, RssSampler, current_rss_mb, preflight
+from ingest_queue import IngestionJob, IngestionScheduler
+from resource_governor import governor
+from sections import SECTIONS_FILE, SectionIndex
+from warning_index import WARNINGS_FILE, WarningIndex
+from uploads import ResumableUploadStore, UploadRejectedError, UploadSession, parse_content_range, stream_upload_to_path
+
 
 # Lazy imports - only load when needed to speed up startup
 # from document_loader import load_manual
@@ -51,13 +60,13 @@ load_dotenv(dotenv_path, override=True)
 logger = logging.getLogger(__name__)
 
 # Lazy loading functions
-def load_manual(path, *, cancel_callback=None, disable_ocr=False):
+def load_manual(path, *, cancel_callback=None, disable_ocr=False, sections=None, warnings=None):
     from document_loader import load_manual as _load_manual
-    return _load_manual(path, cancel_callback=cancel_callback, disable_ocr=disable_ocr)
+    return _load_manual(path, cancel_callback=cancel_callback, disable_ocr=disable_ocr, sections=sections, warnings=warnings)
 
-def make_rag_chain(retriever):
+def make_rag_chain(retriever, sections=None, warnings=None):
     from rag_chain import make_rag_chain as _make_rag_chain
-    return _make_rag_chain(retriever)
+    return _make_rag_chain(retriever, sections=sections, warnings=warnings)
 
 def build_vector_store(*args, **kwargs):
     from vector_store import build_vector_store as _build_vector_store
@@ -69,9 +78,21 @@ CORS_ALLOW_ORIGINS = os.getenv("CORS_ALLOW_ORIGINS", "*")
 ALLOWED_ORIGINS = ["*"] if CORS_ALLOW_ORIGINS == "*" else [origin.strip() for origin in CORS_ALLOW_ORIGINS.split(",") if origin.strip()]
 
 # Ingestion timeout and OCR control
+# Minimum per-job timeout; larger manuals get a timeout scaled from their preflight estimate
 MANUAL_INGESTION_TIMEOUT = float(os.getenv("MANUAL_INGESTION_TIMEOUT", "180"))  # 3 minutes
 MANUAL_DISABLE_OCR = os.getenv("MANUAL_DISABLE_OCR", "false").lower() in ("true", "1", "yes")
 
+# How long a replaced manual's vector store is kept after the swap, so chat
+# requests that already hold the old chain can finish before it is deleted.
+MANUAL_RETIRE_GRACE_SECONDS = float(os.getenv("MANUAL_RETIRE_GRACE_SECONDS", "30"))
+
+# Admission control (0 disables the check)
+MANUAL_INGEST_MAX_BACKLOG = float(os.getenv("MANUAL_INGEST_MAX_BACKLOG", "0"))  # seconds of queued work
+MANUAL_INGEST_MEMORY_BUDGET_MB = float(os.getenv("MANUAL_INGEST_MEMORY_BUDGET_MB", "0"))
+
+# Load models and run dummy batches in the background at startup; /ready reports 503 until done
+MANUAL_WARMUP = os.getenv("MANUAL_WARMUP", "true").lower() in ("true", "1", "yes")
+
 
 class ManualStatus(str, Enum):
     PROCESSING = "processing"
@@ -89,6 +110,7 @@ class ManualMetadata:
     brand: str
     model: Optional[str] = None
     year: Optional[str] = None
+    sha256: Optional[str] = None
 
 
 @dataclass
@@ -111,7 +133,17 @@ class ManualCancelledError(Exception):
         self.manual_id = manual_id
 
 
+class ManualAdmissionError(Exception):
+    def __init__(self, manual_id: str, reason: str, retry_after: Optional[int] = None) -> None:
+        super().__init__(f"Manual '{manual_id}' was not accepted: {reason}")
+        self.manual_id = manual_id
+        self.retry_after = retry_after
+
+
 class ManualManager:
+    # RSS with models loaded but no ingestion running; a sole job's memory is its peak above this
+    _memory_baseline: Optional[float] = None
+
     def __init__(
         self,
         default_manual_path: Path,
@@ -135,8 +167,11 @@ class ManualManager:
         except (PermissionError, OSError) as e:
             logger.warning(f"Could not create storage directory {self.storage_dir}: {e}")
         self.manifest_path = self.storage_dir / "manifest.json"
+        self._scheduler = IngestionScheduler(self._run_ingestion_job, self.storage_dir / "ingest_queue.json")
+        self._cost_model = IngestionCostModel(self.storage_dir / "ingest_history.json")
 
         self._load_manifest()
+        self._restore_queue()
 
         default_status = self._statuses.get(default_manual_id)
         if default_status is not ManualStatus.READY:
@@ -191,7 +226,11 @@ class ManualManager:
                 entry = ManualEntry(
                     metadata=meta,
                     vector_store=vector_store,
-                    chain=make_rag_chain(vector_store.as_retriever()),
+                    chain=make_rag_chain(
+                        vector_store.as_retriever(),
+                        sections=SectionIndex.load(Path(meta.persist_path) / SECTIONS_FILE),
+                        warnings=WarningIndex.load(Path(meta.persist_path) / WARNINGS_FILE),
+                    ),
                 )
             except Exception as exc:  # pragma: no cover - defensive
                 logger.warning("Failed to hydrate manual '%s': %s", meta.manual_id, exc)
@@ -204,6 +243,25 @@ class ManualManager:
             self._statuses[meta.manual_id] = ManualStatus.READY
             self._cancel_events[meta.manual_id] = Event()
 
+    def _restore_queue(self) -> None:
+        """Resubmit ingestion jobs that were queued or running when the process stopped."""
+        for job in self._scheduler.restore():
+            try:
+                meta = ManualMetadata(**job.payload)
+            except TypeError:  # pragma: no cover - defensive
+                logger.warning("Skipping malformed queued job: %s", job.payload)
+                continue
+            if not Path(meta.source_path).exists():
+                logger.warning("Manual %s: queued source %s is gone, dropping job", meta.manual_id, meta.source_path)
+                continue
+            with self._lock:
+                self._metas[meta.manual_id] = meta
+                self._statuses[meta.manual_id] = ManualStatus.PROCESSING
+                self._cancel_events[meta.manual_id] = Event()
+                self._cancelled.discard(meta.manual_id)
+            logger.info("Manual %s: restoring queued ingestion", meta.manual_id)
+            self._scheduler.submit(meta.manual_id, job.cost, job.payload, job.estimate)
+
     def _save_manifest(self) -> None:
         with self._lock:
             ready_entries = [asdict(entry.metadata) for entry in self._entries.values()]
@@ -226,6 +284,8 @@ class ManualManager:
             if cancel_event is not None:
                 cancel_event.set()
                 
+            self._scheduler.cancel(manual_id)
+
             # Always remove from tracking dicts when force=True
             entry = self._entries.pop(manual_id, None)
             meta = self._metas.pop(manual_id, None)
@@ -265,10 +325,29 @@ class ManualManager:
                 self._cancel_events[manual_id] = cancel_event
             cancel_event.set()
             self._cancelled.add(manual_id)
+            if self._scheduler.cancel(manual_id):
+                self._fail_locked(self._metas[manual_id], "Manual ingestion was cancelled by user.")
+                logger.info("Manual %s: removed from ingestion queue", manual_id)
+                return status
             self._set_status_message(manual_id, "Cancellation requested...")
             logger.info("Manual %s: cancel requested (status=%s)", manual_id, status)
             return status
 
+    def check_registration(self, manual_id: str, replace_existing: bool) -> None:
+        """Raise ValueError if ``register_manual`` would refuse this id (checked up front for resumable uploads)."""
+        with self._lock:
+            status = self._statuses.get(manual_id)
+        self._check_status(manual_id, status, replace_existing)
+
+    @staticmethod
+    def _check_status(manual_id: str, status: Optional[ManualStatus], replace_existing: bool) -> None:
+        if replace_existing:
+            return
+        if status is ManualStatus.PROCESSING:
+            raise ValueError(f"Manual '{manual_id}' is still processing.")
+        if status is ManualStatus.READY:
+            raise ValueError(f"Manual '{manual_id}' already exists.")
+
     def register_manual(
         self,
         manual_id: str,
@@ -278,36 +357,51 @@ class ManualManager:
         model: Optional[str] = None,
         year: Optional[str] = None,
         *,
-        background_tasks: Optional[BackgroundTasks] = None,
+        background: bool = False,
         replace_existing: bool = False,
+        sha256: Optional[str] = None,
+        install_path: Optional[Path] = None,
     ) -> ManualStatus:
+        """Register ``manual_path`` and start ingesting it.
+
+        With ``install_path`` the file is a staged upload: it is moved there only
+        once the registration is accepted, so a refused upload never replaces
+        the file a live version was built from.
+        """
         logger.info("Manual %s: register request (replace=%s, filename=%s)", manual_id, replace_existing, manual_path)
         manual_path = manual_path.resolve()
         persist_path = self._persist_path(manual_id)
 
-        existing_entry: Optional[ManualEntry] = None
+        estimate = None
+        if background:
+            estimate = self._cost_model.predict(
+                preflight(manual_path),
+                ocr_enabled=not MANUAL_DISABLE_OCR,
+                timeout_floor=MANUAL_INGESTION_TIMEOUT,
+            )
+            self._check_admission(manual_id, estimate.seconds, estimate.memory_mb)
 
         with self._lock:
             current_status = self._statuses.get(manual_id)
+            self._check_status(manual_id, current_status, replace_existing)
+            if install_path is not None:
+                install_path.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(manual_path, install_path)
+                manual_path = install_path.resolve()
             self._errors.pop(manual_id, None)
 
+            # A READY entry stays in self._entries and keeps answering chat
+            # requests until the replacement is ready (blue/green swap).
             if current_status is ManualStatus.PROCESSING:
-                if not replace_existing:
-                    raise ValueError(f"Manual '{manual_id}' is still processing.")
                 logger.info("Manual %s: cancelling in-flight ingestion prior to replace", manual_id)
                 previous_event = self._cancel_events.get(manual_id)
                 if previous_event is not None:
                     previous_event.set()
                 self._cancelled.add(manual_id)
-                existing_entry = self._entries.pop(manual_id, None)
                 self._metas.pop(manual_id, None)
                 self._statuses.pop(manual_id, None)
             elif current_status is ManualStatus.READY:
-                if not replace_existing:
-                    raise ValueError(f"Manual '{manual_id}' already exists.")
-                existing_entry = self._entries.pop(manual_id, None)
-                self._metas.pop(manual_id, None)
-                self._statuses.pop(manual_id, None)
+                logger.info("Manual %s: building replacement while the current version keeps serving", manual_id)
             elif current_status is ManualStatus.FAILED:
                 self._metas.pop(manual_id, None)
                 self._statuses.pop(manual_id, None)
@@ -329,45 +423,72 @@ class ManualManager:
                 brand=brand_value,
                 model=model_value,
                 year=year_value,
+                sha256=sha256,
             )
             self._metas[manual_id] = meta
             self._statuses[manual_id] = ManualStatus.PROCESSING
 
-        if existing_entry is not None:
-            try:
-                existing_entry.vector_store.delete_collection()
-            except Exception:  # pragma: no cover - best effort cleanup
-                pass
-            try:
-                existing_entry.vector_store._client.reset()
-            except Exception:  # pragma: no cover - best effort cleanup
-                pass
-            try:
-                old_root = Path(existing_entry.metadata.persist_path).parent
-                shutil.rmtree(old_root, ignore_errors=True)
-            except Exception:  # pragma: no cover - best effort cleanup
-                pass
-
-        if background_tasks is not None:
-            logger.info("Manual %s: queued for background ingestion", manual_id)
-            background_tasks.add_task(self._background_ingest, meta, cancel_event)
+        if estimate is not None:
+            logger.info(
+                "Manual %s: preflight %s pages (~%.0f need OCR), predicted %.1fs / %.0fMB, timeout %.0fs",
+                manual_id, estimate.report.page_count, estimate.report.ocr_pages,
+                estimate.seconds, estimate.memory_mb, estimate.timeout,
+            )
+            self._scheduler.submit(
+                manual_id,
+                estimate.seconds,
+                asdict(meta),
+                {"timeout": estimate.timeout, "memory_mb": estimate.memory_mb, "report": asdict(estimate.report)},
+            )
+            self._set_status_message(manual_id, "Queued for ingestion...")
         else:
             logger.info("Manual %s: ingesting synchronously", manual_id)
             self._ingest_manual(meta, cancel_event, recreate=True)
 
         return ManualStatus.PROCESSING
 
-    def _background_ingest(self, meta: ManualMetadata, cancel_event: Event) -> None:
+    def _check_admission(self, manual_id: str, seconds: float, memory_mb: float) -> None:
+        if MANUAL_INGEST_MEMORY_BUDGET_MB and memory_mb > MANUAL_INGEST_MEMORY_BUDGET_MB:
+            raise ManualAdmissionError(
+                manual_id,
+                f"predicted memory {memory_mb:.0f}MB exceeds the {MANUAL_INGEST_MEMORY_BUDGET_MB:.0f}MB budget",
+            )
+        if MANUAL_INGEST_MAX_BACKLOG:
+            backlog = self._scheduler.backlog_seconds()
+            if backlog + seconds > MANUAL_INGEST_MAX_BACKLOG:
+                raise ManualAdmissionError(
+                    manual_id,
+                    f"ingestion queue is full (~{backlog:.0f}s of pending work)",
+                    retry_after=int(backlog) + 1,
+                )
+
+    def _run_ingestion_job(self, job: IngestionJob) -> None:
+        """Scheduler entry point: run a queued job unless it was superseded or cancelled."""
+        with self._lock:
+            meta = self._metas.get(job.manual_id)
+            cancel_event = self._cancel_events.get(job.manual_id)
+        if meta is None or cancel_event is None or asdict(meta) != job.payload:
+            logger.info("Manual %s: skipping stale ingestion job", job.manual_id)
+            return
+        if cancel_event.is_set():
+            logger.info("Manual %s: skipping cancelled ingestion job", job.manual_id)
+            return
+        self._background_ingest(meta, cancel_event, job.estimate)
+
+    def _background_ingest(self, meta: ManualMetadata, cancel_event: Event, estimate: Optional[Dict[str, object]] = None) -> None:
         """Background worker with timeout protection."""
+        estimate = estimate or {}
+        timeout = float(estimate.get("timeout", MANUAL_INGESTION_TIMEOUT))
         logger.info("Manual %s: background ingestion started (timeout=%.0fs, ocr_disabled=%s)", 
-                    meta.manual_id, MANUAL_INGESTION_TIMEOUT, MANUAL_DISABLE_OCR)
+                    meta.manual_id, timeout, MANUAL_DISABLE_OCR)
         
         import threading
         result_container = [None]  # Store result or exception
         
         def worker():
             try:
-                self._ingest_manual(meta, cancel_event, recreate=True)
+                with governor.ingestion_job():
+                    self._ingest_manual(meta, cancel_event, recreate=True)
                 result_container[0] = ("success", None)
             except ManualCancelledError as exc:
                 logger.info("Manual '%s' ingestion was cancelled", meta.manual_id)
@@ -376,28 +497,123 @@ class ManualManager:
                 logger.exception("Background ingestion failed for manual '%s'", meta.manual_id)
                 result_container[0] = ("error", exc)
         
+        start_time = time.perf_counter()
+        # Only a job that runs alone owns the memory it adds
+        alone = governor.snapshot()["ingestion_jobs"] == 0
+        baseline = self.memory_baseline(current_rss_mb()) if alone else None
         thread = threading.Thread(target=worker, daemon=True)
-        thread.start()
-        thread.join(timeout=MANUAL_INGESTION_TIMEOUT)
+        deadline = start_time + timeout
+        with RssSampler() as sampler:
+            thread.start()
+            while thread.is_alive() and time.perf_counter() < deadline:
+                thread.join(timeout=min(1.0, max(0.0, deadline - time.perf_counter())))
+                alone = alone and governor.snapshot()["ingestion_jobs"] <= 1
+
+        if not thread.is_alive():
+            outcome = result_container[0]
+            if outcome is not None and outcome[0] == "success":
+                memory_mb = max(0.0, sampler.peak_mb - baseline) if alone and baseline is not None else None
+                if memory_mb is None:
+                    logger.info("Manual %s: overlapped another ingestion, calibrating time only", meta.manual_id)
+                self._record_ingestion_run(meta, estimate, time.perf_counter() - start_time, memory_mb)
+            return
+
+        # Timeout exceeded - force fail
+        cancel_event.set()
+        logger.error("Manual %s: TIMEOUT after %.0fs - forcing failure", meta.manual_id, timeout)
         
+        with self._lock:
+            self._fail_locked(
+                meta,
+                f"Processing timeout after {int(timeout)}s. "
+                f"PDF too complex for free tier. Try: 1) Force delete this job, "
+                f"2) Use text-only PDF, or 3) Set MANUAL_DISABLE_OCR=true",
+            )
+            self._cancelled.add(meta.manual_id)
+        
+        # Give 5s grace period for cleanup
+        thread.join(timeout=5.0)
         if thread.is_alive():
-            # Timeout exceeded - force fail
-            cancel_event.set()
-            logger.error("Manual %s: TIMEOUT after %.0fs - forcing failure", meta.manual_id, MANUAL_INGESTION_TIMEOUT)
-            
-            with self._lock:
-                self._statuses[meta.manual_id] = ManualStatus.FAILED
-                self._errors[meta.manual_id] = (
-                    f"Processing timeout after {int(MANUAL_INGESTION_TIMEOUT)}s. "
-                    f"PDF too complex for free tier. Try: 1) Force delete this job, "
-                    f"2) Use text-only PDF, or 3) Set MANUAL_DISABLE_OCR=true"
-                )
-                self._cancelled.add(meta.manual_id)
-            
-            # Give 5s grace period for cleanup
-            thread.join(timeout=5.0)
-            if thread.is_alive():
-                logger.warning("Manual %s: worker still hung after grace period", meta.manual_id)
+            logger.warning("Manual %s: worker still hung after grace period", meta.manual_id)
+
+    def set_memory_baseline(self, rss_mb: float) -> None:
+        """Record the idle RSS once models are warm (called after start-up warm-up)."""
+        self._memory_baseline = rss_mb
+        logger.info("Ingestion memory baseline: %.0f MB", rss_mb)
+
+    def memory_baseline(self, idle_rss_mb: float) -> float:
+        """The idle baseline; without a warm-up, the RSS before the first job that runs alone.
+
+        Measuring from here rather than from each job's start RSS keeps the
+        sample meaningful when RSS sits at its high-water mark: the allocator
+        keeps freed pages, so a later job can reuse them without growing RSS.
+        That makes later samples an upper bound, which is the safe side for
+        admission control.
+        """
+        if self._memory_baseline is None:
+            self.set_memory_baseline(idle_rss_mb)
+        return self._memory_baseline  # type: ignore[return-value]
+
+    def _record_ingestion_run(
+        self, meta: ManualMetadata, estimate: Dict[str, object], seconds: float, memory_mb: Optional[float]
+    ) -> None:
+        """Feed a completed ingestion back into the cost model."""
+        report = estimate.get("report")
+        if not isinstance(report, dict):
+            return
+        try:
+            self._cost_model.record(PreflightReport(**report), seconds, memory_mb, ocr_enabled=not MANUAL_DISABLE_OCR)
+        except TypeError:  # pragma: no cover - defensive
+            logger.warning("Manual %s: malformed preflight report, not recorded", meta.manual_id)
+
+    def _fail_locked(self, meta: ManualMetadata, message: str) -> None:
+        """Record a failed ingestion; caller holds self._lock.
+
+        If a previous version of the manual is still being served, the manual
+        reverts to it instead of going FAILED.
+        """
+        manual_id = meta.manual_id
+        if self._metas.get(manual_id) is not meta:
+            return  # superseded by a newer registration
+        live_entry = self._entries.get(manual_id)
+        if live_entry is None:
+            self._statuses[manual_id] = ManualStatus.FAILED
+            self._errors[manual_id] = message
+            return
+        self._metas[manual_id] = live_entry.metadata
+        self._statuses[manual_id] = ManualStatus.READY
+        self._errors[manual_id] = f"Replacement failed, still serving the previous version: {message}"
+
+    def _discard_version(self, meta: ManualMetadata, vector_store: Optional[object]) -> None:
+        """Delete the store a failed, cancelled or superseded ingestion left behind (never the live one)."""
+        with self._lock:
+            live_entry = self._entries.get(meta.manual_id)
+        if live_entry is not None and live_entry.metadata.persist_path == meta.persist_path:
+            return
+        if vector_store is not None:
+            self._retire_entry(ManualEntry(metadata=meta, chain=None, vector_store=vector_store), delay=0.0)
+        else:
+            shutil.rmtree(meta.persist_path, ignore_errors=True)
+
+    def _retire_entry(self, entry: ManualEntry, delay: Optional[float] = None) -> None:
+        """Drop a swapped-out vector store in the background after a grace period."""
+        import threading
+
+        def cleanup() -> None:
+            try:
+                entry.vector_store.delete_collection()
+            except Exception:  # pragma: no cover - best effort cleanup
+                pass
+            try:
+                entry.vector_store._client.reset()
+            except Exception:  # pragma: no cover - best effort cleanup
+                pass
+            shutil.rmtree(entry.metadata.persist_path, ignore_errors=True)
+            logger.info("Manual %s: retired %s", entry.metadata.manual_id, entry.metadata.persist_path)
+
+        timer = threading.Timer(MANUAL_RETIRE_GRACE_SECONDS if delay is None else delay, cleanup)
+        timer.daemon = True
+        timer.start()
 
     def _ingest_manual(self, meta: ManualMetadata, cancel_event: Event, recreate: bool = False) -> None:
         from document_loader import ManualLoadCancelledError  # Imported lazily to avoid circular deps
@@ -407,8 +623,17 @@ class ManualManager:
                     meta.manual_id, meta.source_path, MANUAL_DISABLE_OCR)
         self._set_status_message(meta.manual_id, "Loading manual text...")
 
+        vector_store = None
         try:
-            docs = load_manual(meta.source_path, cancel_callback=cancel_event.is_set, disable_ocr=MANUAL_DISABLE_OCR)
+            sections: List = []
+            warnings = WarningIndex()
+            docs = load_manual(
+                meta.source_path,
+                cancel_callback=cancel_event.is_set,
+                disable_ocr=MANUAL_DISABLE_OCR,
+                sections=sections,
+                warnings=warnings,
+            )
             if not docs:
                 raise ValueError("No readable content found in the supplied manual.")
 
@@ -427,8 +652,17 @@ class ManualManager:
                 persist_directory=str(persist_path),
                 collection_name=meta.collection_name,
                 recreate=recreate,
+                cancel_callback=lambda: cancel_event.is_set() or meta.manual_id in self._cancelled,
+                progress_callback=lambda done, total: self._set_status_message(
+                    meta.manual_id, f"Embedding chunks {done}/{total}..."
+                ),
             )
             logger.info("Manual %s: vector store built at %s", meta.manual_id, persist_path)
+            section_index = SectionIndex(sections)
+            if section_index:
+                section_index.save(persist_path / SECTIONS_FILE)
+            if warnings:
+                warnings.save(persist_path / WARNINGS_FILE)
             self._set_status_message(meta.manual_id, "Finalizing retrieval pipeline...")
 
             if cancel_event.is_set() or meta.manual_id in self._cancelled:
@@ -437,40 +671,51 @@ class ManualManager:
             entry = ManualEntry(
                 metadata=meta,
                 vector_store=vector_store,
-                chain=make_rag_chain(vector_store.as_retriever()),
+                chain=make_rag_chain(vector_store.as_retriever(), sections=section_index, warnings=warnings),
             )
 
             with self._lock:
-                self._entries[meta.manual_id] = entry
-                self._statuses[meta.manual_id] = ManualStatus.READY
+                superseded = self._metas.get(meta.manual_id) is not meta
+                previous_entry = None if superseded else self._entries.get(meta.manual_id)
+                if not superseded:
+                    self._entries[meta.manual_id] = entry
+                    self._statuses[meta.manual_id] = ManualStatus.READY
+
+            if superseded:
+                logger.info("Manual %s: ingestion superseded by a newer upload, discarding result", meta.manual_id)
+                self._discard_version(meta, vector_store)
+                return
 
             self._cancelled.discard(meta.manual_id)
             self._save_manifest()
+            if previous_entry is not None:
+                logger.info("Manual %s: swapped to new version, retiring %s", meta.manual_id, previous_entry.metadata.persist_path)
+                self._retire_entry(previous_entry)
             self._set_status_message(meta.manual_id, "Manual ready.")
             logger.info("Manual %s: ingestion completed in %.2fs", meta.manual_id, time.perf_counter() - start_time)
-        except ManualLoadCancelledError as exc:
-            logger.info("Manual %s: document loader cancelled ingestion (%s)", meta.manual_id, exc)
+        except (ManualLoadCancelledError, EncodingCancelledError) as exc:
+            logger.info("Manual %s: ingestion cancelled during loading/embedding (%s)", meta.manual_id, exc)
             cancel_event.set()
             self._cancelled.add(meta.manual_id)
             with self._lock:
-                self._statuses[meta.manual_id] = ManualStatus.FAILED
-                self._errors[meta.manual_id] = "Manual ingestion was cancelled by user."
+                self._fail_locked(meta, "Manual ingestion was cancelled by user.")
+            self._discard_version(meta, vector_store)
             raise ManualCancelledError(meta.manual_id) from exc
         except ManualCancelledError:
             logger.info("Manual %s: ingestion cancelled", meta.manual_id)
             cancel_event.set()
             self._cancelled.add(meta.manual_id)
             with self._lock:
-                self._statuses[meta.manual_id] = ManualStatus.FAILED
-                self._errors[meta.manual_id] = "Manual ingestion was cancelled by user."
+                self._fail_locked(meta, "Manual ingestion was cancelled by user.")
+            self._discard_version(meta, vector_store)
             raise
         except Exception as exc:
             logger.exception("Manual %s: ingestion failed: %s", meta.manual_id, exc)
             cancel_event.set()
             self._cancelled.discard(meta.manual_id)
             with self._lock:
-                self._statuses[meta.manual_id] = ManualStatus.FAILED
-                self._errors[meta.manual_id] = str(exc)[:512]
+                self._fail_locked(meta, str(exc)[:512])
+            self._discard_version(meta, vector_store)
             raise
         finally:
             cancel_event.clear()
@@ -481,9 +726,10 @@ class ManualManager:
             status = self._statuses.get(target_id)
             if status is None:
                 raise KeyError(target_id)
-            if status is not ManualStatus.READY:
+            # During a replacement the previous version is still in _entries.
+            entry = self._entries.get(target_id)
+            if entry is None:
                 raise ManualNotReadyError(target_id, status)
-            entry = self._entries[target_id]
         return entry.chain
 
     def get_status(self, manual_id: str) -> ManualStatus:
@@ -493,6 +739,15 @@ class ManualManager:
                 raise KeyError(manual_id)
             return status
 
+    def _queue_info(self, manual_id: str, status: ManualStatus) -> Dict[str, object]:
+        if status is not ManualStatus.PROCESSING:
+            return {"queue_position": None, "eta_seconds": None}
+        position, eta = self._scheduler.queue_info(manual_id)
+        return {
+            "queue_position": position,
+            "eta_seconds": round(eta, 1) if eta is not None else None,
+        }
+
     def get_manual_info(self, manual_id: str) -> Dict[str, object]:
         with self._lock:
             meta = self._metas.get(manual_id)
@@ -507,6 +762,8 @@ class ManualManager:
             "model": meta.model,
             "year": meta.year,
             "error": self._errors.get(manual_id),
+            "serving": manual_id in self._entries,
+            **self._queue_info(manual_id, status),
         }
 
     def list_manuals(self) -> List[Dict[str, object]]:
@@ -525,9 +782,12 @@ class ManualManager:
                         "model": meta.model,
                         "year": meta.year,
                         "error": self._errors.get(manual_id),
+                        "serving": manual_id in self._entries,
                     }
                 )
-            return infos
+        for info in infos:
+            info.update(self._queue_info(info["manual_id"], info["status"]))
+        return infos
 
 
 app = FastAPI()
@@ -547,6 +807,51 @@ async def root():
     return {"message": "Welcome to ManualAi API!", "status": "running"}
 
 
+_warmup_state: Dict[str, object] = {"status": "pending", "seconds": None, "error": None}
+
+
+def _warm_up_models() -> None:
+    """Load the embedding model (and reranker, if enabled) and prime inference before reporting ready."""
+    started = time.perf_counter()
+    try:
+        from reranker import get_reranker
+        from vector_store import warm_up
+
+        warm_up()
+        reranker = get_reranker()
+        if reranker is not None:
+            reranker.warm_up()
+        manual_manager.set_memory_baseline(current_rss_mb())
+        status = "ready"
+    except Exception as exc:
+        # A model that failed to load here will likely fail on first use too; stay out of rotation.
+        logger.exception("Model warm-up failed")
+        _warmup_state["error"] = str(exc)
+        status = "failed"
+    _warmup_state["seconds"] = round(time.perf_counter() - started, 2)
+    _warmup_state["status"] = status
+
+
+@app.on_event("startup")
+async def start_warmup() -> None:
+    from rag_chain import log_config
+
+    log_config()
+    if not MANUAL_WARMUP:
+        _warmup_state["status"] = "ready"
+        return
+    _warmup_state["status"] = "warming"
+    Thread(target=_warm_up_models, name="model-warmup", daemon=True).start()
+
+
+# Readiness endpoint - 503 until models are loaded (and if loading failed), so load balancers only route to warm instances
+@app.get("/ready")
+async def ready(response: Response) -> Dict[str, object]:
+    if _warmup_state["status"] != "ready":
+        response.status_code = 503
+    return dict(_warmup_state)
+
+
 DOC_PATH = Path(os.getenv("MANUAL_PATH", "../data/README.md")).resolve()  # Use README instead of HTML
 
 # Get directory paths from environment (can be overridden by startup script)
@@ -603,6 +908,8 @@ def _ensure_directory(path: Path, description: str) -> Path:
 UPLOAD_DIR = _ensure_directory(UPLOAD_DIR, "Upload directory")
 STORAGE_DIR = _ensure_directory(STORAGE_DIR, "Storage directory")
 
+upload_store = ResumableUploadStore(UPLOAD_DIR / ".sessions")
+
 # Skip default manual loading - let users upload their own
 manual_manager = ManualManager.__new__(ManualManager)
 manual_manager._lock = Lock()
@@ -616,7 +923,10 @@ manual_manager.default_manual_id = "default"
 manual_manager.upload_dir = UPLOAD_DIR
 manual_manager.storage_dir = STORAGE_DIR
 manual_manager.manifest_path = manual_manager.storage_dir / "manifest.json"
+manual_manager._scheduler = IngestionScheduler(manual_manager._run_ingestion_job, STORAGE_DIR / "ingest_queue.json")
+manual_manager._cost_model = IngestionCostModel(STORAGE_DIR / "ingest_history.json")
 manual_manager._load_manifest()
+manual_manager._restore_queue()
 
 
 class QueryRequest(BaseModel):
@@ -636,6 +946,9 @@ class ManualInfo(BaseModel):
     model: Optional[str] = None
     year: Optional[str] = None
     error: Optional[str] = None
+    serving: bool = False
+    queue_position: Optional[int] = None
+    eta_seconds: Optional[float] = None
 
 
 class ManualListResponse(BaseModel):
@@ -646,6 +959,36 @@ class ManualUploadResponse(ManualInfo):
     pass
 
 
+class UploadSessionRequest(BaseModel):
+    filename: str
+    size: int
+    brand: str
+    manual_id: Optional[str] = None
+    model: Optional[str] = None
+    year: Optional[str] = None
+    replace: bool = False
+
+
+class UploadSessionInfo(BaseModel):
+    upload_id: str
+    filename: str
+    size: int
+    offset: int
+    missing: List[List[int]]
+    complete: bool
+
+
+def _session_info(session: UploadSession) -> UploadSessionInfo:
+    return UploadSessionInfo(
+        upload_id=session.upload_id,
+        filename=session.filename,
+        size=session.total_size,
+        offset=session.offset,
+        missing=session.missing(),
+        complete=session.complete,
+    )
+
+
 @app.post("/api/chat", response_model=QueryResponse)
 async def chat(req: QueryRequest) -> QueryResponse:
     if not req.question.strip():
@@ -658,7 +1001,9 @@ async def chat(req: QueryRequest) -> QueryResponse:
         raise HTTPException(status_code=404, detail=f"Manual '{exc.args[0]}' not found.") from exc
 
     try:
-        resp = chain.invoke(req.question)
+        # Off the event loop so concurrent chats overlap (and their query embeddings batch)
+        with governor.serving_request():
+            resp = await run_in_threadpool(chain.invoke, req.question)
         return QueryResponse(answer=resp.content)
     except Exception as e:
         print(f"[ERROR] Chat endpoint error: {e}")
@@ -684,7 +1029,6 @@ async def get_manual(manual_id: str) -> ManualInfo:
 
 @app.post("/api/manuals", response_model=ManualUploadResponse, status_code=202)
 async def upload_manual(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     manual_id: Optional[str] = Form(None),
     brand: str = Form(...),
@@ -694,34 +1038,70 @@ async def upload_manual(
 ) -> ManualUploadResponse:
     manual_identifier = manual_id or f"manual-{uuid4().hex[:8]}"
 
-    content = await file.read()
-    if not content:
-        raise HTTPException(status_code=400, detail="Uploaded file is empty.")
-
     if replace and manual_id is None:
         raise HTTPException(status_code=400, detail="Manual ID is required when replace is enabled.")
 
-    dest_dir = UPLOAD_DIR / manual_identifier
-    dest_dir.mkdir(parents=True, exist_ok=True)
-    dest_path = dest_dir / file.filename
-    dest_path.write_bytes(content)
+    try:
+        manual_manager.check_registration(manual_identifier, replace)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    filename = Path(file.filename or "manual.pdf").name
+    staged_path = _staging_path(manual_identifier, filename)
+    try:
+        stored = await stream_upload_to_path(file, staged_path, declared_size=getattr(file, "size", None))
+    except UploadRejectedError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=str(exc)) from exc
+
+    return await _register_upload(manual_identifier, staged_path, filename, brand, model, year, replace, stored.sha256)
+
+
+def _staging_path(manual_identifier: str, filename: str) -> Path:
+    """Where an upload waits for registration; the live ``<manual_id>/<filename>`` is only replaced once accepted."""
+    return UPLOAD_DIR / manual_identifier / f".incoming-{uuid4().hex[:12]}-{filename}"
+
 
+async def _register_upload(
+    manual_identifier: str,
+    staged_path: Path,
+    filename: str,
+    brand: str,
+    model: Optional[str],
+    year: Optional[str],
+    replace: bool,
+    sha256: str,
+    *,
+    keep_file: bool = False,
+) -> ManualUploadResponse:
+    """Register a staged upload, installing it as ``<manual_id>/<filename>``; on failure the
+    staged file is deleted unless ``keep_file``."""
     try:
-        manual_manager.register_manual(
+        # Registration opens the PDF for preflight; keep that off the event loop
+        await run_in_threadpool(
+            manual_manager.register_manual,
             manual_identifier,
-            dest_path,
-            file.filename,
+            staged_path,
+            filename,
             brand,
             model,
             year,
-            background_tasks=background_tasks,
+            background=True,
             replace_existing=replace,
+            sha256=sha256,
+            install_path=UPLOAD_DIR / manual_identifier / filename,
         )
     except ValueError as exc:
-        dest_path.unlink(missing_ok=True)
+        if not keep_file:
+            staged_path.unlink(missing_ok=True)
         raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except ManualAdmissionError as exc:
+        if not keep_file:
+            staged_path.unlink(missing_ok=True)
+        headers = {"Retry-After": str(exc.retry_after)} if exc.retry_after else None
+        raise HTTPException(status_code=503, detail=str(exc), headers=headers) from exc
     except Exception as exc:
-        dest_path.unlink(missing_ok=True)
+        if not keep_file:
+            staged_path.unlink(missing_ok=True)
         message = str(exc)
         if len(message) > 256:
             message = message[:253] + '...'
@@ -731,6 +1111,100 @@ async def upload_manual(
     return ManualUploadResponse(**info)
 
 
+@app.post("/api/uploads", response_model=UploadSessionInfo, status_code=201)
+async def create_upload_session(req: UploadSessionRequest) -> UploadSessionInfo:
+    """Start a resumable upload; send the bytes with PUT and Content-Range, then finalize."""
+    if req.replace and req.manual_id is None:
+        raise HTTPException(status_code=400, detail="Manual ID is required when replace is enabled.")
+    if req.manual_id is not None:
+        # Refuse a doomed upload now rather than after the client has sent every byte
+        try:
+            manual_manager.check_registration(req.manual_id, req.replace)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+    fields = req.dict(exclude={"filename", "size"})
+    try:
+        session = upload_store.create(req.filename, req.size, fields)
+    except UploadRejectedError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=str(exc)) from exc
+    return _session_info(session)
+
+
+@app.get("/api/uploads/{upload_id}", response_model=UploadSessionInfo)
+async def get_upload_session(upload_id: str) -> UploadSessionInfo:
+    try:
+        return _session_info(upload_store.get(upload_id))
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail=f"Upload '{upload_id}' not found.") from exc
+
+
+@app.put("/api/uploads/{upload_id}", response_model=UploadSessionInfo)
+async def upload_chunk(
+    upload_id: str,
+    request: Request,
+    content_range: Optional[str] = Header(None),
+) -> UploadSessionInfo:
+    try:
+        start, end, total = parse_content_range(content_range)
+        session = upload_store.get(upload_id)
+        if total is not None and total != session.total_size:
+            raise UploadRejectedError("Content-Range total does not match the upload size.", status_code=416)
+        session = await upload_store.write_range(upload_id, start, end, request.stream())
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail=f"Upload '{upload_id}' not found.") from exc
+    except UploadRejectedError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=str(exc)) from exc
+    return _session_info(session)
+
+
+@app.post("/api/uploads/{upload_id}/finalize", response_model=ManualUploadResponse, status_code=202)
+async def finalize_upload(upload_id: str) -> ManualUploadResponse:
+    try:
+        session = upload_store.get(upload_id)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail=f"Upload '{upload_id}' not found.") from exc
+
+    fields = session.fields
+    manual_id = fields.get("manual_id")
+    manual_identifier = manual_id or f"manual-{uuid4().hex[:8]}"
+    staged_path = _staging_path(manual_identifier, session.filename)
+    try:
+        # Hashing up to the size limit is blocking work; keep it off the event loop
+        stored, session = await run_in_threadpool(upload_store.finalize, upload_id, staged_path)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail=f"Upload '{upload_id}' not found.") from exc
+    except UploadRejectedError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=str(exc)) from exc
+
+    try:
+        response = await _register_upload(
+            manual_identifier,
+            staged_path,
+            session.filename,
+            str(fields.get("brand") or ""),
+            fields.get("model"),
+            fields.get("year"),
+            bool(fields.get("replace")),
+            stored.sha256,
+            keep_file=True,
+        )
+    except HTTPException:
+        # Keep the uploaded bytes so the client can retry finalize (e.g. after a 503)
+        await run_in_threadpool(upload_store.rollback, upload_id, staged_path)
+        raise
+    upload_store.close(upload_id)
+    return response
+
+
+@app.delete("/api/uploads/{upload_id}", status_code=204)
+async def abort_upload(upload_id: str) -> Response:
+    try:
+        upload_store.abort(upload_id)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail=f"Upload '{upload_id}' not found.") from exc
+    return Response(status_code=204)
+
+
 @app.post("/api/manuals/{manual_id}/cancel", response_model=ManualInfo, status_code=202)
 async def cancel_manual(manual_id: str) -> ManualInfo:
     try:
@@ -750,6 +1224,12 @@ async def get_system_logs(limit: int = 200) -> Dict[str, List[str]]:
     return {"logs": list(_LOG_BUFFER)[start_index:]}
 
 
+@app.get("/api/system/resources")
+async def get_system_resources() -> Dict[str, object]:
+    """Current CPU split between chat serving and ingestion."""
+    return governor.snapshot()
+
+
 @app.delete("/api/manuals/{manual_id}", status_code=204)
 async def delete_manual(manual_id: str, force: bool = False) -> Response:
     """Delete a manual. Use ?force=true to forcefully remove stuck processing jobs."""
@@ -0,0 +1,388 @@
+from __future__ import annotations
+
+import csv
+import io
+import logging
+import os
+import re
+import shlex
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# auto picks tesserocr (in-process engines), then batch (one tesseract run per page group), then pytesseract
+OCR_BACKEND = os.getenv("MANUAL_OCR_BACKEND", "auto").lower()
+OCR_BATCH_PAGES = max(1, int(os.getenv("MANUAL_OCR_BATCH_PAGES", "8")))
+# Each tesseract run gets one OpenMP thread (parallelism comes from the worker count), so
+# one governor OCR slot is one core.
+_TESSERACT_OMP_LIMIT = "1"
+# How often a running tesseract batch checks for cancellation
+_POLL_SECONDS = 0.25
+
+
+class OCRCancelledError(Exception):
+    """Raised by :meth:`OCREngine.recognize` when its cancel callback fires mid-call."""
+
+
+def limit_tesseract_threads() -> None:
+    """Put OMP_THREAD_LIMIT in the environment once, before the first engine starts.
+
+    tesserocr's libtesseract reads it when its OpenMP runtime initialises and
+    pytesseract/batch subprocesses inherit it, so every backend is covered. torch
+    ships its own OpenMP runtime, which reads the variable when torch is
+    imported; importing torch first keeps the limit off the embedding model.
+    An explicit OMP_THREAD_LIMIT is left alone.
+    """
+    if "OMP_THREAD_LIMIT" in os.environ:
+        return
+    try:
+        import torch  # type: ignore  # noqa: F401
+    except ImportError:
+        pass
+    os.environ["OMP_THREAD_LIMIT"] = _TESSERACT_OMP_LIMIT
+
+
+def _check_cancel(cancel_callback: Optional[Callable[[], bool]]) -> None:
+    if cancel_callback is not None and cancel_callback():
+        raise OCRCancelledError("OCR cancelled")
+
+
+@dataclass
+class OCRResult:
+    text: str
+    # Mean word confidence (0-100), None when the engine could not report one.
+    confidence: Optional[float] = None
+
+
+def _mean(values: Sequence[float]) -> Optional[float]:
+    return sum(values) / len(values) if values else None
+
+
+def _config_value(config: str, flag: str, default: int) -> int:
+    match = re.search(rf"{flag}\s+(\d+)", config)
+    return int(match.group(1)) if match else default
+
+
+def _gray_image(png_bytes: bytes):
+    from PIL import Image  # type: ignore
+
+    with Image.open(io.BytesIO(png_bytes)) as img:
+        return img.convert("L")
+
+
+class OCREngine(ABC):
+    """Turns rendered page images into text.
+
+    ``batch_size`` is how many pages one :meth:`recognize` call should get;
+    callers group pages accordingly and run groups in parallel. Engines
+    check ``cancel_callback`` between pages, or while a batch runs, and
+    raise :class:`OCRCancelledError`.
+    """
+
+    name = "base"
+    batch_size = 1
+
+    def __init__(self, lang: str, config: str, timeout: float) -> None:
+        self.lang = lang
+        self.config = config
+        self.timeout = timeout
+
+    @abstractmethod
+    def recognize(self, images: Sequence[bytes], cancel_callback: Optional[Callable[[], bool]] = None) -> List[OCRResult]:
+        """One :class:`OCRResult` per image, in order."""
+
+
+class PytesseractEngine(OCREngine):
+    """One tesseract subprocess per page (the original behaviour)."""
+
+    name = "pytesseract"
+
+    def __init__(self, lang: str, config: str, timeout: float) -> None:
+        super().__init__(lang, config, timeout)
+        import pytesseract  # type: ignore
+
+        self._pytesseract = pytesseract
+
+    def recognize(self, images: Sequence[bytes], cancel_callback: Optional[Callable[[], bool]] = None) -> List[OCRResult]:
+        results: List[OCRResult] = []
+        for png_bytes in images:
+            _check_cancel(cancel_callback)
+            try:
+                data = self._pytesseract.image_to_data(
+                    _gray_image(png_bytes),
+                    lang=self.lang,
+                    config=self.config,
+                    timeout=self.timeout,
+                    output_type=self._pytesseract.Output.DICT,
+                )
+            except RuntimeError as exc:
+                logger.warning("OCR timed out: %s", exc)
+                results.append(OCRResult(""))
+                continue
+            lines: Dict[tuple, List[str]] = {}
+            confidences: List[float] = []
+            for i, word in enumerate(data["text"]):
+                conf = float(data["conf"][i])
+                if conf < 0 or not word.strip():
+                    continue
+                key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+                lines.setdefault(key, []).append(word)
+                confidences.append(conf)
+            text = "\n".join(" ".join(words) for _, words in sorted(lines.items()))
+            results.append(OCRResult(text, _mean(confidences)))
+        return results
+
+
+class TesserocrEngine(OCREngine):
+    """Long-lived in-process tesseract APIs, one per worker thread.
+
+    The language model is loaded once per thread instead of once per page, and
+    no process is spawned or temp image written.
+    """
+
+    name = "tesserocr"
+
+    def __init__(self, lang: str, config: str, timeout: float) -> None:
+        super().__init__(lang, config, timeout)
+        import tesserocr  # type: ignore
+
+        self._tesserocr = tesserocr
+        self._local = threading.local()
+        self._psm = _config_value(config, "--psm", 6)
+        self._oem = _config_value(config, "--oem", 1)
+
+    def _api(self):
+        api = getattr(self._local, "api", None)
+        if api is None:
+            api = self._tesserocr.PyTessBaseAPI(
+                lang=self.lang,
+                psm=self._tesserocr.PSM(self._psm),
+                oem=self._tesserocr.OEM(self._oem),
+            )
+            self._local.api = api
+        return api
+
+    def recognize(self, images: Sequence[bytes], cancel_callback: Optional[Callable[[], bool]] = None) -> List[OCRResult]:
+        api = self._api()
+        results: List[OCRResult] = []
+        for png_bytes in images:
+            if cancel_callback is not None and cancel_callback():
+                api.Clear()
+                raise OCRCancelledError("OCR cancelled")
+            api.SetImage(_gray_image(png_bytes))
+            # Recognize() returns False when the timeout (ms) expires.
+            if not api.Recognize(int(self.timeout * 1000)):
+                logger.warning("OCR timed out after %.0fs", self.timeout)
+                results.append(OCRResult(""))
+                continue
+            text = api.GetUTF8Text()
+            confidence = float(api.MeanTextConf()) if text.strip() else None
+            results.append(OCRResult(text, confidence))
+        api.Clear()
+        return results
+
+
+class BatchTesseractEngine(OCREngine):
+    """Runs tesseract once per group of pages using an image list file.
+
+    Process start-up and language-model load are paid per group rather than
+    per page. The timeout scales with the group size; when a group overruns,
+    its pages are retried one by one so a single pathological page only costs
+    its own timeout. The process is polled rather than waited on, so a
+    cancelled ingestion kills it instead of sitting out the timeout.
+    """
+
+    name = "batch"
+
+    def __init__(self, lang: str, config: str, timeout: float, batch_size: int = OCR_BATCH_PAGES) -> None:
+        super().__init__(lang, config, timeout)
+        binary = shutil.which(os.getenv("TESSERACT_CMD", "tesseract"))
+        if binary is None:
+            raise FileNotFoundError("tesseract binary not found on PATH")
+        self.binary = binary
+        self.batch_size = batch_size
+
+    def recognize(self, images: Sequence[bytes], cancel_callback: Optional[Callable[[], bool]] = None) -> List[OCRResult]:
+        if not images:
+            return []
+        try:
+            return self._run(images, cancel_callback)
+        except subprocess.TimeoutExpired:
+            if len(images) == 1:
+                logger.warning("OCR timed out after %.0fs", self.timeout)
+                return [OCRResult("")]
+            logger.warning("OCR batch of %s pages timed out; retrying pages individually", len(images))
+            return [result for png_bytes in images for result in self.recognize([png_bytes], cancel_callback)]
+
+    def _execute(self, command: List[str], timeout: float, cancel_callback: Optional[Callable[[], bool]]) -> None:
+        """Run tesseract to completion; kills it on timeout or cancellation."""
+        process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        deadline = time.monotonic() + timeout
+        try:
+            while True:
+                try:
+                    _, stderr = process.communicate(timeout=min(_POLL_SECONDS, max(0.0, deadline - time.monotonic())))
+                    break
+                except subprocess.TimeoutExpired:
+                    _check_cancel(cancel_callback)
+                    if time.monotonic() >= deadline:
+                        raise subprocess.TimeoutExpired(command, timeout) from None
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.communicate()
+        if process.returncode:
+            raise subprocess.CalledProcessError(process.returncode, command, stderr=stderr)
+
+    def _run(self, images: Sequence[bytes], cancel_callback: Optional[Callable[[], bool]] = None) -> List[OCRResult]:
+        with tempfile.TemporaryDirectory(prefix="manualai_ocr_") as workdir:
+            paths = []
+            for index, png_bytes in enumerate(images):
+                path = os.path.join(workdir, f"page{index:04d}.png")
+                with open(path, "wb") as handle:
+                    handle.write(png_bytes)
+                paths.append(path)
+            list_path = os.path.join(workdir, "pages.txt")
+            with open(list_path, "w", encoding="utf-8") as handle:
+                handle.write("\n".join(paths) + "\n")
+            outbase = os.path.join(workdir, "out")
+            command = [self.binary, list_path, outbase, "-l", self.lang, *shlex.split(self.config), "txt", "tsv"]
+            self._execute(command, self.timeout * len(images), cancel_callback)
+
+            with open(outbase + ".txt", encoding="utf-8") as handle:
+                # tesseract terminates every page's text with a form feed
+                pages = handle.read().split("\f")
+            confidences: Dict[int, List[float]] = {}
+            with open(outbase + ".tsv", encoding="utf-8") as handle:
+                for row in csv.DictReader(handle, delimiter="\t", quoting=csv.QUOTE_NONE):
+                    try:
+                        conf = float(row["conf"])
+                    except (TypeError, ValueError):
+                        continue
+                    if row.get("level") == "5" and conf >= 0 and (row.get("text") or "").strip():
+                        confidences.setdefault(int(row["page_num"]), []).append(conf)
+        return [
+            OCRResult(pages[index] if index < len(pages) else "", _mean(confidences.get(index + 1, [])))
+            for index in range(len(images))
+        ]
+
+
+def select_for_rerender(
+    confidences: Dict[int, Optional[float]],
+    min_confidence: float,
+    budget_seconds: Optional[float],
+    seconds_per_page: float,
+) -> List[int]:
+    """Pages to OCR again at a higher DPI, least confident first, within the remaining budget.
+
+    Pages without a confidence (cached or engine could not report one) are kept.
+    ``budget_seconds`` of None means unlimited.
+    """
+    low = sorted(
+        (conf, page) for page, conf in confidences.items() if conf is not None and conf < min_confidence
+    )
+    if budget_seconds is not None:
+        affordable = int(max(0.0, budget_seconds) // seconds_per_page) if seconds_per_page > 0 else len(low)
+        low = low[:affordable]
+    return sorted(page for _, page in low)
+
+
+def is_better_ocr(text: str, confidence: Optional[float], current_text: str, current_confidence: Optional[float]) -> bool:
+    """Whether a re-OCR result should replace the current one for the same page."""
+    if not text.strip():
+        return False
+    if not current_text.strip():
+        return True
+    if confidence is not None and current_confidence is not None:
+        return confidence > current_confidence
+    return len(text) > len(current_text)
+
+
+Box = Tuple[float, float, float, float]
+
+
+def _area(box: Box) -> float:
+    return max(0.0, box[2] - box[0]) * max(0.0, box[3] - box[1])
+
+
+def _intersection(a: Box, b: Box) -> float:
+    return _area((max(a[0], b[0]), max(a[1], b[1]), min(a[2], b[2]), min(a[3], b[3])))
+
+
+def select_image_regions(
+    page_box: Box,
+    image_boxes: Sequence[Box],
+    *,
+    min_side: float = 48.0,
+    max_page_fraction: float = 0.85,
+    max_regions: int = 8,
+) -> List[Box]:
+    """Image bounding boxes (PDF points) worth OCRing on a page that already has vector text.
+
+    Drops icons too small to hold readable text, full-page backgrounds (those
+    pages are handled by whole-page OCR), and boxes mostly covered by a larger
+    one; clips to the page and keeps the largest ``max_regions``.
+    """
+    page_area = _area(page_box)
+    candidates: List[Box] = []
+    for box in image_boxes:
+        clipped = (max(box[0], page_box[0]), max(box[1], page_box[1]), min(box[2], page_box[2]), min(box[3], page_box[3]))
+        width, height = clipped[2] - clipped[0], clipped[3] - clipped[1]
+        if width < min_side or height < min_side:
+            continue
+        if page_area and _area(clipped) > max_page_fraction * page_area:
+            continue
+        candidates.append(clipped)
+    candidates.sort(key=_area, reverse=True)
+    selected: List[Box] = []
+    for box in candidates:
+        if any(_intersection(box, kept) > 0.8 * _area(box) for kept in selected):
+            continue
+        selected.append(box)
+        if len(selected) >= max_regions:
+            break
+    return selected
+
+
+def novel_text(region_text: str, page_text: str, min_new_words: int = 2, max_overlap: float = 0.8) -> str:
+    """``region_text`` unless its words are already (mostly) in the page's vector text."""
+    words = re.findall(r"[a-z0-9]+", region_text.lower())
+    if len(words) < min_new_words:
+        return ""
+    known = set(re.findall(r"[a-z0-9]+", page_text.lower()))
+    overlap = sum(1 for word in words if word in known) / len(words)
+    return "" if overlap >= max_overlap else region_text
+
+
+_ENGINES = {
+    "tesserocr": TesserocrEngine,
+    "batch": BatchTesseractEngine,
+    "pytesseract": PytesseractEngine,
+}
+
+
+def create_engine(lang: str, config: str, timeout: float, backend: str = OCR_BACKEND) -> Optional[OCREngine]:
+    """Build the configured OCR engine, or the best available one for ``auto``."""
+    names = list(_ENGINES) if backend == "auto" else [backend]
+    limit_tesseract_threads()
+    for name in names:
+        engine_cls = _ENGINES.get(name)
+        if engine_cls is None:
+            logger.warning("Unknown OCR backend %r", name)
+            continue
+        try:
+            engine = engine_cls(lang, config, timeout)
+        except (ImportError, OSError) as exc:
+            logger.info("OCR backend %s unavailable: %s", name, exc)
+            continue
+        logger.info("Using OCR backend %s (batch of %s pages)", engine.name, engine.batch_size)
+        return engine
+    logger.warning("No OCR backend available (tried %s)", ", ".join(names))
+    return None
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import logging
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (position, normalised line); position counts from the top (0, 1, ...) or the bottom (-1, -2, ...)
+LineKey = Tuple[int, str]
+
+
+def normalize_line(line: str) -> str:
+    """Case- and number-insensitive form of a line, so "Page 12" and "Page 13" match."""
+    return re.sub(r"\s+", " ", re.sub(r"\d+", "#", line.lower())).strip()
+
+
+def _edge_positions(count: int, edge_lines: int) -> List[Tuple[int, int]]:
+    """(index, position) pairs for the first and last ``edge_lines`` lines of a page."""
+    top = [(index, index) for index in range(min(edge_lines, count))]
+    bottom = [(count + position, position) for position in range(-1, -min(edge_lines, count) - 1, -1)]
+    return top + bottom
+
+
+def find_boilerplate(
+    pages: Sequence[Sequence[str]],
+    *,
+    edge_lines: int = 3,
+    min_pages: int = 4,
+    min_fraction: float = 0.02,
+    max_length: int = 80,
+) -> Set[LineKey]:
+    """Lines that recur at the same position near the top or bottom of many pages.
+
+    Running headers, footers, page numbers and chapter titles sit in the first
+    or last few lines of a page; counting per position (rather than anywhere on
+    the page) keeps a repeated sentence in the body from being mistaken for one.
+    A key must appear on at least ``min_pages`` pages and ``min_fraction`` of all
+    pages; chapter titles only repeat within their chapter, hence the low default.
+    """
+    counts: Counter = Counter()
+    for lines in pages:
+        keys = set()
+        for index, position in _edge_positions(len(lines), edge_lines):
+            normalized = normalize_line(lines[index])
+            if normalized and len(normalized) <= max_length:
+                keys.add((position, normalized))
+        counts.update(keys)
+    threshold = max(min_pages, min_fraction * len(pages))
+    return {key for key, count in counts.items() if count >= threshold}
+
+
+def strip_boilerplate(lines: Sequence[str], boilerplate: Set[LineKey], *, edge_lines: int = 3) -> List[str]:
+    """``lines`` without the edge lines found by :func:`find_boilerplate`."""
+    drop = {
+        index
+        for index, position in _edge_positions(len(lines), edge_lines)
+        if (position, normalize_line(lines[index])) in boilerplate
+    }
+    return [line for index, line in enumerate(lines) if index not in drop]
+
+
+_DOT_LEADER = re.compile(r"(?:\.\s?){4,}|…{2,}|_{4,}")
+# A bare page reference at the end of a line: "Seat belts 34", "Airbags 2-14"; not "6.2" or "1,000"
+_TRAILING_PAGE = re.compile(r"(?:^|[\s.])(?<![\d.,])\d{1,4}(?:-\d{1,3})?$")
+_PAGE_LIST = re.compile(r"\d{1,4}(?:-\d{1,3})?\s*,\s*\d{1,4}(?:-\d{1,3})?$")
+
+
+def navigation_features(lines: Sequence[str], short_length: int = 60) -> Dict[str, float]:
+    """Per-line fractions that separate contents/index pages from body text."""
+    lines = [line.strip() for line in lines if line.strip()]
+    total = len(lines) or 1
+    words = [re.sub(r"[^a-z]", "", line.lower()) for line in lines]
+    keyed = [word for word in words if word]
+    ordered = sum(1 for first, second in zip(keyed, keyed[1:]) if first[:2] <= second[:2])
+    refs = [int(match.group(0).strip(" .").split("-")[0]) for match in map(_TRAILING_PAGE.search, lines) if match]
+    ascending = sum(1 for first, second in zip(refs, refs[1:]) if first <= second)
+    return {
+        "lines": float(len(lines)),
+        "dot_leaders": sum(1 for line in lines if _DOT_LEADER.search(line)) / total,
+        "page_refs": sum(1 for line in lines if _TRAILING_PAGE.search(line)) / total,
+        "page_lists": sum(1 for line in lines if _PAGE_LIST.search(line)) / total,
+        "short_lines": sum(1 for line in lines if len(line) <= short_length) / total,
+        "alphabetical": ordered / max(1, len(keyed) - 1),
+        # Contents pages list their page numbers in order; spec tables and indexes don't
+        "ascending": ascending / (len(refs) - 1) if len(refs) >= 4 else 0.0,
+    }
+
+
+def classify_navigation_page(lines: Sequence[str], *, min_lines: int = 8) -> Optional[str]:
+    """``"toc"`` or ``"index"`` for table-of-contents / alphabetical-index pages, else None.
+
+    Both are dense with page references on short lines; contents pages have
+    dot leaders or page numbers in ascending order, index pages run
+    alphabetically and list several pages per entry. Thresholds are deliberately strict: dropping a real
+    page (e.g. a specification table full of numbers) costs more than
+    indexing a contents page.
+    """
+    features = navigation_features(lines)
+    if features["lines"] < min_lines or features["short_lines"] < 0.6:
+        return None
+    if features["dot_leaders"] >= 0.25 or (features["page_refs"] >= 0.4 and features["ascending"] >= 0.9):
+        return "toc"
+    if features["page_refs"] >= 0.4 and (features["alphabetical"] >= 0.8 or features["page_lists"] >= 0.2):
+        return "index"
+    return None
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import logging
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Box = Tuple[float, float, float, float]
+
+
+@dataclass
+class TextSpan:
+    text: str
+    size: float
+    bold: bool
+
+
+@dataclass
+class TextLine:
+    bbox: Box
+    spans: List[TextSpan]
+
+    @property
+    def text(self) -> str:
+        return "".join(span.text for span in self.spans)
+
+
+@dataclass
+class TextBlock:
+    bbox: Box
+    text: str
+    lines: List[TextLine] = field(default_factory=list)
+
+
+@dataclass
+class PageInfo:
+    number: int  # 1-based
+    width: float
+    height: float
+    blocks: List[TextBlock] = field(default_factory=list)
+    image_boxes: List[Box] = field(default_factory=list)
+
+    @property
+    def box(self) -> Box:
+        return (0.0, 0.0, self.width, self.height)
+
+    @property
+    def text(self) -> str:
+        return "\n".join(block.text for block in self.blocks)
+
+    @property
+    def has_text(self) -> bool:
+        return any(block.text.strip() for block in self.blocks)
+
+
+class PageModel:
+    """One parse of a PDF shared by every extraction stage.
+
+    Holds the open PyMuPDF document (for rendering) plus per-page text blocks
+    (down to span font size and weight) and image boxes, computed in a single
+    pass so later stages - OCR target detection, region OCR, heading-based
+    sections, fallbacks - read the model instead of reparsing.
+    ``ocr`` memoises OCR output per page so a page is never OCRed twice per load.
+    """
+
+    def __init__(self, pdf, pages: List[PageInfo]) -> None:
+        self.pdf = pdf
+        self.pages = pages
+        self.ocr: Dict[int, object] = {}
+
+    @property
+    def name(self) -> str:
+        return getattr(self.pdf, "name", "")
+
+    @property
+    def page_count(self) -> int:
+        return len(self.pages)
+
+    def page(self, number: int) -> PageInfo:
+        return self.pages[number - 1]
+
+    def text_pages(self) -> List[int]:
+        return [page.number for page in self.pages if page.has_text]
+
+    def textless_pages(self) -> List[int]:
+        return [page.number for page in self.pages if not page.has_text]
+
+    @classmethod
+    def from_document(cls, pdf, cancel_callback: Optional[Callable[[], None]] = None) -> "PageModel":
+        """Build the model from an open fitz document; ``cancel_callback`` raises to abort."""
+        pages: List[PageInfo] = []
+        for index in range(pdf.page_count):
+            if cancel_callback is not None:
+                cancel_callback()
+            page = pdf.load_page(index)
+            rect = page.rect
+            # One "dict" extraction gives block text and span fonts; get_text("text") is just these blocks joined.
+            textpage = page.get_textpage()
+            blocks = []
+            for block in page.get_text("dict", textpage=textpage).get("blocks", []):
+                if block.get("type", 0) != 0:
+                    continue
+                lines = [_text_line(line) for line in block.get("lines", [])]
+                text = "\n".join(line.text for line in lines).strip()
+                if text:
+                    blocks.append(TextBlock(tuple(block["bbox"]), text, lines))
+            try:
+                image_boxes = [tuple(info["bbox"]) for info in page.get_image_info()]
+            except Exception as exc:  # pragma: no cover
+                logger.debug("No image info for page %s: %s", index + 1, exc)
+                image_boxes = []
+            pages.append(PageInfo(index + 1, rect.width, rect.height, blocks, image_boxes))
+        return cls(pdf, pages)
+
+
+def _text_line(line: dict) -> TextLine:
+    spans = [
+        TextSpan(
+            span.get("text", ""),
+            float(span.get("size", 0.0)),
+            # Flag bit 16 is bold; some fonts only say so in their name
+            bool(span.get("flags", 0) & 16) or "bold" in span.get("font", "").lower(),
+        )
+        for span in line.get("spans", [])
+    ]
+    return TextLine(tuple(line["bbox"]), spans)
+
+
+@contextmanager
+def open_page_model(path, cancel_callback: Optional[Callable[[], None]] = None) -> Iterator[Optional[PageModel]]:
+    """Open ``path`` once with PyMuPDF and yield its page model (None without PyMuPDF)."""
+    try:
+        import fitz  # type: ignore
+    except ImportError as exc:
+        logger.warning("PyMuPDF not available for the page model: %s", exc)
+        yield None
+        return
+    with fitz.open(path) as pdf:
+        model = PageModel.from_document(pdf, cancel_callback)
+        logger.info("PDF %s: page model built for %s pages (%s with text)", path, model.page_count, len(model.text_pages()))
+        yield model
@@ -1,6 +1,13 @@
 from typing import Any, Dict, List, Optional, Set, Tuple
+import logging
 import re
 import os
+from types import SimpleNamespace
+
+from reranker import get_reranker
+from warning_index import format_answer
+
+logger = logging.getLogger(__name__)
 
 FALLBACK_MESSAGE = "I don't have that information in this manual. Could you rephrase your question or ask about something else?"
 
@@ -9,11 +16,15 @@ USE_LLM = os.getenv("MANUAL_USE_LLM", "true").lower() == "true"
 GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
 USE_GROQ = bool(GROQ_API_KEY)  # Use Groq if key is available
 
-# Debug: Print configuration at startup
-print(f"[STARTUP] LLM Configuration:")
-print(f"[STARTUP] USE_LLM = {USE_LLM}")
-print(f"[STARTUP] USE_GROQ = {USE_GROQ}")
-print(f"[STARTUP] Groq API Key present = {bool(GROQ_API_KEY)} (length: {len(GROQ_API_KEY) if GROQ_API_KEY else 0})")
+
+def log_config() -> None:
+    """Log the LLM configuration once the service starts (not at import time)."""
+    logger.info(
+        "LLM configuration: USE_LLM=%s USE_GROQ=%s groq_key_present=%s",
+        USE_LLM,
+        USE_GROQ,
+        bool(GROQ_API_KEY),
+    )
 
 # Common stop words to filter out for better keyword extraction
 STOP_WORDS = {
@@ -30,6 +41,20 @@ STOP_WORDS = {
 }
 
 
+def _page_reference(metadata: Dict[str, Any]) -> Optional[str]:
+    """A chunk's page citation ("Page 12", "Pages 12-13") from its page span, merged page list or single page."""
+    start, end = metadata.get("start_page"), metadata.get("end_page")
+    if start is not None and end is not None and str(start) != str(end):
+        return f"Pages {start}-{end}"
+    pages = [part.strip() for part in str(metadata.get("pages") or "").split(",") if part.strip()]
+    if len(pages) > 1:
+        return f"Pages {', '.join(pages)}"
+    for key in ("start_page", "page_number", "page"):
+        if metadata.get(key) is not None:
+            return f"Page {metadata[key]}"
+    return f"Page {pages[0]}" if pages else None
+
+
 class SimpleResponse:
     def __init__(self, content: str):
         self.content = content
@@ -523,10 +548,35 @@ Help this person understand their car manual. Base your answer on the manual con
         return None
 
 
-def make_rag_chain(retriever):
+def _warning_docs(entries: List[Any]) -> List[Any]:
+    """Message-index hits as context documents for the answer step."""
+    return [
+        SimpleNamespace(
+            page_content=f"\"{entry.message}\": {entry.context}",
+            metadata={"page_number": ",".join(str(page) for page in entry.pages), "warning": entry.message},
+        )
+        for entry in entries
+    ]
+
+
+def make_rag_chain(retriever, sections=None, warnings=None):
     class Chain:
-        def __init__(self, retriever):
+        def __init__(self, retriever, sections=None, warnings=None):
             self.retriever = retriever
+            self.sections = sections
+            self.warnings = warnings
+
+        def _retrieve(self, query: str, section_ids: List[int]) -> List[Any]:
+            # Section-targeted questions search only the matching sections first
+            vectorstore = getattr(self.retriever, "vectorstore", None)
+            if section_ids and vectorstore is not None:
+                try:
+                    docs = vectorstore.similarity_search(query, k=6, filter={"section_id": {"$in": section_ids}})
+                    if len(docs) >= 3:
+                        return docs
+                except Exception as exc:
+                    logger.warning("Section-filtered search failed, searching the whole manual: %s", exc)
+            return list(self.retriever.invoke(query))[:6]
 
         def invoke(self, question: str):
             # Handle chitchat naturally
@@ -536,21 +586,39 @@ def make_rag_chain(retriever):
             
             # Clean and normalize the question
             question = question.strip()
+
+            # A question that is just a dashboard message or indicator name is answered from the
+            # message index; one that merely mentions a message gets its explanation as extra context
+            warning_hits: List[Any] = []
+            if self.warnings:
+                direct = [entry for entry in self.warnings.direct_matches(question) if entry.context]
+                if direct:
+                    return SimpleResponse(format_answer(direct[:2]))
+                warning_hits = _warning_docs([entry for entry in self.warnings.lookup(question) if entry.context][:2])
             
             # Expand query with synonyms for better retrieval
             expanded_queries = _expand_query(question)
             
             # Retrieve documents using multiple query variations for better context
+            section_ids = self.sections.match(question) if self.sections is not None else []
             all_docs = []
             for query in expanded_queries:
-                docs = list(self.retriever.invoke(query))[:6]
+                docs = self._retrieve(query, section_ids)
                 all_docs.extend(docs)
             
             # Remove duplicates
             unique_docs = _deduplicate_docs(all_docs)
             
+            # Optional cross-encoder reranking of the top candidates
+            try:
+                reranker = get_reranker()
+                if reranker is not None:
+                    unique_docs = reranker.rerank(question, unique_docs)
+            except Exception as exc:
+                logger.warning("Reranking failed, using retrieval order: %s", exc)
+
             # Get more context for LLM to understand better
-            final_docs = unique_docs[:10]
+            final_docs = (warning_hits + unique_docs)[:10]
             
             if not final_docs:
                 return SimpleResponse(FALLBACK_MESSAGE)
@@ -569,8 +637,9 @@ def make_rag_chain(retriever):
                     
                     # Build reference information from metadata
                     ref_info = []
-                    if "page_number" in metadata:
-                        ref_info.append(f"Page {metadata['page_number']}")
+                    pages = _page_reference(metadata)
+                    if pages:
+                        ref_info.append(pages)
                     if "section" in metadata:
                         ref_info.append(f"Section: {metadata['section']}")
                     if "procedure" in metadata:
@@ -617,4 +686,4 @@ def make_rag_chain(retriever):
 
             return SimpleResponse(FALLBACK_MESSAGE)
 
-    return Chain(retriever)
+    return Chain(retriever, sections, warnings)
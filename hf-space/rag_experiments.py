@@ -18,6 +18,7 @@ from pathlib import Path
 from typing import List, Dict, Tuple
 import chromadb
 from chromadb.config import Settings
+from bulk_embedding import encode_chunks
 from sentence_transformers import SentenceTransformer
 from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
@@ -151,19 +152,15 @@ class SemanticRetriever:
             page = chunk.metadata.get("page", "unknown")
             metadatas.append({"page": str(page)})
         
-        # Generate embeddings (in batches to avoid memory issues)
+        # Generate embeddings, then add to ChromaDB in batches to avoid memory issues
+        all_embeddings = encode_chunks(self.embedding_model, texts)
         batch_size = 100
         for i in range(0, len(texts), batch_size):
             batch_texts = texts[i:i+batch_size]
             batch_ids = ids[i:i+batch_size]
             batch_metadatas = metadatas[i:i+batch_size]
             
-            # Encode texts to embeddings
-            embeddings = self.embedding_model.encode(
-                batch_texts,
-                show_progress_bar=False,
-                convert_to_numpy=True
-            ).tolist()
+            embeddings = all_embeddings[i:i+batch_size]
             
             # Add to ChromaDB
             self.collection.add(
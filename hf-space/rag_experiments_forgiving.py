@@ -22,6 +22,7 @@ from collections import Counter
 
 import chromadb
 from chromadb.config import Settings
+from bulk_embedding import encode_chunks
 from sentence_transformers import SentenceTransformer, CrossEncoder
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
@@ -153,6 +154,7 @@ class ForgivingRAG:
             metadata={"hnsw:space": "cosine"}
         )
         
+        all_embeddings = encode_chunks(self.embedding_model, chunk_texts)
         batch_size = 32
         for i in range(0, len(chunks), batch_size):
             batch_chunks = chunks[i:i+batch_size]
@@ -160,11 +162,7 @@ class ForgivingRAG:
             batch_ids = [f"chunk_{i+j}" for j in range(len(batch_chunks))]
             batch_metadatas = [{"page": doc.metadata.get("page", -1)} for doc in batch_chunks]
             
-            embeddings = self.embedding_model.encode(
-                batch_texts,
-                show_progress_bar=False,
-                convert_to_numpy=True
-            ).tolist()
+            embeddings = all_embeddings[i:i+batch_size]
             
             self.collection.add(
                 embeddings=embeddings,
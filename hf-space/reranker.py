@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from batching import MicroBatcher
+from inference_backend import load_cross_encoder
+
+logger = logging.getLogger(__name__)
+
+# Cross-encoder reranking of retrieved chunks (off by default; adds ~10-50 ms per query on CPU)
+RERANK_ENABLED = os.getenv("MANUAL_RERANK", "false").lower() in ("true", "1", "yes")
+RERANKER_MODEL = os.getenv("MANUAL_RERANKER_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+# Only the top candidates from retrieval are scored; the rest keep their retrieval order.
+RERANK_CANDIDATES = int(os.getenv("MANUAL_RERANK_CANDIDATES", "16"))
+# Token cap per (question, chunk) pair; chunks beyond it rarely change the ranking.
+RERANK_MAX_LENGTH = int(os.getenv("MANUAL_RERANK_MAX_LENGTH", "256"))
+RERANK_CACHE_SIZE = int(os.getenv("MANUAL_RERANK_CACHE_SIZE", "4096"))
+RERANK_BATCH_MAX = int(os.getenv("MANUAL_RERANK_BATCH_MAX", "64"))
+RERANK_BATCH_WAIT_MS = float(os.getenv("MANUAL_RERANK_BATCH_WAIT_MS", "4"))
+
+Pair = Tuple[str, str]
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def chunk_id(doc: Any) -> str:
+    """Content hash: the score depends only on the text the model sees, wherever the chunk came from."""
+    return _digest(getattr(doc, "page_content", ""))
+
+
+class ScoreCache:
+    """Thread-safe LRU of (question hash, chunk id) -> relevance score."""
+
+    def __init__(self, max_size: int = RERANK_CACHE_SIZE) -> None:
+        self.max_size = max_size
+        self._scores: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[str, str]) -> Optional[float]:
+        with self._lock:
+            score = self._scores.get(key)
+            if score is None:
+                self.misses += 1
+                return None
+            self._scores.move_to_end(key)
+            self.hits += 1
+            return score
+
+    def put(self, key: Tuple[str, str], score: float) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._scores[key] = score
+            self._scores.move_to_end(key)
+            while len(self._scores) > self.max_size:
+                self._scores.popitem(last=False)
+
+
+class Reranker:
+    """Reorders retrieved chunks by cross-encoder score.
+
+    ``score_fn`` scores a list of (question, passage) pairs. Pairs from
+    concurrent requests are coalesced by a :class:`MicroBatcher`, and scores
+    are cached per (question, chunk) so repeated questions skip the model.
+    """
+
+    def __init__(
+        self,
+        score_fn: Callable[[List[Pair]], Sequence[float]],
+        *,
+        candidates: int = RERANK_CANDIDATES,
+        cache: Optional[ScoreCache] = None,
+        max_batch: int = RERANK_BATCH_MAX,
+        max_wait_ms: float = RERANK_BATCH_WAIT_MS,
+    ) -> None:
+        self.candidates = max(1, candidates)
+        self.cache = cache if cache is not None else ScoreCache()
+        self._batcher = MicroBatcher(
+            lambda pairs: [float(score) for score in score_fn(pairs)],
+            max_batch=max_batch,
+            max_wait_ms=max_wait_ms,
+            name="reranker",
+        )
+
+    def scores(self, question: str, docs: Sequence[Any]) -> List[float]:
+        # The exact question the model scores; casing can change a cross-encoder's output
+        question_key = _digest(question)
+        results: Dict[int, float] = {}
+        pending = {}
+        for index, doc in enumerate(docs):
+            key = (question_key, chunk_id(doc))
+            cached = self.cache.get(key)
+            if cached is not None:
+                results[index] = cached
+            else:
+                pending[index] = (key, self._batcher.submit((question, getattr(doc, "page_content", ""))))
+        for index, (key, future) in pending.items():
+            results[index] = future.result()
+            self.cache.put(key, results[index])
+        return [results[index] for index in range(len(docs))]
+
+    def rerank(self, question: str, docs: Sequence[Any]) -> List[Any]:
+        head, tail = list(docs[: self.candidates]), list(docs[self.candidates:])
+        if len(head) < 2:
+            return list(docs)
+        scored = sorted(zip(self.scores(question, head), range(len(head))), key=lambda item: (-item[0], item[1]))
+        return [head[index] for _, index in scored] + tail
+
+    def warm_up(self) -> None:
+        self.rerank("warm up", [_WarmupDoc("warm up passage one"), _WarmupDoc("warm up passage two")])
+
+
+class _WarmupDoc:
+    def __init__(self, text: str) -> None:
+        self.page_content = text
+        self.metadata: Dict[str, Any] = {}
+
+
+@lru_cache(maxsize=1)
+def get_reranker() -> Optional[Reranker]:
+    """The process-wide reranker, or None when MANUAL_RERANK is off or the model can't load."""
+    if not RERANK_ENABLED:
+        return None
+    try:
+        model = load_cross_encoder(RERANKER_MODEL, RERANK_MAX_LENGTH)
+    except ImportError as exc:
+        logger.warning("Reranking disabled, sentence-transformers not available: %s", exc)
+        return None
+    except Exception as exc:
+        # Missing or corrupt weights; the cached None keeps later requests from retrying the load
+        logger.error("Reranking disabled, unable to load %s: %s", RERANKER_MODEL, exc)
+        return None
+
+    logger.info("Loaded reranker %s (max_length=%s, candidates=%s)", RERANKER_MODEL, RERANK_MAX_LENGTH, RERANK_CANDIDATES)
+    return Reranker(lambda pairs: model.predict(pairs, batch_size=len(pairs), show_progress_bar=False))
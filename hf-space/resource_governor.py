@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CPU_CORES = max(1, int(os.getenv("MANUAL_CPU_CORES", str(os.cpu_count() or 1))))
+# Cores kept free for chat requests while serving traffic is active; ingestion gets the rest.
+SERVING_CORES = max(1, int(os.getenv("MANUAL_SERVING_CORES", str(max(1, CPU_CORES // 4)))))
+# Serving counts as active for this long after the last request finished.
+SERVING_ACTIVE_WINDOW = float(os.getenv("MANUAL_SERVING_ACTIVE_WINDOW", "5"))
+
+
+def _set_torch_threads(threads: int) -> None:
+    # Only adjust torch if something already imported it; never import it just for this.
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(threads)
+
+
+class ResourceGovernor:
+    """Shares the CPU between chat serving and ingestion.
+
+    Serving always keeps ``serving_cores`` while requests are in flight (or were
+    recently); ingestion's OCR workers get the remaining cores through
+    :meth:`ocr_slot`. While an ingestion job runs, torch's intra-op pool (which
+    embeds its chunks) is sized to that same ingestion budget minus the cores
+    OCR holds, so it shrinks while chat traffic is active; with no ingestion,
+    serving gets every core. Budgets are recomputed whenever a request, job or
+    OCR task starts or finishes, and by :meth:`refresh` between encode batches
+    so an expired serving window hands its cores back.
+    """
+
+    def __init__(
+        self,
+        cores: int = CPU_CORES,
+        serving_cores: int = SERVING_CORES,
+        *,
+        active_window: float = SERVING_ACTIVE_WINDOW,
+        set_torch_threads: Callable[[int], None] = _set_torch_threads,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.cores = max(1, cores)
+        self.serving_cores = max(1, min(serving_cores, self.cores))
+        self.active_window = active_window
+        self._set_torch_threads = set_torch_threads
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._serving_inflight = 0
+        self._last_serving = float("-inf")
+        self._ingestion_jobs = 0
+        self._ocr_inflight = 0
+        self._torch_threads: Optional[int] = None
+
+    # -- serving -----------------------------------------------------------
+    @contextmanager
+    def serving_request(self) -> Iterator[None]:
+        with self._cond:
+            self._serving_inflight += 1
+            self._rebalance_locked()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._serving_inflight -= 1
+                self._last_serving = self._clock()
+                self._rebalance_locked()
+
+    def serving_active(self) -> bool:
+        with self._cond:
+            return self._serving_active_locked()
+
+    def _serving_active_locked(self) -> bool:
+        return self._serving_inflight > 0 or self._clock() - self._last_serving < self.active_window
+
+    # -- ingestion ---------------------------------------------------------
+    @contextmanager
+    def ingestion_job(self) -> Iterator[None]:
+        with self._cond:
+            self._ingestion_jobs += 1
+            self._rebalance_locked()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._ingestion_jobs -= 1
+                self._rebalance_locked()
+
+    def ingestion_cores(self) -> int:
+        """Cores ingestion may use right now (at least one)."""
+        with self._cond:
+            return self._ingestion_cores_locked()
+
+    def _ingestion_cores_locked(self) -> int:
+        reserved = self.serving_cores if self._serving_active_locked() else 0
+        return max(1, self.cores - reserved)
+
+    def max_ocr_workers(self) -> int:
+        """Upper bound for an OCR pool; the live limit is enforced by :meth:`ocr_slot`."""
+        return self.cores if self.cores == 1 else self.cores - 1
+
+    @contextmanager
+    def ocr_slot(self, poll: float = 0.5) -> Iterator[None]:
+        """Hold one OCR core; blocks while OCR already uses the current ingestion budget."""
+        with self._cond:
+            # Re-check periodically: the budget also grows when the serving window lapses.
+            while self._ocr_inflight >= self._ingestion_cores_locked():
+                self._cond.wait(poll)
+            self._ocr_inflight += 1
+            self._rebalance_locked()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._ocr_inflight -= 1
+                self._rebalance_locked()
+
+    # -- torch -------------------------------------------------------------
+    def torch_threads(self) -> int:
+        with self._cond:
+            return self._torch_threads_locked()
+
+    def _torch_threads_locked(self) -> int:
+        if not self._ingestion_jobs:
+            return self.cores
+        return max(1, self._ingestion_cores_locked() - self._ocr_inflight)
+
+    def refresh(self) -> int:
+        """Re-apply the budgets (the serving window may have lapsed); returns torch's thread count."""
+        with self._cond:
+            self._rebalance_locked()
+            return self._torch_threads_locked()
+
+    def _rebalance_locked(self) -> None:
+        threads = self._torch_threads_locked()
+        if threads != self._torch_threads:
+            self._torch_threads = threads
+            try:
+                self._set_torch_threads(threads)
+            except Exception as exc:  # pragma: no cover - defensive
+                logger.debug("Unable to set torch threads: %s", exc)
+        self._cond.notify_all()
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._cond:
+            return {
+                "cores": self.cores,
+                "serving_active": self._serving_active_locked(),
+                "serving_inflight": self._serving_inflight,
+                "ingestion_jobs": self._ingestion_jobs,
+                "ingestion_cores": self._ingestion_cores_locked(),
+                "ocr_inflight": self._ocr_inflight,
+                "torch_threads": self._torch_threads_locked(),
+            }
+
+
+class WorkBudget:
+    """Wall-clock and process-CPU allowance for an optional, expensive stage.
+
+    A limit of 0 (or less) means unlimited. :meth:`can_afford` lets callers
+    skip the next unit of work when its estimated cost would overrun.
+    """
+
+    def __init__(
+        self,
+        wall_seconds: float = 0.0,
+        cpu_seconds: float = 0.0,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        cpu_clock: Callable[[], float] = time.process_time,
+    ) -> None:
+        self.wall_seconds = wall_seconds
+        self.cpu_seconds = cpu_seconds
+        self._clock = clock
+        self._cpu_clock = cpu_clock
+        self._wall_start = clock()
+        self._cpu_start = cpu_clock()
+
+    def spent(self) -> Tuple[float, float]:
+        """(wall seconds, CPU seconds) used since the budget was created."""
+        return self._clock() - self._wall_start, self._cpu_clock() - self._cpu_start
+
+    def can_afford(self, wall_estimate: float = 0.0, cpu_estimate: float = 0.0) -> bool:
+        wall, cpu = self.spent()
+        if self.wall_seconds > 0 and wall + wall_estimate > self.wall_seconds:
+            return False
+        if self.cpu_seconds > 0 and cpu + cpu_estimate > self.cpu_seconds:
+            return False
+        return True
+
+
+governor = ResourceGovernor()
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import bisect
+import json
+import logging
+import re
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+SECTIONS_FILE = "sections.json"
+# Outline depth used for sections: chapters and their first-level subsections
+MAX_SECTION_LEVEL = 2
+
+_STOPWORDS = {
+    "the", "and", "for", "with", "how", "what", "when", "where", "why", "does", "can", "should",
+    "your", "you", "this", "that", "are", "from", "use", "using", "about", "into", "its", "there",
+}
+
+
+@dataclass
+class Section:
+    id: int
+    title: str
+    level: int
+    start_page: int
+    end_page: int
+
+
+def _words(text: str) -> Set[str]:
+    words = set()
+    for word in re.findall(r"[a-z]+", text.lower()):
+        if len(word) < 3 or word in _STOPWORDS:
+            continue
+        words.add(word[:-1] if word.endswith("s") and len(word) > 3 else word)
+    return words
+
+
+class SectionIndex:
+    """Sections of one manual as a sorted interval index over pages.
+
+    Sections are kept in outline order (start pages non-decreasing); the
+    section of a page is the last one starting at or before it, i.e. the
+    most specific one. :meth:`match` maps a question to section ids so
+    retrieval can filter on them instead of boosting afterwards.
+    """
+
+    def __init__(self, sections: Sequence[Section] = ()) -> None:
+        self.sections = list(sections)
+        self._starts = [section.start_page for section in self.sections]
+
+    def __len__(self) -> int:
+        return len(self.sections)
+
+    def section_at(self, page: int) -> Optional[Section]:
+        index = bisect.bisect_right(self._starts, page) - 1
+        if index < 0 or page > self.sections[index].end_page:
+            return None
+        return self.sections[index]
+
+    def match(self, question: str, max_coverage: float = 0.5, min_share: float = 1 / 3) -> List[int]:
+        """Ids of sections whose title matches ``question``, plus the sections nested in them.
+
+        A title matches on two shared words. A one-word title ("Tires") only
+        matches when that word is at least ``min_share`` of the question's
+        words, so a question that mentions it in passing isn't narrowed to it.
+        Returns nothing when the match would cover more than ``max_coverage``
+        of the manual, since such a filter would not narrow anything.
+        """
+        if not self.sections:
+            return []
+        question_words = _words(question)
+        matched = []
+        for section in self.sections:
+            title_words = _words(section.title)
+            overlap = len(title_words & question_words)
+            if overlap >= 2 or (overlap == 1 == len(title_words) and overlap >= min_share * len(question_words)):
+                matched.append(section)
+        ids = {
+            inner.id
+            for outer in matched
+            for inner in self.sections
+            if outer.start_page <= inner.start_page and inner.end_page <= outer.end_page and inner.level >= outer.level
+        }
+        pages = max(section.end_page for section in self.sections)
+        covered = {page for section in matched for page in range(section.start_page, section.end_page + 1)}
+        if not ids or len(covered) > max_coverage * pages:
+            return []
+        return sorted(ids)
+
+    def to_json(self) -> str:
+        rows = [[s.id, s.level, s.start_page, s.end_page, s.title] for s in self.sections]
+        return json.dumps({"version": 1, "sections": rows}, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, payload: str) -> "SectionIndex":
+        rows = json.loads(payload).get("sections", [])
+        return cls([Section(int(i), str(title), int(level), int(start), int(end)) for i, level, start, end, title in rows])
+
+    def save(self, path: Path) -> None:
+        Path(path).write_text(self.to_json(), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: Path) -> "SectionIndex":
+        path = Path(path)
+        if not path.exists():
+            return cls()
+        try:
+            return cls.from_json(path.read_text(encoding="utf-8"))
+        except Exception as exc:  # pragma: no cover - defensive
+            logger.warning("Unable to read section index %s: %s", path, exc)
+            return cls()
+
+
+def sections_from_toc(toc: Iterable[Sequence], page_count: int, max_level: int = MAX_SECTION_LEVEL) -> List[Section]:
+    """Sections from a PyMuPDF outline (``[level, title, page]`` rows).
+
+    A section runs until the next entry at the same or a higher level.
+    Unresolved or out-of-order entries are skipped.
+    """
+    entries: List[Tuple[int, str, int]] = []
+    for level, title, page, *_ in toc:
+        if level > max_level or not 1 <= page <= page_count or not str(title).strip():
+            continue
+        if entries and page < entries[-1][2]:
+            continue
+        entries.append((int(level), " ".join(str(title).split()), int(page)))
+    sections = []
+    for index, (level, title, page) in enumerate(entries):
+        end = next((later[2] - 1 for later in entries[index + 1:] if later[0] <= level), page_count)
+        sections.append(Section(index, title, level, page, max(page, end)))
+    return sections
+
+
+def sections_from_headings(headings: Sequence[Tuple[int, str]], page_count: int) -> List[Section]:
+    """Sections from per-page headings; consecutive pages with the same heading form one section."""
+    starts: List[Tuple[int, str]] = []
+    for page, title in sorted(headings):
+        title = " ".join(title.split())
+        if title and (not starts or starts[-1][1].lower() != title.lower()):
+            starts.append((page, title))
+    return [
+        Section(index, title, 1, page, (starts[index + 1][0] - 1) if index + 1 < len(starts) else page_count)
+        for index, (page, title) in enumerate(starts)
+    ]
+
+
+def _font_headings(pages, ratio: float = 1.25) -> List[Tuple[int, str]]:
+    """Topmost line per page set noticeably larger than the body font (``pages``: page-model pages)."""
+    sizes: Counter = Counter()
+    lines_by_page: List[Tuple[int, List[Tuple[float, float, str]]]] = []
+    for page in pages:
+        lines = []
+        for block in page.blocks:
+            for line in block.lines:
+                spans = [span for span in line.spans if span.text.strip()]
+                if not spans:
+                    continue
+                text = " ".join(span.text.strip() for span in spans)
+                size = max(round(span.size * 2) / 2 for span in spans)
+                for span in spans:
+                    sizes[round(span.size * 2) / 2] += len(span.text)
+                lines.append((line.bbox[1], size, text))
+        lines_by_page.append((page.number, lines))
+    if not sizes:
+        return []
+    body = sizes.most_common(1)[0][0]
+    headings = []
+    for number, lines in lines_by_page:
+        candidates = [
+            (top, text) for top, size, text in lines
+            if size >= body * ratio and 3 <= len(text) <= 80 and re.search(r"[A-Za-z]{3}", text)
+        ]
+        if candidates:
+            headings.append((number, min(candidates)[1]))
+    return headings
+
+
+def extract_sections(model, max_level: int = MAX_SECTION_LEVEL) -> SectionIndex:
+    """Section index of a PDF page model: the outline, else a heading-font heuristic over the model's spans."""
+    toc = model.pdf.get_toc(simple=True)
+    sections = sections_from_toc(toc, model.page_count, max_level) if toc else []
+    source = "outline"
+    if not sections:
+        sections = sections_from_headings(_font_headings(model.pages), model.page_count)
+        source = "heading fonts"
+    logger.info("PDF %s: %s sections from %s", model.name, len(sections), source)
+    return SectionIndex(sections)
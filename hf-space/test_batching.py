@@ -0,0 +1,82 @@
+"""
+Tests for the micro-batcher and bucketed encoding
+Run with: python -m pytest test_batching.py
+"""
+
+import threading
+import time
+
+import pytest
+
+from batching import EncodingCancelledError, MicroBatcher, encode_in_buckets
+
+
+def test_concurrent_requests_share_a_batch():
+    sizes = []
+
+    def double(items):
+        sizes.append(len(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(double, max_batch=8, max_wait_ms=50)
+    futures = [batcher.submit(i) for i in range(20)]
+    assert [future.result(2) for future in futures] == [i * 2 for i in range(20)]
+    assert max(sizes) == 8
+    assert sum(sizes) == 20
+    assert len(sizes) <= 4
+
+
+def test_lone_request_waits_at_most_max_wait():
+    batcher = MicroBatcher(lambda items: items, max_batch=64, max_wait_ms=20)
+    started = time.perf_counter()
+    assert batcher("solo", timeout=2) == "solo"
+    assert time.perf_counter() - started < 0.5
+
+
+def test_batch_failure_reaches_every_caller():
+    gate = threading.Event()
+
+    def failing(items):
+        gate.wait(1)
+        raise ValueError("encoder down")
+
+    batcher = MicroBatcher(failing, max_batch=4, max_wait_ms=10)
+    futures = [batcher.submit(i) for i in range(3)]
+    gate.set()
+    for future in futures:
+        with pytest.raises(ValueError, match="encoder down"):
+            future.result(2)
+
+    short = MicroBatcher(lambda items: items[:1], max_batch=4, max_wait_ms=10)
+    futures = [short.submit(i) for i in range(2)]
+    with pytest.raises(RuntimeError, match="returned 1 results for 2 items"):
+        futures[1].result(2)
+
+
+def test_encode_in_buckets_sorts_by_length_and_restores_order():
+    batches = []
+    progress = []
+
+    def encode(items):
+        batches.append(list(items))
+        return [item.upper() for item in items]
+
+    texts = ["ccc", "a", "eeeee", "bb", "dddd"]
+    result = encode_in_buckets(encode, texts, batch_size=2, progress_callback=lambda done, total: progress.append((done, total)))
+    assert result == ["CCC", "A", "EEEEE", "BB", "DDDD"]
+    assert batches == [["a", "bb"], ["ccc", "dddd"], ["eeeee"]]
+    assert progress == [(2, 5), (4, 5), (5, 5)]
+
+
+def test_encode_in_buckets_stops_between_batches_when_cancelled():
+    calls = []
+    cancel = threading.Event()
+
+    def encode(items):
+        calls.append(len(items))
+        cancel.set()
+        return items
+
+    with pytest.raises(EncodingCancelledError, match="after 3 of 9"):
+        encode_in_buckets(encode, list(range(9)), batch_size=3, length_fn=lambda items: [0] * len(items), cancel_callback=cancel.is_set)
+    assert calls == [3]
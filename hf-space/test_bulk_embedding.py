@@ -0,0 +1,107 @@
+"""
+Tests for multi-process bulk embedding
+Run with: python -m pytest test_bulk_embedding.py
+"""
+
+import bulk_embedding
+from bulk_embedding import encode_bulk, encode_chunks, pool_layout
+
+
+class _Vectors(list):
+    def tolist(self):
+        return list(self)
+
+
+class FakeModel:
+    """Records how it was asked to encode; pool methods mimic SentenceTransformer."""
+
+    def __init__(self):
+        self.calls = []
+        self.pools = []
+
+    def encode(self, texts, batch_size=32, show_progress_bar=False):
+        self.calls.append(("encode", len(texts)))
+        return _Vectors([[float(len(text))] for text in texts])
+
+    def start_multi_process_pool(self, target_devices):
+        self.pools.append((len(target_devices), bulk_embedding.os.environ.get("OMP_NUM_THREADS")))
+        return {"devices": target_devices}
+
+    def encode_multi_process(self, texts, pool, batch_size=32):
+        self.calls.append(("pool", len(texts)))
+        return _Vectors([[float(len(text))] for text in texts])
+
+    def stop_multi_process_pool(self, pool):
+        self.calls.append(("stop", 0))
+
+
+def test_pool_layout_fills_cores_once():
+    assert pool_layout(0, cores=8) == (4, 2)
+    assert pool_layout(3, cores=8) == (3, 2)
+    assert pool_layout(16, cores=4) == (4, 1)
+    assert pool_layout(0, cores=1) == (1, 1)
+
+
+def test_small_inputs_stay_in_process(monkeypatch):
+    monkeypatch.setattr(bulk_embedding, "BULK_EMBED_MIN_CHUNKS", 100)
+    model = FakeModel()
+    assert encode_bulk(model, ["ab", "c"], processes=4) == [[2.0], [1.0]]
+    assert model.pools == []
+
+
+def test_large_inputs_use_pool_with_thread_limits(monkeypatch):
+    monkeypatch.setattr(bulk_embedding, "BULK_EMBED_MIN_CHUNKS", 10)
+    monkeypatch.setattr(bulk_embedding, "BULK_EMBED_ROUND", 8)
+    monkeypatch.setattr(bulk_embedding.os, "cpu_count", lambda: 8)
+    monkeypatch.delenv("OMP_NUM_THREADS", raising=False)
+    model = FakeModel()
+    texts = ["x" * (i % 5 + 1) for i in range(20)]
+
+    assert encode_bulk(model, texts, processes=4) == [[float(len(text))] for text in texts]
+    assert model.pools == [(4, "2")]
+    assert [kind for kind, _ in model.calls] == ["pool", "pool", "pool", "stop"]
+    assert "OMP_NUM_THREADS" not in bulk_embedding.os.environ
+
+
+def test_pool_failure_falls_back_with_same_length_order(monkeypatch):
+    monkeypatch.setattr(bulk_embedding, "BULK_EMBED_MIN_CHUNKS", 2)
+    monkeypatch.setattr(bulk_embedding.os, "cpu_count", lambda: 8)
+    model = FakeModel()
+    batches = []
+
+    def broken_pool(target_devices):
+        raise RuntimeError("spawn failed")
+
+    def encode(texts, batch_size=32, show_progress_bar=False):
+        batches.append(list(texts))
+        return _Vectors([[float(len(text))] for text in texts])
+
+    model.start_multi_process_pool = broken_pool
+    model.encode = encode
+    texts = ["aaaa", "b", "cc", "ddd"]
+    # Token counts that invert the character order
+    tokens = {"aaaa": 1, "b": 4, "cc": 3, "ddd": 2}
+
+    result = encode_bulk(model, texts, batch_size=2, processes=4, length_fn=lambda items: [tokens[t] for t in items])
+    assert result == [[4.0], [1.0], [2.0], [3.0]]
+    assert batches == [["aaaa", "ddd"], ["cc", "b"]]
+
+
+def test_encode_chunks_uses_pool_only_when_enabled(monkeypatch):
+    monkeypatch.setattr(bulk_embedding, "BULK_EMBED_MIN_CHUNKS", 4)
+    monkeypatch.setattr(bulk_embedding.os, "cpu_count", lambda: 8)
+    texts = ["x" * (i + 1) for i in range(6)]
+
+    monkeypatch.setattr(bulk_embedding, "BULK_EMBED_ENABLED", False)
+    model = FakeModel()
+    assert encode_chunks(model, texts) == [[float(len(text))] for text in texts]
+    assert model.pools == []
+
+    monkeypatch.setattr(bulk_embedding, "BULK_EMBED_ENABLED", True)
+    model = FakeModel()
+    assert encode_chunks(model, texts) == [[float(len(text))] for text in texts]
+    assert len(model.pools) == 1
+    # Below the threshold the flag alone doesn't start a pool
+    model = FakeModel()
+    encode_chunks(model, texts[:3])
+    assert model.pools == []
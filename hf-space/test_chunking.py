@@ -0,0 +1,52 @@
+"""
+Tests for the page-offset chunker
+Run with: python -m pytest test_chunking.py
+"""
+
+import pytest
+
+from chunking import PageText, chunk_pages
+
+
+def _pages(count=6, sentences=12):
+    return [
+        (number, " ".join(f"Page {number} sentence {i} explains a maintenance step." for i in range(sentences)))
+        for number in range(1, count + 1)
+    ]
+
+
+def test_page_text_offsets_map_back_to_pages():
+    manual = PageText([(3, "abc"), (4, "defg"), (7, "h")])
+    assert manual.text == "abc\ndefg\nh"
+    assert [manual.page_at(offset) for offset in (0, 2, 3, 4, 8, 9)] == [3, 3, 3, 4, 4, 7]
+
+
+def test_chunks_respect_size_and_cover_the_text():
+    pages = _pages()
+    chunks = chunk_pages(pages, chunk_size=300, chunk_overlap=60)
+    assert all(len(chunk.text) <= 300 for chunk in chunks)
+    manual = PageText(pages).text
+    assert chunks[0].start == 0 and chunks[-1].end == len(manual)
+    for previous, current in zip(chunks, chunks[1:]):
+        assert current.start <= previous.end  # overlapping, no gaps
+        assert current.start > previous.start
+    assert all(manual[chunk.start:chunk.end] == chunk.text for chunk in chunks)
+
+
+def test_chunks_prefer_sentence_boundaries_and_span_pages():
+    chunks = chunk_pages(_pages(), chunk_size=300, chunk_overlap=60)
+    assert all(chunk.text.endswith(".") for chunk in chunks)
+    spanning = [chunk for chunk in chunks if chunk.end_page > chunk.start_page]
+    assert spanning
+    for chunk in spanning:
+        assert f"Page {chunk.start_page} " in chunk.text and f"Page {chunk.end_page} " in chunk.text
+
+
+def test_hard_cut_without_separators():
+    chunks = chunk_pages([(1, "x" * 1000)], chunk_size=400, chunk_overlap=100)
+    assert [(chunk.start, chunk.end) for chunk in chunks] == [(0, 400), (300, 700), (600, 1000)]
+
+
+def test_overlap_must_be_smaller_than_size():
+    with pytest.raises(ValueError):
+        chunk_pages(_pages(), chunk_size=100, chunk_overlap=100)
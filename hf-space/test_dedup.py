@@ -0,0 +1,70 @@
+"""
+Tests for ingest-time near-duplicate collapsing
+Run with: python -m pytest test_dedup.py
+"""
+
+import random
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from dedup import MinHashLSH, collapse_near_duplicates, jaccard, shingles
+
+WARNING = (
+    "WARNING: Never leave children or pets unattended in the vehicle. Temperatures inside "
+    "a closed vehicle can rise quickly and cause serious injury or death, even on mild days."
+)
+
+
+def _doc(text, page):
+    return SimpleNamespace(page_content=text, metadata={"page": page})
+
+
+def test_shingles_and_jaccard():
+    assert jaccard(shingles(WARNING), shingles(WARNING.upper())) == 1.0
+    assert jaccard(shingles(WARNING), shingles("Check the engine oil level every month.")) == 0.0
+    assert shingles("") == frozenset()
+
+
+def test_lsh_finds_near_duplicates_only():
+    lsh = MinHashLSH()
+    lsh.add(0, lsh.signature(shingles(WARNING)))
+    assert lsh.query(lsh.signature(shingles(WARNING + " See page 12."))) == [0]
+    assert lsh.query(lsh.signature(shingles("Rotate the tires every 5,000 miles to even out tread wear."))) == []
+
+
+def test_collapse_keeps_first_and_unions_pages():
+    docs = [
+        _doc(WARNING, 3),
+        _doc("Rotate the tires every 5,000 miles to even out tread wear on all four tires.", 4),
+        _doc(WARNING + " See page 12.", 17),
+        _doc(WARNING, 40),
+    ]
+    result = collapse_near_duplicates(docs, threshold=0.8)
+    assert [doc.metadata.get("page") for doc in result] == [3, 4]
+    assert result[0].metadata["pages"] == "3,17,40"
+    assert result[0].metadata["duplicates"] == 2
+    assert "pages" not in result[1].metadata
+
+
+def test_collapse_leaves_distinct_chunks_alone():
+    docs = [_doc(f"Step {n}: torque wheel nut {n} to {80 + n} ft-lbf in a star pattern, then recheck.", n) for n in range(5)]
+    assert len(collapse_near_duplicates(docs, threshold=0.9)) == 5
+
+
+def test_vectorised_signatures_match_fallback_and_are_fast():
+    pytest.importorskip("numpy")
+    rng = random.Random(0)
+    vocabulary = [f"word{i}" for i in range(3000)]
+    docs = [_doc(" ".join(rng.choice(vocabulary) for _ in range(130)), page) for page in range(3000)]
+    lsh = MinHashLSH()
+    hashed = shingles(docs[0].page_content)
+    vectorised = lsh.signature(hashed)
+    lsh._np = None
+    assert vectorised == lsh.signature(hashed)
+
+    started = time.perf_counter()
+    assert len(collapse_near_duplicates(docs)) == 3000
+    # ~0.5 s here including shingling; the pure-Python signatures alone took ~4 s
+    assert time.perf_counter() - started < 3.0
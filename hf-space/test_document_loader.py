@@ -0,0 +1,134 @@
+"""
+Tests for the manual loading pipeline on small generated PDFs
+Run with: python -m pytest test_document_loader.py
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("langchain_core")
+fitz = pytest.importorskip("fitz")
+
+import document_loader  # noqa: E402
+from ocr_engine import OCREngine, OCRResult  # noqa: E402
+from page_model import open_page_model  # noqa: E402
+from resource_governor import WorkBudget  # noqa: E402
+
+
+def _write_pdf(path, pages):
+    """One PDF page per list of lines; an empty list makes a page without vector text."""
+    with fitz.open() as pdf:
+        for lines in pages:
+            page = pdf.new_page(width=595, height=842)
+            for index, line in enumerate(lines):
+                page.insert_text((50, 60 + 14 * index), line, fontsize=10)
+        pdf.save(str(path))
+    return path
+
+
+_PARTS = ("coolant housing", "thermostat cover", "water pump", "radiator cap", "fan shroud", "heater hose", "drain plug")
+
+
+def _body(page_number, sentences=4):
+    """Body lines that differ in wording, not just numbers, from page to page."""
+    return [
+        f"Step {page_number}.{i}: loosen bolt {page_number}{i} on the {_PARTS[(page_number + i) % len(_PARTS)]} and check the seal."
+        for i in range(sentences)
+    ]
+
+
+class FakeEngine(OCREngine):
+    name = "fake"
+
+    def __init__(self, text=""):
+        super().__init__("eng", "", 1.0)
+        self.text = text
+        self.calls = 0
+
+    def recognize(self, images, cancel_callback=None):
+        self.calls += len(images)
+        return [OCRResult(self.text, 90.0) for _ in images]
+
+
+class NarrativeText:
+    def __init__(self, text, page_number):
+        self.text = text
+        self.metadata = SimpleNamespace(page_number=page_number)
+
+
+@pytest.fixture
+def ocr(monkeypatch, tmp_path):
+    engine = FakeEngine()
+    monkeypatch.setattr(document_loader, "_ocr_engine", lambda: engine)
+    monkeypatch.setattr(document_loader, "_OCR_CACHE_DIR", tmp_path / "ocr-cache")
+    (tmp_path / "ocr-cache").mkdir()
+    return engine
+
+
+def _pages(chunk):
+    return range(chunk.metadata["start_page"], chunk.metadata["end_page"] + 1)
+
+
+def test_running_headers_and_footers_are_stripped(tmp_path, ocr):
+    pages = [["Owner's Manual - Cooling system", *_body(n), f"Page {n}"] for n in range(1, 7)]
+    chunks = document_loader.load_manual(str(_write_pdf(tmp_path / "manual.pdf", pages)))
+
+    text = " ".join(chunk.page_content for chunk in chunks)
+    assert "bolt 12" in text and "bolt 63" in text
+    assert "Owner's Manual" not in text
+    assert "Page 3" not in text
+
+
+def test_contents_pages_are_not_indexed(tmp_path, ocr):
+    contents = ["Contents"] + [f"{title} {'.' * 12} {page}" for page, title in enumerate(
+        ["Seat belts", "Airbags", "Child seats", "Instruments", "Lights", "Wipers", "Climate", "Starting", "Driving"], start=2)]
+    pages = [contents] + [_body(n) for n in range(2, 5)]
+    chunks = document_loader.load_manual(str(_write_pdf(tmp_path / "manual.pdf", pages)))
+
+    assert chunks
+    assert all(1 not in _pages(chunk) for chunk in chunks)
+    assert not any("Seat belts" in chunk.page_content for chunk in chunks)
+
+
+def test_chunks_record_the_pages_their_text_came_from(tmp_path, ocr):
+    ocr.text = "Scanned wiring diagram legend: fuse F12 feeds the coolant pump relay and the fan controller."
+    pages = [_body(1, 12), _body(2, 12), [], _body(4, 12)]
+    chunks = document_loader.load_manual(str(_write_pdf(tmp_path / "manual.pdf", pages)))
+
+    assert ocr.calls == 1
+    for marker, page in (("bolt 15", 1), ("bolt 211", 2), ("fuse F12", 3), ("bolt 47", 4)):
+        holding = [chunk for chunk in chunks if marker in chunk.page_content]
+        assert holding, marker
+        assert all(page in _pages(chunk) for chunk in holding), marker
+    assert any(chunk.metadata["start_page"] < chunk.metadata["end_page"] for chunk in chunks)
+    assert all(chunk.metadata["page"] == chunk.metadata["start_page"] for chunk in chunks)
+
+
+def test_hi_res_fallback_stops_at_its_budget_and_keeps_finished_pages(tmp_path, monkeypatch, ocr):
+    clock = [0.0]
+    partitioned = []
+
+    def partition_pdf(filename, strategy, infer_table_structure):
+        assert strategy == "hi_res"
+        with fitz.open(filename) as subset:
+            count = subset.page_count
+        partitioned.append(count)
+        clock[0] += 10.0
+        return [NarrativeText(f"layout text for local page {local}", local) for local in range(1, count + 1)]
+
+    monkeypatch.setattr(document_loader, "_unstructured", lambda: SimpleNamespace(partition_pdf=partition_pdf))
+    monkeypatch.setattr(document_loader, "WorkBudget",
+                        lambda wall, cpu: WorkBudget(wall, cpu, clock=lambda: clock[0], cpu_clock=lambda: 0.0))
+    monkeypatch.setattr(document_loader, "_HIRES_BATCH_PAGES", 2)
+    monkeypatch.setattr(document_loader, "_HIRES_TIME_BUDGET", 25.0)
+
+    path = _write_pdf(tmp_path / "scanned.pdf", [[] for _ in range(7)])
+    with open_page_model(path) as model:
+        elements = document_loader._partition_pdf(path, model=model)
+
+    # Two batches fit (10s, then 10s + a 10s estimate); the third would overrun 25s
+    assert partitioned == [2, 2]
+    assert ocr.calls == 7
+    assert sorted(element.metadata.page_number for element in elements) == [1, 2, 3, 4]
+    assert all(element.text.startswith("layout text") for element in elements)
@@ -0,0 +1,56 @@
+"""
+Tests for the embedding sidecar protocol
+Run with: python -m pytest test_embedding_server.py
+"""
+
+import threading
+
+import pytest
+
+from embedding_server import EmbeddingClient, EmbeddingServer, EmbeddingServiceError
+
+
+def _fake_encode(texts, batch_size):
+    if "boom" in texts:
+        raise RuntimeError("model exploded")
+    return [[float(len(text)), float(batch_size), 0.5] for text in texts]
+
+
+@pytest.fixture
+def server(tmp_path):
+    server = EmbeddingServer(str(tmp_path / "embed.sock"), _fake_encode)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_client_round_trip_and_errors(server):
+    client = EmbeddingClient(server.server_address)
+    assert client.encode(["abc", "hello"], batch_size=8) == [[3.0, 8.0, 0.5], [5.0, 8.0, 0.5]]
+    assert client.encode([]) == []
+
+    with pytest.raises(EmbeddingServiceError, match="model exploded"):
+        client.encode(["boom"])
+    # The connection stays usable after a server-side error.
+    assert client.encode(["x"])[0][0] == 1.0
+
+
+def test_client_reconnects_and_serves_threads(server):
+    client = EmbeddingClient(server.server_address)
+    client.encode(["warm"])
+    client._local.sock.close()
+    assert client.encode(["again"])[0][0] == 5.0
+
+    results = {}
+
+    def worker(index):
+        results[index] = client.encode(["t" * index])[0][0]
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(1, 9)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == {i: float(i) for i in range(1, 9)}
@@ -0,0 +1,102 @@
+"""
+Tests for the bounded ingestion scheduler and cost model
+Run with: python -m pytest test_ingest_queue.py
+"""
+
+import threading
+import time
+
+from ingest_estimator import IngestionCostModel, PreflightReport
+from ingest_queue import IngestionScheduler
+
+
+def _wait_for(predicate, timeout: float = 2.0) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_shortest_job_runs_first(tmp_path):
+    release = threading.Event()
+    started = []
+
+    def runner(job):
+        started.append(job.manual_id)
+        release.wait(2.0)
+
+    scheduler = IngestionScheduler(runner, tmp_path / "queue.json", concurrency=1)
+    scheduler.submit("blocker", 10.0, {})
+    assert _wait_for(lambda: started == ["blocker"])
+
+    scheduler.submit("scanned", 600.0, {})
+    scheduler.submit("small", 5.0, {})
+    assert scheduler.queue_info("small")[0] == 1
+    assert scheduler.queue_info("scanned")[0] == 2
+
+    release.set()
+    assert _wait_for(lambda: len(started) == 3)
+    assert started == ["blocker", "small", "scanned"]
+
+
+def test_queue_eta_accounts_for_running_jobs(tmp_path):
+    release = threading.Event()
+    scheduler = IngestionScheduler(lambda job: release.wait(2.0), tmp_path / "queue.json", concurrency=1)
+    scheduler.submit("running", 30.0, {})
+    assert _wait_for(lambda: scheduler.queue_info("running")[0] == 0)
+    scheduler.submit("next", 20.0, {})
+
+    position, eta = scheduler.queue_info("next")
+    assert position == 1
+    assert 45.0 <= eta <= 50.0
+    release.set()
+
+
+def test_cancel_and_restore(tmp_path):
+    release = threading.Event()
+    state_path = tmp_path / "queue.json"
+    scheduler = IngestionScheduler(lambda job: release.wait(2.0), state_path, concurrency=1)
+    scheduler.submit("running", 1.0, {"manual_id": "running"})
+    assert _wait_for(lambda: scheduler.queue_info("running")[0] == 0)
+    scheduler.submit("queued", 2.0, {"manual_id": "queued"})
+    scheduler.submit("dropped", 3.0, {"manual_id": "dropped"})
+
+    assert scheduler.cancel("dropped")
+    assert not scheduler.cancel("dropped")
+    assert scheduler.queue_info("dropped") == (None, None)
+
+    restored = IngestionScheduler(lambda job: None, state_path).restore()
+    assert sorted(job.manual_id for job in restored) == ["queued", "running"]
+    release.set()
+
+
+def test_cost_model_calibrates_from_history(tmp_path):
+    history_path = tmp_path / "history.json"
+    model = IngestionCostModel(history_path)
+    scanned = PreflightReport(page_count=100, sampled_pages=24, text_pages=0.0, ocr_pages=100.0, image_count=100.0, file_size_mb=40.0)
+    before = model.predict(scanned, timeout_floor=180.0)
+    assert before.timeout >= 180.0
+
+    # Observed OCR is much slower than the prior assumes: ~6s per page.
+    for pages in (20, 50, 100, 150, 200, 300):
+        report = PreflightReport(pages, 24, 0.0, float(pages), float(pages), 1.0)
+        model.record(report, seconds=6.0 * pages, memory_mb=200.0)
+
+    after = IngestionCostModel(history_path).predict(scanned)
+    assert after.seconds > before.seconds * 2
+    assert 400.0 < after.seconds < 800.0
+    assert model.predict(scanned, ocr_enabled=False).seconds < after.seconds
+
+
+def test_cost_model_skips_unattributed_memory(tmp_path):
+    model = IngestionCostModel(tmp_path / "history.json")
+    report = PreflightReport(100, 24, 100.0, 0.0, 0.0, 5.0)
+    prior_memory = model.predict(report).memory_mb
+    # Shared or high-water-mark runs carry no memory sample; they must not drag the model to 0 MB
+    for _ in range(10):
+        model.record(report, seconds=60.0, memory_mb=None)
+    reloaded = IngestionCostModel(tmp_path / "history.json")
+    assert reloaded.predict(report).memory_mb == prior_memory
+    assert reloaded.predict(report).seconds > 30.0
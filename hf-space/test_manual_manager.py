@@ -0,0 +1,259 @@
+"""
+Tests for the blue/green manual replacement in ManualManager
+Run with: python -m pytest test_manual_manager.py
+"""
+
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("dotenv")
+pytest.importorskip("langchain_core")  # main imports document_loader during ingestion
+
+import main  # noqa: E402
+from main import ManualManager, ManualMetadata, ManualStatus  # noqa: E402
+
+
+def _wait_for(predicate, timeout: float = 2.0) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class FakeStore:
+    def __init__(self, source, persist_directory):
+        self.source = source
+        self.persist_directory = persist_directory
+        self.deleted = False
+        self._client = SimpleNamespace(reset=lambda: None)
+
+    def as_retriever(self):
+        return SimpleNamespace(store=self)
+
+    def delete_collection(self):
+        self.deleted = True
+
+
+class Pipeline:
+    """Stand-ins for load_manual / build_vector_store / make_rag_chain.
+
+    ``gates[(stage, source)]`` blocks that stage for that source until set;
+    ``failing`` sources raise from load_manual.
+    """
+
+    def __init__(self):
+        self.gates = {}
+        self.entered = {}
+        self.failing = set()
+        self.stores = {}
+
+    def _pass(self, stage, source):
+        key = (stage, source)
+        if key in self.gates:
+            self.entered[key].set()
+            assert self.gates[key].wait(5.0)
+
+    def gate(self, stage, source):
+        self.gates[(stage, source)] = threading.Event()
+        self.entered[(stage, source)] = threading.Event()
+        return self.gates[(stage, source)], self.entered[(stage, source)]
+
+    def load_manual(self, path, **kwargs):
+        self._pass("load", path)
+        if path in self.failing:
+            raise ValueError("unreadable manual")
+        return [SimpleNamespace(page_content="Check the tire pressure monthly.", metadata={"source": path})]
+
+    def build_vector_store(self, docs, *, persist_directory, **kwargs):
+        source = docs[0].metadata["source"]
+        self._pass("build", source)
+        Path(persist_directory).mkdir(parents=True, exist_ok=True)
+        store = self.stores[source] = FakeStore(source, persist_directory)
+        return store
+
+    def make_rag_chain(self, retriever, sections=None, warnings=None):
+        self._pass("chain", retriever.store.source)
+        return SimpleNamespace(source=retriever.store.source)
+
+
+@pytest.fixture
+def pipeline(monkeypatch, tmp_path):
+    fake = Pipeline()
+    monkeypatch.setattr(main, "load_manual", fake.load_manual)
+    monkeypatch.setattr(main, "build_vector_store", fake.build_vector_store)
+    monkeypatch.setattr(main, "make_rag_chain", fake.make_rag_chain)
+    monkeypatch.setattr(main, "MANUAL_RETIRE_GRACE_SECONDS", 0.2)
+    return fake
+
+
+@pytest.fixture
+def manager(pipeline, tmp_path):
+    return ManualManager(tmp_path / "default.md", tmp_path / "uploads", tmp_path / "store")
+
+
+def _register(manager, source, *, replace=False):
+    return manager.register_manual("owner", Path(source), "owner.pdf", "Toyota", replace_existing=replace)
+
+
+def _register_in_thread(manager, source):
+    errors = []
+
+    def run():
+        try:
+            _register(manager, source, replace=True)
+        except Exception as exc:
+            errors.append(exc)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread, errors
+
+
+def _source(tmp_path, name):
+    return str((tmp_path / name).resolve())
+
+
+def test_old_version_serves_until_swap_then_retires(manager, pipeline, tmp_path):
+    v1, v2 = _source(tmp_path, "v1.pdf"), _source(tmp_path, "v2.pdf")
+    _register(manager, v1)
+    assert manager.get_chain("owner").source == v1
+
+    release, entered = pipeline.gate("load", v2)
+    thread, errors = _register_in_thread(manager, v2)
+    assert entered.wait(2.0)
+    # Replacement in progress: still PROCESSING, still answering from v1
+    assert manager.get_status("owner") is ManualStatus.PROCESSING
+    assert manager.get_chain("owner").source == v1
+    assert manager.get_manual_info("owner")["serving"] is True
+
+    release.set()
+    thread.join(5.0)
+    assert errors == []
+    assert manager.get_status("owner") is ManualStatus.READY
+    assert manager.get_chain("owner").source == v2
+
+    old_store = pipeline.stores[v1]
+    # Retired only after the grace period, so in-flight requests on v1 can finish
+    assert not old_store.deleted
+    assert _wait_for(lambda: old_store.deleted and not Path(old_store.persist_directory).exists())
+    assert not pipeline.stores[v2].deleted
+
+
+def test_failed_replacement_reverts_to_previous_version(manager, pipeline, tmp_path):
+    v1, v2 = _source(tmp_path, "v1.pdf"), _source(tmp_path, "v2.pdf")
+    _register(manager, v1)
+    pipeline.failing.add(v2)
+
+    with pytest.raises(ValueError):
+        _register(manager, v2, replace=True)
+
+    info = manager.get_manual_info("owner")
+    assert info["status"] is ManualStatus.READY
+    assert "still serving the previous version" in info["error"]
+    assert manager.get_chain("owner").source == v1
+    assert not pipeline.stores[v1].deleted
+    persisted = [path for path in (tmp_path / "store" / "owner").iterdir()]
+    assert persisted == [Path(pipeline.stores[v1].persist_directory)]
+
+
+def test_removal_during_replacement_discards_new_version(manager, pipeline, tmp_path):
+    v1, v2 = _source(tmp_path, "v1.pdf"), _source(tmp_path, "v2.pdf")
+    _register(manager, v1)
+
+    release, entered = pipeline.gate("build", v2)
+    thread, errors = _register_in_thread(manager, v2)
+    assert entered.wait(2.0)
+    manager.remove_manual("owner")
+    release.set()
+    thread.join(5.0)
+
+    with pytest.raises(KeyError):
+        manager.get_status("owner")
+    assert pipeline.stores[v1].deleted
+    new_store = pipeline.stores[v2]
+    assert _wait_for(lambda: new_store.deleted and not Path(new_store.persist_directory).exists())
+
+
+def test_version_superseded_by_newer_upload_is_discarded(manager, pipeline, tmp_path):
+    v1, v2, v3 = _source(tmp_path, "v1.pdf"), _source(tmp_path, "v2.pdf"), _source(tmp_path, "v3.pdf")
+    _register(manager, v1)
+
+    # v2 has built its store and is past its last cancellation check when v3 arrives
+    release, entered = pipeline.gate("chain", v2)
+    thread, errors = _register_in_thread(manager, v2)
+    assert entered.wait(2.0)
+    _register(manager, v3, replace=True)
+    assert manager.get_chain("owner").source == v3
+
+    release.set()
+    thread.join(5.0)
+    assert errors == []
+    # v2 finished last but must not replace v3
+    assert manager.get_chain("owner").source == v3
+    v2_store = pipeline.stores[v2]
+    assert _wait_for(lambda: v2_store.deleted and not Path(v2_store.persist_directory).exists())
+    assert _wait_for(lambda: pipeline.stores[v1].deleted)
+    assert not pipeline.stores[v3].deleted
+
+
+def test_single_job_on_fresh_process_records_memory(manager, monkeypatch, tmp_path):
+    # A fresh worker sits at its RSS high-water mark; the job must still yield a sample
+    recorded = []
+
+    def ingest(meta, cancel_event, recreate=False):
+        block = b"x" * (64 << 20)
+        time.sleep(0.6)
+        del block
+
+    monkeypatch.setattr(manager, "_ingest_manual", ingest)
+    monkeypatch.setattr(manager, "_record_ingestion_run", lambda meta, estimate, seconds, memory_mb: recorded.append(memory_mb))
+    meta = ManualMetadata("owner", "owner.pdf", str(tmp_path / "store" / "owner"), "owner", "owner.pdf", "Toyota")
+
+    manager._background_ingest(meta, threading.Event(), {"timeout": 30})
+    assert len(recorded) == 1 and recorded[0] is not None
+    assert recorded[0] >= 48
+
+
+def test_rejected_duplicate_upload_leaves_live_file_intact(manager, pipeline, monkeypatch, tmp_path):
+    import asyncio
+
+    from fastapi import HTTPException
+
+    uploads = tmp_path / "uploads"
+    live = uploads / "owner" / "owner.pdf"
+    live.parent.mkdir(parents=True)
+    live.write_bytes(b"%PDF-1.7 live version")
+    manager.register_manual("owner", live, "owner.pdf", "Toyota")
+    assert manager.get_status("owner") is ManualStatus.READY
+
+    monkeypatch.setattr(main, "manual_manager", manager)
+    monkeypatch.setattr(main, "UPLOAD_DIR", uploads)
+    staged = main._staging_path("owner", "owner.pdf")
+    staged.write_bytes(b"%PDF-1.7 duplicate")
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(main._register_upload("owner", staged, "owner.pdf", "Toyota", None, None, False, "0" * 64))
+    assert excinfo.value.status_code == 400
+    assert live.read_bytes() == b"%PDF-1.7 live version"
+    assert not staged.exists()
+    assert manager.get_chain("owner").source == str(live.resolve())
+
+
+def test_accepted_replacement_is_installed_at_the_manual_path(manager, pipeline, tmp_path):
+    live = tmp_path / "uploads" / "owner" / "owner.pdf"
+    live.parent.mkdir(parents=True)
+    live.write_bytes(b"%PDF-1.7 v1")
+    manager.register_manual("owner", live, "owner.pdf", "Toyota")
+
+    staged = live.parent / ".incoming-test-owner.pdf"
+    staged.write_bytes(b"%PDF-1.7 v2")
+    manager.register_manual("owner", staged, "owner.pdf", "Toyota", replace_existing=True, install_path=live)
+    assert live.read_bytes() == b"%PDF-1.7 v2" and not staged.exists()
+    assert manager.get_chain("owner").source == str(live.resolve())
@@ -0,0 +1,172 @@
+"""
+Tests for the OCR engine backends
+Run with: python -m pytest test_ocr_engine.py
+"""
+
+import stat
+import sys
+import textwrap
+import threading
+import time
+
+import pytest
+
+import ocr_engine
+from ocr_engine import (
+    BatchTesseractEngine,
+    OCRCancelledError,
+    create_engine,
+    is_better_ocr,
+    novel_text,
+    select_for_rerender,
+    select_image_regions,
+)
+
+# Stand-in for the tesseract CLI: "recognizes" each listed image as its file
+# contents and reports one confident word per page. Sleeps on multi-page
+# batches when asked to, to exercise the timeout fallback.
+_FAKE_TESSERACT = textwrap.dedent(
+    """\
+    #!{python}
+    import os, sys, time
+    list_path, outbase = sys.argv[1], sys.argv[2]
+    paths = [line.strip() for line in open(list_path) if line.strip()]
+    if os.environ.get("FAKE_SLOW_BATCH") and len(paths) > 1:
+        time.sleep(5)
+    with open(outbase + ".txt", "w") as out:
+        for path in paths:
+            text = open(path, "rb").read().decode()
+            if os.environ.get("FAKE_REPORT_OMP"):
+                text = "omp=" + os.environ.get("OMP_THREAD_LIMIT", "unset")
+            out.write(text + "\\n\\f")
+    with open(outbase + ".tsv", "w") as out:
+        out.write("level\\tpage_num\\tblock_num\\tpar_num\\tline_num\\tword_num\\tleft\\ttop\\twidth\\theight\\tconf\\ttext\\n")
+        for page, path in enumerate(paths, start=1):
+            out.write(f"5\\t{{page}}\\t1\\t1\\t1\\t1\\t0\\t0\\t1\\t1\\t{{90 - page}}\\tword\\n")
+            out.write(f"5\\t{{page}}\\t1\\t1\\t1\\t2\\t0\\t0\\t1\\t1\\t-1\\t\\n")
+    """
+)
+
+
+def _fake_binary(tmp_path, monkeypatch):
+    script = tmp_path / "tesseract"
+    script.write_text(_FAKE_TESSERACT.format(python=sys.executable))
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("TESSERACT_CMD", str(script))
+
+
+def test_batch_engine_splits_pages_and_confidences(tmp_path, monkeypatch):
+    _fake_binary(tmp_path, monkeypatch)
+    engine = BatchTesseractEngine("eng", "--psm 6", timeout=10.0, batch_size=3)
+    results = engine.recognize([b"first page", b"second page", b"third page"])
+
+    assert [result.text.strip() for result in results] == ["first page", "second page", "third page"]
+    assert [result.confidence for result in results] == [89.0, 88.0, 87.0]
+
+
+def test_batch_timeout_retries_pages_individually(tmp_path, monkeypatch):
+    _fake_binary(tmp_path, monkeypatch)
+    monkeypatch.setenv("FAKE_SLOW_BATCH", "1")
+    engine = BatchTesseractEngine("eng", "--psm 6", timeout=0.5, batch_size=2)
+    results = engine.recognize([b"a", b"b"])
+    assert [result.text.strip() for result in results] == ["a", "b"]
+
+
+def test_batch_cancel_kills_running_tesseract(tmp_path, monkeypatch):
+    _fake_binary(tmp_path, monkeypatch)
+    monkeypatch.setenv("FAKE_SLOW_BATCH", "1")
+    engine = BatchTesseractEngine("eng", "--psm 6", timeout=30.0, batch_size=2)
+    cancel = threading.Event()
+    threading.Timer(0.3, cancel.set).start()
+
+    started = time.monotonic()
+    with pytest.raises(OCRCancelledError):
+        engine.recognize([b"a", b"b"], cancel.is_set)
+    # Well short of the 5 s fake batch and the 60 s group timeout
+    assert time.monotonic() - started < 3.0
+
+
+def test_batch_tesseract_runs_with_thread_limit(tmp_path, monkeypatch):
+    _fake_binary(tmp_path, monkeypatch)
+    monkeypatch.setenv("FAKE_REPORT_OMP", "1")
+    monkeypatch.delenv("OMP_THREAD_LIMIT", raising=False)
+    engine = create_engine("eng", "--psm 6", 10.0, backend="batch")
+    assert [result.text.strip() for result in engine.recognize([b"a"])] == ["omp=1"]
+
+
+@pytest.mark.parametrize("backend", ["tesserocr", "batch", "pytesseract"])
+def test_every_backend_starts_with_thread_limit(monkeypatch, backend):
+    seen = []
+
+    class Recording(ocr_engine.OCREngine):
+        name = backend
+
+        def __init__(self, lang, config, timeout):
+            super().__init__(lang, config, timeout)
+            # tesserocr reads the limit as it initialises; subprocess backends inherit it
+            seen.append(ocr_engine.os.environ.get("OMP_THREAD_LIMIT"))
+
+        def recognize(self, images, cancel_callback=None):
+            return []
+
+    monkeypatch.delenv("OMP_THREAD_LIMIT", raising=False)
+    monkeypatch.setitem(ocr_engine._ENGINES, backend, Recording)
+    assert create_engine("eng", "--psm 6", 1.0, backend=backend) is not None
+    assert seen == ["1"]
+
+
+def test_engine_without_recognize_fails_at_creation():
+    class Incomplete(ocr_engine.OCREngine):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete("eng", "--psm 6", 1.0)
+
+
+def test_explicit_thread_limit_is_kept(monkeypatch):
+    monkeypatch.setenv("OMP_THREAD_LIMIT", "3")
+    ocr_engine.limit_tesseract_threads()
+    assert ocr_engine.os.environ["OMP_THREAD_LIMIT"] == "3"
+
+
+def test_create_engine_falls_back_when_unavailable(monkeypatch):
+    monkeypatch.delenv("OMP_THREAD_LIMIT", raising=False)
+    monkeypatch.setenv("TESSERACT_CMD", "/nonexistent/tesseract")
+    assert create_engine("eng", "--psm 6", 1.0, backend="batch") is None
+
+
+def test_select_for_rerender_respects_threshold_and_budget():
+    confidences = {1: 95.0, 2: 40.0, 3: 70.0, 4: None, 5: 0.0, 6: 79.9}
+    assert select_for_rerender(confidences, 80.0, None, 2.0) == [2, 3, 5, 6]
+    # Budget for two high-DPI pages: the least confident ones win.
+    assert select_for_rerender(confidences, 80.0, 5.0, 2.0) == [2, 5]
+    assert select_for_rerender(confidences, 80.0, -1.0, 2.0) == []
+
+
+def test_is_better_ocr_never_downgrades():
+    assert is_better_ocr("clear text", 91.0, "c1ear tcxt", 60.0)
+    assert not is_better_ocr("worse", 50.0, "fine", 60.0)
+    assert not is_better_ocr("   ", 99.0, "fine", 10.0)
+    assert is_better_ocr("anything", None, "", None)
+    assert is_better_ocr("longer text", None, "short", 70.0)
+
+
+def test_select_image_regions_drops_icons_backgrounds_and_overlaps():
+    page = (0.0, 0.0, 600.0, 800.0)
+    boxes = [
+        (0, 0, 600, 800),      # full-page background
+        (10, 10, 30, 30),      # icon
+        (100, 100, 400, 300),  # diagram
+        (120, 120, 380, 280),  # nested in the diagram
+        (50, 500, 250, 900),   # label photo running off the page
+    ]
+    regions = select_image_regions(page, boxes, min_side=48)
+    assert regions == [(100, 100, 400, 300), (50, 500, 250, 800)]
+    assert select_image_regions(page, boxes, max_regions=1) == [(100, 100, 400, 300)]
+
+
+def test_novel_text_skips_text_already_on_page():
+    page_text = "Tire pressure label is on the driver door jamb"
+    assert novel_text("Tire pressure label", page_text) == ""
+    assert novel_text("FRONT 240 kPa REAR 250 kPa", page_text) == "FRONT 240 kPa REAR 250 kPa"
+    assert novel_text("x", page_text) == ""
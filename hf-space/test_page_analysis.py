@@ -0,0 +1,81 @@
+"""
+Tests for page-level text analysis (boilerplate detection, contents and index page classification)
+Run with: python -m pytest test_page_analysis.py
+"""
+
+from page_analysis import classify_navigation_page, find_boilerplate, normalize_line, strip_boilerplate
+
+
+TOPICS = ["Brake fluid", "Engine oil", "Coolant", "Tire rotation", "Wiper blades", "Battery", "Air filter"]
+
+
+def _manual(pages=10):
+    manual = []
+    for number in range(1, pages + 1):
+        chapter = "Maintenance" if number <= pages // 2 else "Driving"
+        manual.append([
+            "2023 4RUNNER OWNER'S MANUAL",
+            chapter,
+            TOPICS[number % len(TOPICS)],
+            f"Check the {TOPICS[(number * 2) % len(TOPICS)].lower()} when the engine is cold.",
+            f"Step {number}: {TOPICS[(number * 3) % len(TOPICS)].lower()}",
+            f"Page {number}",
+        ])
+    return manual
+
+
+def test_normalize_line_ignores_numbers_and_case():
+    assert normalize_line("Page  12 ") == normalize_line("PAGE 13") == "page #"
+
+
+def test_find_boilerplate_catches_headers_footers_and_chapter_titles():
+    boilerplate = find_boilerplate(_manual(), min_pages=4)
+    assert (0, "# #runner owner's manual") in boilerplate
+    assert (1, "maintenance") in boilerplate and (1, "driving") in boilerplate
+    assert (-1, "page #") in boilerplate
+
+
+def test_strip_boilerplate_keeps_body_lines():
+    manual = _manual()
+    boilerplate = find_boilerplate(manual, min_pages=4)
+    stripped = strip_boilerplate(manual[0], boilerplate)
+    assert stripped == [
+        "Engine oil",
+        "Check the coolant when the engine is cold.",
+        "Step 1: tire rotation",
+    ]
+
+
+def test_repeated_line_in_the_middle_of_pages_is_kept():
+    pages = [["Header", "a", "b", "c", "Repeated body", "d", "e", "f", str(n)] for n in range(8)]
+    boilerplate = find_boilerplate(pages, min_pages=4)
+    assert all(key[1] != "repeated body" for key in boilerplate)
+    assert "Repeated body" in strip_boilerplate(pages[0], boilerplate)
+
+
+def test_contents_pages_are_detected():
+    with_leaders = ["Contents"] + [f"{title} .......... {page}" for title, page in
+                                   [("Seat belts", 34), ("SRS airbags", 40), ("Keys", 112), ("Doors", 118),
+                                    ("Seats", 130), ("Mirrors", 141), ("Windows", 150), ("Driving", 160)]]
+    split_layout = ["Table of contents"]
+    for title, page in [("For safety and security", 21), ("For safe use", 24), ("Seat belts", 34), ("SRS airbags", 40), ("Vehicle status", 85)]:
+        split_layout += [title, str(page)]
+    assert classify_navigation_page(with_leaders) == "toc"
+    assert classify_navigation_page(split_layout) == "toc"
+
+
+def test_index_pages_are_detected():
+    index = ["Index", "A", "ABS 312", "Air conditioning system 402, 410", "Airbags 40, 52", "Alarm 98",
+             "Antenna 455", "B", "Battery 510, 530", "Brake fluid 502", "Brakes 310"]
+    assert classify_navigation_page(index) == "index"
+
+
+def test_body_and_specification_pages_are_kept():
+    body = ["WARNING", "Observe the following precautions.", "Never allow anyone to ride in the cargo area.",
+            "Front 240 kPa (2.4 kgf/cm2 or bar, 35 psi)", "Rear 240 kPa (2.4 kgf/cm2 or bar, 35 psi)",
+            "Engine oil capacity 6.2 L (6.6 qt., 5.5 Imp.qt.)", "Check the pressure monthly.", "See page 512."]
+    spec = ["Engine oil", "Drain and refill 6.2", "Capacity with filter 5.7", "Coolant 10.8",
+            "Transmission fluid 7.6", "Front tires 240", "Rear tires 240", "Spare tire 420", "Fuel tank 87"]
+    assert classify_navigation_page(body) is None
+    assert classify_navigation_page(spec) is None
+    assert classify_navigation_page(["Seat belts 34", "Airbags 40"]) is None  # too short to judge
@@ -0,0 +1,120 @@
+"""
+Tests for the shared PDF page model.
+Run with: python -m pytest test_page_model.py
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from page_model import PageModel
+from sections import extract_sections
+
+
+def _span(text, size=10.0, flags=0, font="Helvetica"):
+    return {"text": text, "size": size, "flags": flags, "font": font}
+
+
+def _block(x0, y0, x1, y1, lines, block_type=0):
+    """A get_text("dict") block; ``lines`` are lists of spans."""
+    return {
+        "type": block_type,
+        "bbox": (x0, y0, x1, y1),
+        "lines": [{"bbox": (x0, y0 + 12 * i, x1, y0 + 12 * (i + 1)), "spans": spans} for i, spans in enumerate(lines)],
+    }
+
+
+class FakePage:
+    def __init__(self, blocks, images=()):
+        self.rect = SimpleNamespace(width=600.0, height=800.0)
+        self._blocks = blocks
+        self._images = images
+        self.textpages = 0
+
+    def get_textpage(self):
+        self.textpages += 1
+        return object()
+
+    def get_text(self, option, textpage=None):
+        assert option == "dict" and textpage is not None
+        return {"blocks": self._blocks}
+
+    def get_image_info(self):
+        return [{"bbox": box} for box in self._images]
+
+
+class FakeDocument:
+    name = "fake.pdf"
+
+    def __init__(self, pages, toc=()):
+        self.pages = pages
+        self.toc = list(toc)
+        self.loads = 0
+
+    def get_toc(self, simple=True):
+        return self.toc
+
+    @property
+    def page_count(self):
+        return len(self.pages)
+
+    def load_page(self, index):
+        self.loads += 1
+        return self.pages[index]
+
+
+def _document():
+    return FakeDocument([
+        FakePage(
+            [_block(0, 0, 100, 20, [[_span("Tire pressure", 16.0, flags=16)]]), _block(0, 30, 100, 60, [], block_type=1)],
+            [(10, 100, 300, 400)],
+        ),
+        FakePage([_block(0, 0, 100, 20, [[_span("   ")]])]),
+        FakePage([_block(0, 0, 100, 40, [[_span("Brake "), _span("fluid", font="Helvetica-Bold")], [_span("DOT 3")]])]),
+    ])
+
+
+def test_model_reads_each_page_once():
+    pdf = _document()
+    model = PageModel.from_document(pdf)
+    assert pdf.loads == 3
+    assert all(page.textpages == 1 for page in pdf.pages)
+    assert model.page_count == 3
+    assert model.text_pages() == [1, 3]
+    assert model.textless_pages() == [2]
+
+
+def test_model_keeps_text_blocks_and_image_boxes():
+    model = PageModel.from_document(_document())
+    first = model.page(1)
+    assert [block.text for block in first.blocks] == ["Tire pressure"]
+    assert first.image_boxes == [(10, 100, 300, 400)]
+    assert first.box == (0.0, 0.0, 600.0, 800.0)
+    assert model.page(3).text == "Brake fluid\nDOT 3"
+
+
+def test_model_records_span_fonts():
+    model = PageModel.from_document(_document())
+    heading = model.page(1).blocks[0].lines[0].spans[0]
+    assert (heading.size, heading.bold) == (16.0, True)
+    assert [span.bold for span in model.page(3).blocks[0].lines[0].spans] == [False, True]
+
+
+def test_heading_sections_come_from_the_model_without_reloading_pages():
+    pdf = _document()
+    model = PageModel.from_document(pdf)
+    index = extract_sections(model)
+    assert pdf.loads == 3
+    assert [(s.title, s.start_page, s.end_page) for s in index.sections] == [("Tire pressure", 1, 3)]
+
+
+def test_model_build_is_cancellable():
+    calls = []
+
+    def cancel():
+        calls.append(1)
+        if len(calls) == 2:
+            raise RuntimeError("cancelled")
+
+    with pytest.raises(RuntimeError):
+        PageModel.from_document(_document(), cancel)
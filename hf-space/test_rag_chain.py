@@ -0,0 +1,52 @@
+"""
+Tests for the chat chain's context building
+Run with: python -m pytest test_rag_chain.py
+"""
+
+from types import SimpleNamespace
+
+import rag_chain
+
+
+class FakeRetriever:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def invoke(self, query):
+        return self.docs
+
+
+def _context_for(monkeypatch, docs):
+    contexts = []
+
+    def fake_llm(question, context):
+        contexts.append(context)
+        return "The manual explains how to check the tire pressure step by step."
+
+    monkeypatch.setattr(rag_chain, "get_reranker", lambda: None)
+    monkeypatch.setattr(rag_chain, "USE_LLM", True)
+    monkeypatch.setattr(rag_chain, "USE_GROQ", True)
+    monkeypatch.setattr(rag_chain, "_call_llm", fake_llm)
+    rag_chain.make_rag_chain(FakeRetriever(docs)).invoke("How do I check the tire pressure?")
+    return contexts[0]
+
+
+def test_context_cites_page_span_of_chunk_crossing_pages(monkeypatch):
+    spanning = SimpleNamespace(
+        page_content="Check the tire pressure when the tires are cold. Continue on the next page with the label.",
+        metadata={"page": 212, "start_page": 212, "end_page": 213},
+    )
+    single = SimpleNamespace(
+        page_content="The recommended tire pressure is printed on the tire and loading information label.",
+        metadata={"page": 214, "start_page": 214, "end_page": 214},
+    )
+    context = _context_for(monkeypatch, [spanning, single])
+    assert "[Source 1 - Pages 212-213]" in context
+    assert "[Source 2 - Page 214]" in context
+
+
+def test_page_reference_falls_back_through_metadata_keys():
+    assert rag_chain._page_reference({"pages": "3,7"}) == "Pages 3, 7"
+    assert rag_chain._page_reference({"page_number": 300}) == "Page 300"
+    assert rag_chain._page_reference({"page": 5}) == "Page 5"
+    assert rag_chain._page_reference({}) is None
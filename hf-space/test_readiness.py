@@ -0,0 +1,64 @@
+"""
+Tests for startup warm-up and the /ready endpoint
+Run with: python -m pytest test_readiness.py
+"""
+
+import asyncio
+import sys
+import types
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("dotenv")
+
+from fastapi import Response  # noqa: E402
+
+import main  # noqa: E402
+import rag_chain  # noqa: E402
+
+
+@pytest.fixture
+def warmup_state(monkeypatch):
+    state = {"status": "pending", "seconds": None, "error": None}
+    monkeypatch.setattr(main, "_warmup_state", state)
+    return state
+
+
+def _ready():
+    response = Response()
+    body = asyncio.run(main.ready(response))
+    return response.status_code, body
+
+
+def test_ready_is_503_when_warm_up_fails(monkeypatch, warmup_state):
+    def broken_warm_up():
+        raise OSError("model files missing")
+
+    monkeypatch.setitem(sys.modules, "vector_store", types.SimpleNamespace(warm_up=broken_warm_up))
+    main._warm_up_models()
+
+    status, body = _ready()
+    assert status == 503
+    assert body["status"] == "failed"
+    assert "model files missing" in body["error"]
+
+
+def test_ready_after_successful_warm_up(monkeypatch, warmup_state):
+    monkeypatch.setitem(sys.modules, "vector_store", types.SimpleNamespace(warm_up=lambda: 0.0))
+    monkeypatch.setattr("reranker.get_reranker", lambda: None)
+    main._warm_up_models()
+
+    status, body = _ready()
+    assert status == 200
+    assert body["status"] == "ready" and body["error"] is None
+
+
+def test_config_logged_with_warm_up_disabled(monkeypatch, warmup_state):
+    logged = []
+    monkeypatch.setattr(main, "MANUAL_WARMUP", False)
+    monkeypatch.setattr(rag_chain, "log_config", lambda: logged.append(True))
+
+    asyncio.run(main.start_warmup())
+    assert logged == [True]
+    assert _ready()[0] == 200
@@ -0,0 +1,84 @@
+"""
+Tests for the cross-encoder reranking stage
+Run with: python -m pytest test_reranker.py
+"""
+
+from types import SimpleNamespace
+
+import reranker as reranker_module
+from reranker import Reranker, ScoreCache, get_reranker
+
+
+def _doc(text):
+    return SimpleNamespace(page_content=text, metadata={})
+
+
+def _keyword_scorer(calls):
+    def score(pairs):
+        calls.append(len(pairs))
+        return [float(passage.count(question.split()[0])) for question, passage in pairs]
+
+    return score
+
+
+def test_rerank_orders_candidates_and_keeps_tail():
+    calls = []
+    reranker = Reranker(_keyword_scorer(calls), candidates=3, max_wait_ms=1)
+    docs = [_doc("brake fluid"), _doc("tire tire tire"), _doc("tire"), _doc("tire tire tire tire")]
+
+    ranked = reranker.rerank("tire pressure", docs)
+    assert [doc.page_content for doc in ranked] == ["tire tire tire", "tire", "brake fluid", "tire tire tire tire"]
+    assert calls == [3]
+
+
+def test_scores_are_cached_per_question_and_chunk():
+    calls = []
+    reranker = Reranker(_keyword_scorer(calls), candidates=10, max_wait_ms=1)
+    docs = [_doc("oil oil"), _doc("oil")]
+
+    reranker.rerank("oil change", docs)
+    reranker.rerank("oil change", docs)
+    assert calls == [2]
+    assert reranker.cache.hits == 2
+
+    reranker.rerank("oil change", docs + [_doc("oil filter")])
+    assert calls == [2, 1]
+
+
+def test_differently_cased_question_is_rescored():
+    calls = []
+    reranker = Reranker(_keyword_scorer(calls), candidates=10, max_wait_ms=1)
+    docs = [_doc("oil oil"), _doc("Oil")]
+
+    assert reranker.scores("oil change", docs) == [2.0, 0.0]
+    # The model sees the question as typed, so its cached scores can't stand in
+    assert reranker.scores("Oil change", docs) == [0.0, 1.0]
+    assert calls == [2, 2]
+
+
+def test_score_cache_evicts_least_recent():
+    cache = ScoreCache(max_size=2)
+    cache.put(("q", "a"), 1.0)
+    cache.put(("q", "b"), 2.0)
+    assert cache.get(("q", "a")) == 1.0
+    cache.put(("q", "c"), 3.0)
+    assert cache.get(("q", "b")) is None
+    assert cache.get(("q", "a")) == 1.0
+
+
+def test_failed_model_load_disables_reranking_once(monkeypatch):
+    attempts = []
+
+    def broken_load(name, max_length):
+        attempts.append(name)
+        raise OSError("cross-encoder weights are corrupt")
+
+    monkeypatch.setattr(reranker_module, "RERANK_ENABLED", True)
+    monkeypatch.setattr(reranker_module, "load_cross_encoder", broken_load)
+    get_reranker.cache_clear()
+    try:
+        assert get_reranker() is None
+        assert get_reranker() is None
+        assert len(attempts) == 1
+    finally:
+        get_reranker.cache_clear()
@@ -0,0 +1,93 @@
+"""
+Tests for the CPU resource governor
+Run with: python -m pytest test_resource_governor.py
+"""
+
+import threading
+
+from resource_governor import ResourceGovernor, WorkBudget
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_serving_traffic_shrinks_ingestion_budget():
+    clock = FakeClock()
+    governor = ResourceGovernor(8, 2, active_window=5.0, set_torch_threads=lambda n: None, clock=clock)
+    assert governor.ingestion_cores() == 8
+
+    with governor.serving_request():
+        assert governor.ingestion_cores() == 6
+    clock.now += 4.0
+    assert governor.serving_active()
+    assert governor.ingestion_cores() == 6
+    clock.now += 2.0
+    assert governor.ingestion_cores() == 8
+
+
+def test_ocr_slots_follow_budget_and_resize_torch():
+    threads = []
+    governor = ResourceGovernor(4, 2, set_torch_threads=threads.append)
+    with governor.ingestion_job(), governor.serving_request():
+        first = governor.ocr_slot()
+        second = governor.ocr_slot()
+        first.__enter__()
+        second.__enter__()
+        # Serving keeps 2 of 4 cores and OCR holds the other 2: embedding is left with one thread
+        assert governor.torch_threads() == 1
+
+        acquired = threading.Event()
+
+        def third():
+            with governor.ocr_slot(poll=0.01):
+                acquired.set()
+
+        waiter = threading.Thread(target=third)
+        waiter.start()
+        assert not acquired.wait(0.1)
+        second.__exit__(None, None, None)
+        assert acquired.wait(1.0)
+        waiter.join()
+        first.__exit__(None, None, None)
+
+    assert governor.torch_threads() == 4
+    assert threads[0] == 4 and threads[-1] == 4 and min(threads) == 1
+
+
+def test_serving_throttles_ingest_embedding():
+    clock = FakeClock()
+    threads = []
+    governor = ResourceGovernor(8, 2, active_window=5.0, set_torch_threads=threads.append, clock=clock)
+    with governor.serving_request():
+        # No ingestion running: chat gets every core
+        assert governor.torch_threads() == 8
+    with governor.ingestion_job():
+        assert governor.torch_threads() == 6
+        clock.now += 10.0
+        # The serving window lapsed without an event; the next encode batch picks that up
+        assert governor.refresh() == 8
+    assert threads[-1] == 8
+
+
+def test_work_budget_checks_wall_and_cpu_limits():
+    clock, cpu = FakeClock(), FakeClock()
+    budget = WorkBudget(10.0, 4.0, clock=clock, cpu_clock=cpu)
+    assert budget.can_afford(5.0, 2.0)
+    clock.now += 6.0
+    assert budget.spent() == (6.0, 0.0)
+    assert not budget.can_afford(5.0)
+    assert budget.can_afford(3.0, 3.0)
+    cpu.now += 3.5
+    assert not budget.can_afford(cpu_estimate=1.0)
+
+
+def test_work_budget_zero_means_unlimited():
+    clock = FakeClock()
+    budget = WorkBudget(clock=clock, cpu_clock=clock)
+    clock.now += 1e6
+    assert budget.can_afford(1e6, 1e6)
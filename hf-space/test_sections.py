@@ -0,0 +1,71 @@
+"""
+Tests for section extraction and the section interval index
+Run with: python -m pytest test_sections.py
+"""
+
+from sections import SectionIndex, sections_from_headings, sections_from_toc
+
+TOC = [
+    [1, "For safety and security", 10],
+    [2, "Seat belts", 12],
+    [2, "SRS airbags", 20],
+    [1, "Maintenance and care", 40],
+    [2, "Engine oil", 42],
+    [3, "Checking the oil level", 43],
+    [2, "Tires", 50],
+    [1, "When trouble arises", 60],
+    [1, "Broken link", -1],
+]
+
+
+def test_sections_from_toc_nest_and_end_at_next_sibling():
+    sections = sections_from_toc(TOC, page_count=80)
+    assert [(s.title, s.level, s.start_page, s.end_page) for s in sections] == [
+        ("For safety and security", 1, 10, 39),
+        ("Seat belts", 2, 12, 19),
+        ("SRS airbags", 2, 20, 39),
+        ("Maintenance and care", 1, 40, 59),
+        ("Engine oil", 2, 42, 49),
+        ("Tires", 2, 50, 59),
+        ("When trouble arises", 1, 60, 80),
+    ]
+
+
+def test_section_at_returns_most_specific_section():
+    index = SectionIndex(sections_from_toc(TOC, page_count=80))
+    assert index.section_at(5) is None
+    assert index.section_at(11).title == "For safety and security"
+    assert index.section_at(25).title == "SRS airbags"
+    assert index.section_at(43).title == "Engine oil"
+    assert index.section_at(80).title == "When trouble arises"
+    assert index.section_at(81) is None
+
+
+def test_match_includes_nested_sections_and_skips_broad_matches():
+    index = SectionIndex(sections_from_toc(TOC, page_count=80))
+    ids = index.match("How often should I check the tires?")
+    assert [index.sections[i].title for i in ids] == ["Tires"]
+    ids = index.match("What maintenance and care does the truck need?")
+    assert [index.sections[i].title for i in ids] == ["Maintenance and care", "Engine oil", "Tires"]
+    assert index.match("Tell me about the radio") == []
+
+
+def test_one_word_title_mentioned_in_passing_does_not_narrow():
+    index = SectionIndex(sections_from_toc(TOC, page_count=80))
+    assert index.match("The tires squeal when I turn the steering wheel while parked") == []
+    # A two-word title still needs two of its words, not just "engine"
+    assert index.match("My engine makes a rattling noise when I press the brake pedal") == []
+
+
+def test_sections_from_headings_merges_running_titles():
+    headings = [(3, "Safety"), (4, "SAFETY"), (5, "Safety"), (9, "Maintenance"), (10, "Maintenance")]
+    sections = sections_from_headings(headings, page_count=12)
+    assert [(s.title, s.start_page, s.end_page) for s in sections] == [("Safety", 3, 8), ("Maintenance", 9, 12)]
+
+
+def test_index_round_trips_through_json(tmp_path):
+    index = SectionIndex(sections_from_toc(TOC, page_count=80))
+    index.save(tmp_path / "sections.json")
+    loaded = SectionIndex.load(tmp_path / "sections.json")
+    assert loaded.sections == index.sections
+    assert len(SectionIndex.load(tmp_path / "missing.json")) == 0
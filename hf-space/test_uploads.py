@@ -0,0 +1,156 @@
+"""
+Tests for streaming manual uploads
+Run with: python -m pytest test_uploads.py
+"""
+
+import asyncio
+import hashlib
+
+import pytest
+
+from uploads import ResumableUploadStore, UploadRejectedError, parse_content_range, stream_upload_to_path
+
+
+class FakeUpload:
+    """Mimics the async ``read(size)`` interface of FastAPI's UploadFile."""
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self.offset = 0
+
+    async def read(self, size: int = -1) -> bytes:
+        end = len(self.data) if size < 0 else self.offset + size
+        chunk = self.data[self.offset:end]
+        self.offset += len(chunk)
+        return chunk
+
+
+def _store(data: bytes, dest_path, **kwargs):
+    return asyncio.run(stream_upload_to_path(FakeUpload(data), dest_path, **kwargs))
+
+
+def test_streams_pdf_with_hash(tmp_path):
+    payload = b"%PDF-1.7\n" + b"x" * 5000
+    dest = tmp_path / "manual" / "owner.pdf"
+    stored = _store(payload, dest, chunk_size=512)
+
+    assert stored.size == len(payload)
+    assert stored.sha256 == hashlib.sha256(payload).hexdigest()
+    assert dest.read_bytes() == payload
+    assert [p.name for p in dest.parent.iterdir()] == ["owner.pdf"]
+
+
+def test_rejects_non_pdf_early(tmp_path):
+    dest = tmp_path / "notes.pdf"
+    with pytest.raises(UploadRejectedError) as excinfo:
+        _store(b"PK\x03\x04" + b"z" * 4096, dest, chunk_size=256)
+    assert excinfo.value.status_code == 415
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_rejects_oversized_and_empty(tmp_path):
+    dest = tmp_path / "big.pdf"
+    with pytest.raises(UploadRejectedError) as excinfo:
+        _store(b"%PDF-1.4" + b"0" * 4096, dest, max_bytes=2048, chunk_size=512)
+    assert excinfo.value.status_code == 413
+
+    with pytest.raises(UploadRejectedError) as excinfo:
+        _store(b"%PDF-1.4", dest, max_bytes=2048, declared_size=10_000)
+    assert excinfo.value.status_code == 413
+
+    with pytest.raises(UploadRejectedError) as excinfo:
+        _store(b"", dest)
+    assert excinfo.value.status_code == 400
+    assert list(tmp_path.iterdir()) == []
+
+
+async def _chunks(*parts):
+    for part in parts:
+        yield part
+
+
+def _put(store, upload_id, data: bytes, start: int):
+    return asyncio.run(store.write_range(upload_id, start, start + len(data), _chunks(data)))
+
+
+def test_resumable_upload_out_of_order(tmp_path):
+    payload = b"%PDF-1.5\n" + bytes(range(256)) * 40
+    store = ResumableUploadStore(tmp_path / "sessions")
+    session = store.create("../owner.pdf", len(payload), {"brand": "Toyota"})
+    assert session.filename == "owner.pdf"
+    assert (tmp_path / "sessions" / f"{session.upload_id}.part").stat().st_size == len(payload)
+
+    tail = _put(store, session.upload_id, payload[6000:], 6000)
+    assert tail.offset == 0
+    assert tail.missing() == [[0, 6000]]
+
+    with pytest.raises(UploadRejectedError) as excinfo:
+        store.finalize(session.upload_id, tmp_path / "out.pdf")
+    assert excinfo.value.status_code == 409
+
+    _put(store, session.upload_id, payload[:3000], 0)
+    resumed = _put(store, session.upload_id, payload[2000:6000], 2000)
+    assert resumed.complete
+
+    stored, final = store.finalize(session.upload_id, tmp_path / "manual" / "owner.pdf")
+    assert stored.path.read_bytes() == payload
+    assert stored.sha256 == hashlib.sha256(payload).hexdigest()
+    assert final.fields == {"brand": "Toyota"}
+    store.close(session.upload_id)
+    with pytest.raises(KeyError):
+        store.get(session.upload_id)
+
+
+def test_failed_registration_keeps_the_upload(tmp_path):
+    payload = b"%PDF-1.5\n" + b"y" * 3000
+    store = ResumableUploadStore(tmp_path / "sessions")
+    session = store.create("owner.pdf", len(payload))
+    _put(store, session.upload_id, payload, 0)
+    dest = tmp_path / "manual" / "owner.pdf"
+
+    store.finalize(session.upload_id, dest)
+    # No more ranges while the file is registered
+    with pytest.raises(UploadRejectedError) as excinfo:
+        _put(store, session.upload_id, payload[:10], 0)
+    assert excinfo.value.status_code == 409
+
+    store.rollback(session.upload_id, dest)
+    assert not dest.exists() and store.get(session.upload_id).complete
+    stored, _ = store.finalize(session.upload_id, dest)
+    assert stored.path.read_bytes() == payload
+
+
+def test_live_sessions_are_capped(tmp_path):
+    store = ResumableUploadStore(tmp_path / "sessions", max_sessions=2)
+    first = store.create("a.pdf", 1024)
+    store.create("b.pdf", 1024)
+    with pytest.raises(UploadRejectedError) as excinfo:
+        store.create("c.pdf", 1024)
+    assert excinfo.value.status_code == 429
+    assert len(list((tmp_path / "sessions").glob("*.part"))) == 2
+    store.abort(first.upload_id)
+    store.create("c.pdf", 1024)
+
+
+def test_resumable_upload_keeps_partial_body(tmp_path):
+    store = ResumableUploadStore(tmp_path / "sessions")
+    session = store.create("manual.pdf", 4096)
+
+    async def dropped():
+        yield b"%PDF-1.4" + b"a" * 1000
+        raise ConnectionError("client disconnected")
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(store.write_range(session.upload_id, 0, 4096, dropped()))
+    assert store.get(session.upload_id).offset == 1008
+
+    with pytest.raises(UploadRejectedError) as excinfo:
+        _put(store, store.create("x.pdf", 2048).upload_id, b"GIF89a" + b"0" * 2042, 0)
+    assert excinfo.value.status_code == 415
+
+
+def test_parse_content_range():
+    assert parse_content_range("bytes 0-1023/4096") == (0, 1024, 4096)
+    assert parse_content_range("bytes 10-19/*") == (10, 20, None)
+    with pytest.raises(UploadRejectedError):
+        parse_content_range("items 0-1/2")
@@ -0,0 +1,124 @@
+"""
+Tests for the dashboard message index
+Run with: python -m pytest test_warning_index.py
+"""
+
+from types import SimpleNamespace
+
+import rag_chain
+from warning_index import WarningIndex, extract_messages, format_answer, message_context, normalize_message, page_messages
+
+PAGE = (
+    "Warning messages\n"
+    "If “Braking Power Low Stop in a Safe Place” is displayed, the brake system may be malfunctioning. "
+    "Stop the vehicle in a safe place immediately and contact your Toyota dealer. Do not continue driving.\n"
+    "Brake system warning light\n"
+    "Indicates a low brake fluid level or a malfunction in the brake system.\n"
+    "\"Engine Coolant Temp High\" means the engine may overheat.\n"
+)
+
+
+def _index():
+    index = WarningIndex()
+    for message, kind in page_messages(PAGE):
+        index.add(message, kind, 482, message_context(PAGE, message))
+    return index
+
+
+PROCEDURE_PAGE = (
+    "Checking the engine oil\n"
+    "With the engine at operating temperature, pull out the dipstick. "
+    "If the oil pressure indicator comes on while driving, stop the engine.\n"
+    "Check the oil level on the information display.\n"
+)
+
+
+def test_extract_messages_finds_quoted_and_indicator_names():
+    found = dict(extract_messages(PAGE.splitlines()))
+    assert found == {
+        "Braking Power Low Stop in a Safe Place": "quoted",
+        "Brake system warning light": "indicator",
+        "Engine Coolant Temp High": "quoted",
+    }
+
+
+def test_only_warning_message_pages_are_indexed():
+    assert len(page_messages(PAGE)) == 3
+    # Mentions an indicator and the display, but explains no messages
+    assert page_messages(PROCEDURE_PAGE) == []
+    assert page_messages("Seat belts\n\"Fasten seat belt\" and \"Seat belt reminder\" are explained below.\n") == []
+
+
+def test_lookup_exact_and_inside_questions():
+    index = _index()
+    assert index.lookup("Braking power low, stop in a safe place")[0].message == "Braking Power Low Stop in a Safe Place"
+    hits = index.lookup('My dash says "ENGINE COOLANT TEMP HIGH" what do I do?')
+    assert [hit.message for hit in hits] == ["Engine Coolant Temp High"]
+    assert index.lookup("How do I check the tire pressure?") == []
+
+
+def test_direct_matches_need_most_of_the_question():
+    index = _index()
+    assert [hit.message for hit in index.direct_matches("What does the brake system warning light mean?")] == [
+        "Brake system warning light"
+    ]
+    question = "How do I bleed the brakes after the brake system warning light came on during a track day?"
+    assert index.lookup(question) and index.direct_matches(question) == []
+
+
+def test_lookup_prefers_longest_message():
+    index = WarningIndex()
+    index.add("Engine Coolant Temp", "quoted", 1)
+    index.add("Engine Coolant Temp High", "quoted", 2)
+    assert [hit.message for hit in index.lookup("why is engine coolant temp high showing")] == ["Engine Coolant Temp High"]
+
+
+def test_context_and_answer_formatting():
+    index = _index()
+    entry = index.lookup("braking power low stop in a safe place")[0]
+    assert entry.pages == [482]
+    assert "If “Braking Power Low Stop in a Safe Place” is displayed" in entry.context
+    assert entry.context.endswith(".") and "contact your Toyota dealer" in entry.context
+    answer = format_answer([entry])
+    assert answer.startswith('"Braking Power Low Stop in a Safe Place" (manual page 482): ')
+
+
+def test_round_trip_and_page_union(tmp_path):
+    index = _index()
+    index.add("Engine Coolant Temp High", "quoted", 300)
+    index.save(tmp_path / "warnings.json")
+    loaded = WarningIndex.load(tmp_path / "warnings.json")
+    assert len(loaded) == len(index)
+    assert loaded.entries[normalize_message("Engine Coolant Temp High")].pages == [300, 482]
+    assert len(WarningIndex.load(tmp_path / "missing.json")) == 0
+
+
+class FakeRetriever:
+    def __init__(self, docs):
+        self.docs = docs
+        self.queries = []
+
+    def invoke(self, query):
+        self.queries.append(query)
+        return self.docs
+
+
+def test_chain_does_not_short_circuit_procedural_headings(monkeypatch):
+    monkeypatch.setattr(rag_chain, "get_reranker", lambda: None)
+    monkeypatch.setattr(rag_chain, "USE_LLM", False)
+    index = WarningIndex()
+    for message, kind in page_messages(PAGE) + page_messages(PROCEDURE_PAGE):
+        index.add(message, kind, 482, message_context(PAGE, message))
+    # An index written before bold runs were dropped still carries the heading
+    index.add("Checking the engine oil", "bold", 300, "Checking the engine oil")
+    index = WarningIndex.from_json(index.to_json())
+    body = SimpleNamespace(page_content="Pull out the dipstick and wipe it clean. " * 3, metadata={"page_number": 300})
+    retriever = FakeRetriever([body])
+    chain = rag_chain.make_rag_chain(retriever, warnings=index)
+
+    answer = chain.invoke("Checking the engine oil")
+    assert retriever.queries and "dipstick" in answer.content
+
+    retriever.queries.clear()
+    answer = chain.invoke("Braking Power Low Stop in a Safe Place")
+    assert retriever.queries == [] and answer.content.startswith('"Braking Power Low Stop in a Safe Place"')
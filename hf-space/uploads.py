@@ -0,0 +1,364 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_CHUNK_SIZE = int(os.getenv("MANUAL_UPLOAD_CHUNK_KB", "1024")) * 1024
+MAX_UPLOAD_BYTES = int(float(os.getenv("MANUAL_MAX_UPLOAD_MB", "100")) * 1024 * 1024)
+
+UPLOAD_SESSION_TTL = float(os.getenv("MANUAL_UPLOAD_SESSION_TTL_HOURS", "24")) * 3600
+# Each live session reserves its declared size on disk, so their number is capped.
+MAX_UPLOAD_SESSIONS = int(os.getenv("MANUAL_MAX_UPLOAD_SESSIONS", "8"))
+
+PDF_MAGIC = b"%PDF-"
+# The PDF spec allows leading junk before the header; readers accept it within 1 KB.
+_MAGIC_WINDOW = 1024
+
+
+class UploadRejectedError(ValueError):
+    """Raised when an upload is refused; carries the HTTP status to report."""
+
+    def __init__(self, message: str, status_code: int = 400) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
+
+@dataclass
+class StoredUpload:
+    path: Path
+    size: int
+    sha256: str
+
+
+def is_pdf_header(head: bytes) -> bool:
+    return PDF_MAGIC in head[:_MAGIC_WINDOW]
+
+
+def _too_large(max_bytes: int) -> UploadRejectedError:
+    return UploadRejectedError(f"Uploaded file exceeds the {max_bytes // (1024 * 1024)} MB limit.", status_code=413)
+
+
+def _not_pdf() -> UploadRejectedError:
+    return UploadRejectedError("Uploaded file is not a PDF.", status_code=415)
+
+
+def partial_path(dest_path: Path) -> Path:
+    """Hidden temp path next to ``dest_path`` so the final rename stays on one filesystem."""
+    return dest_path.with_name(f".{dest_path.name}.{uuid4().hex[:8]}.part")
+
+
+async def stream_upload_to_path(
+    upload,
+    dest_path: Path,
+    *,
+    max_bytes: int = MAX_UPLOAD_BYTES,
+    chunk_size: int = UPLOAD_CHUNK_SIZE,
+    declared_size: Optional[int] = None,
+) -> StoredUpload:
+    """Copy an ``UploadFile`` to ``dest_path`` in fixed-size chunks.
+
+    The payload is hashed and size-checked as it streams, sniffed for the PDF
+    header before anything else is written, and only renamed into place once
+    complete, so a rejected or interrupted upload never leaves a partial file.
+    """
+    if declared_size is not None and declared_size > max_bytes:
+        raise _too_large(max_bytes)
+
+    dest_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = partial_path(dest_path)
+    digest = hashlib.sha256()
+    size = 0
+    head = b""
+    try:
+        with open(tmp_path, "wb") as handle:
+            while True:
+                chunk = await upload.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise _too_large(max_bytes)
+                if len(head) < _MAGIC_WINDOW:
+                    head += chunk[: _MAGIC_WINDOW - len(head)]
+                    if len(head) >= _MAGIC_WINDOW and not is_pdf_header(head):
+                        raise _not_pdf()
+                digest.update(chunk)
+                handle.write(chunk)
+        if size == 0:
+            raise UploadRejectedError("Uploaded file is empty.")
+        if not is_pdf_header(head):
+            raise _not_pdf()
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    logger.info("Stored upload %s (%s bytes, sha256=%s)", dest_path, size, digest.hexdigest()[:12])
+    return StoredUpload(path=dest_path, size=size, sha256=digest.hexdigest())
+
+
+_CONTENT_RANGE = re.compile(r"^bytes (\d+)-(\d+)/(\d+|\*)$")
+
+
+def parse_content_range(header: Optional[str]) -> Tuple[int, int, Optional[int]]:
+    """Parse ``bytes start-end/total`` into (start, end exclusive, total)."""
+    match = _CONTENT_RANGE.match((header or "").strip())
+    if not match:
+        raise UploadRejectedError("Content-Range header must look like 'bytes start-end/total'.")
+    start, last = int(match.group(1)), int(match.group(2))
+    total = None if match.group(3) == "*" else int(match.group(3))
+    if last < start:
+        raise UploadRejectedError("Content-Range end precedes its start.")
+    return start, last + 1, total
+
+
+def _merge_range(ranges: List[List[int]], start: int, end: int) -> List[List[int]]:
+    merged: List[List[int]] = []
+    for current in sorted([*ranges, [start, end]]):
+        if merged and current[0] <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], current[1])
+        else:
+            merged.append(list(current))
+    return merged
+
+
+@dataclass
+class UploadSession:
+    upload_id: str
+    filename: str
+    total_size: int
+    fields: Dict[str, object] = field(default_factory=dict)
+    received: List[List[int]] = field(default_factory=list)
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    # Set while the file is hashed and registered; no more ranges are accepted.
+    finalizing: bool = False
+
+    @property
+    def offset(self) -> int:
+        """Bytes received contiguously from the start of the file."""
+        if self.received and self.received[0][0] == 0:
+            return self.received[0][1]
+        return 0
+
+    @property
+    def complete(self) -> bool:
+        return self.received == [[0, self.total_size]]
+
+    def missing(self) -> List[List[int]]:
+        gaps: List[List[int]] = []
+        cursor = 0
+        for start, end in self.received:
+            if start > cursor:
+                gaps.append([cursor, start])
+            cursor = max(cursor, end)
+        if cursor < self.total_size:
+            gaps.append([cursor, self.total_size])
+        return gaps
+
+
+class ResumableUploadStore:
+    """Upload sessions whose byte ranges can arrive in any order and be retried.
+
+    Each session owns a data file preallocated to the declared size; chunks are
+    written straight to their offsets and the received ranges are persisted
+    next to it, so an interrupted client (or server) can resume where it left off.
+
+    :meth:`finalize` moves the file into place but keeps the session until
+    :meth:`close`; if registering the manual then fails, :meth:`rollback`
+    puts the file back so the client can retry without re-uploading.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        *,
+        max_bytes: int = MAX_UPLOAD_BYTES,
+        ttl: float = UPLOAD_SESSION_TTL,
+        max_sessions: int = MAX_UPLOAD_SESSIONS,
+    ) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+
+    def _meta_path(self, upload_id: str) -> Path:
+        return self.root / f"{upload_id}.json"
+
+    def _data_path(self, upload_id: str) -> Path:
+        return self.root / f"{upload_id}.part"
+
+    def _save(self, session: UploadSession) -> None:
+        session.updated_at = time.time()
+        meta_path = self._meta_path(session.upload_id)
+        tmp_path = meta_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(asdict(session)), encoding="utf-8")
+        os.replace(tmp_path, meta_path)
+
+    def get(self, upload_id: str) -> UploadSession:
+        if not re.fullmatch(r"[0-9a-f]{32}", upload_id or ""):
+            raise KeyError(upload_id)
+        meta_path = self._meta_path(upload_id)
+        try:
+            data = json.loads(meta_path.read_text(encoding="utf-8"))
+        except FileNotFoundError as exc:
+            raise KeyError(upload_id) from exc
+        return UploadSession(**data)
+
+    def create(self, filename: str, total_size: int, fields: Optional[Dict[str, object]] = None) -> UploadSession:
+        if total_size <= 0:
+            raise UploadRejectedError("Upload size must be positive.")
+        if total_size > self.max_bytes:
+            raise _too_large(self.max_bytes)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.purge_expired()
+
+        session = UploadSession(
+            upload_id=uuid4().hex,
+            filename=Path(filename or "manual.pdf").name,
+            total_size=total_size,
+            fields=dict(fields or {}),
+        )
+        with self._lock:
+            if self.max_sessions and sum(1 for _ in self.root.glob("*.json")) >= self.max_sessions:
+                raise UploadRejectedError("Too many uploads in progress; try again later.", status_code=429)
+            # Saving first counts the session against the cap before its space is reserved
+            self._save(session)
+        with open(self._data_path(session.upload_id), "wb") as handle:
+            try:
+                os.posix_fallocate(handle.fileno(), 0, total_size)
+            except (AttributeError, OSError):
+                handle.truncate(total_size)
+        logger.info("Upload %s: session created for %s (%s bytes)", session.upload_id, session.filename, total_size)
+        return session
+
+    async def write_range(self, upload_id: str, start: int, end: int, chunks: AsyncIterator[bytes]) -> UploadSession:
+        """Write the body of one ``Content-Range`` request at its offset."""
+        session = self.get(upload_id)
+        if session.finalizing:
+            raise UploadRejectedError("Upload is being finalized.", status_code=409)
+        if end > session.total_size:
+            raise UploadRejectedError("Content-Range extends past the declared upload size.", status_code=416)
+
+        written = 0
+        head = b""
+        interrupted: Optional[BaseException] = None
+        with open(self._data_path(upload_id), "r+b") as handle:
+            handle.seek(start)
+            try:
+                async for chunk in chunks:
+                    if not chunk:
+                        continue
+                    if start + written + len(chunk) > end:
+                        raise UploadRejectedError("Request body is longer than its Content-Range.")
+                    if start == 0 and len(head) < _MAGIC_WINDOW:
+                        head += chunk[: _MAGIC_WINDOW - len(head)]
+                        if len(head) >= min(_MAGIC_WINDOW, end) and not is_pdf_header(head):
+                            raise _not_pdf()
+                    handle.write(chunk)
+                    written += len(chunk)
+            except UploadRejectedError:
+                raise
+            except Exception as exc:
+                # Client went away mid-body: keep what arrived so it can resume from there.
+                logger.info("Upload %s: body interrupted after %s bytes: %s", upload_id, written, exc)
+                interrupted = exc
+
+        with self._lock:
+            session = self.get(upload_id)
+            if written:
+                session.received = _merge_range(session.received, start, start + written)
+            self._save(session)
+        if interrupted is not None:
+            raise interrupted
+        return session
+
+    def finalize(self, upload_id: str, dest_path: Path) -> Tuple[StoredUpload, UploadSession]:
+        """Hash the completed upload and move it to ``dest_path``; blocking, run it off the event loop.
+
+        The store lock is only held to check and flag the session and to move
+        the file, never while hashing, so other sessions keep accepting chunks.
+        """
+        with self._lock:
+            session = self.get(upload_id)
+            if session.finalizing:
+                raise UploadRejectedError("Upload is already being finalized.", status_code=409)
+            if not session.complete:
+                raise UploadRejectedError(
+                    f"Upload is incomplete: {session.offset} of {session.total_size} bytes received contiguously.",
+                    status_code=409,
+                )
+            session.finalizing = True
+            self._save(session)
+
+        data_path = self._data_path(upload_id)
+        try:
+            digest = hashlib.sha256()
+            with open(data_path, "rb") as handle:
+                head = handle.read(_MAGIC_WINDOW)
+                if not is_pdf_header(head):
+                    raise _not_pdf()
+                digest.update(head)
+                for chunk in iter(lambda: handle.read(UPLOAD_CHUNK_SIZE), b""):
+                    digest.update(chunk)
+            with self._lock:
+                dest_path.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(data_path, dest_path)
+        except BaseException:
+            self._unflag(upload_id)
+            raise
+        logger.info("Upload %s: finalized into %s", upload_id, dest_path)
+        return StoredUpload(path=dest_path, size=session.total_size, sha256=digest.hexdigest()), session
+
+    def rollback(self, upload_id: str, dest_path: Path) -> None:
+        """Undo :meth:`finalize` after a failed registration: the session can be finalized again."""
+        with self._lock:
+            if dest_path.exists():
+                os.replace(dest_path, self._data_path(upload_id))
+        self._unflag(upload_id)
+        logger.info("Upload %s: registration failed, session kept for retry", upload_id)
+
+    def close(self, upload_id: str) -> None:
+        """Forget a finalized session once its manual is registered."""
+        with self._lock:
+            self._meta_path(upload_id).unlink(missing_ok=True)
+
+    def _unflag(self, upload_id: str) -> None:
+        with self._lock:
+            try:
+                session = self.get(upload_id)
+            except KeyError:  # pragma: no cover - aborted meanwhile
+                return
+            session.finalizing = False
+            self._save(session)
+
+    def abort(self, upload_id: str) -> None:
+        self.get(upload_id)
+        with self._lock:
+            self._data_path(upload_id).unlink(missing_ok=True)
+            self._meta_path(upload_id).unlink(missing_ok=True)
+
+    def purge_expired(self) -> None:
+        cutoff = time.time() - self.ttl
+        for meta_path in self.root.glob("*.json"):
+            try:
+                if meta_path.stat().st_mtime >= cutoff:
+                    continue
+                upload_id = meta_path.stem
+                self._data_path(upload_id).unlink(missing_ok=True)
+                meta_path.unlink(missing_ok=True)
+                logger.info("Upload %s: expired session removed", upload_id)
+            except OSError:  # pragma: no cover - best effort cleanup
+                continue
@@ -21,21 +21,161 @@ os.environ["TRANSFORMERS_CACHE"] = str(_HF_CACHE)
 os.environ["SENTENCE_TRANSFORMERS_HOME"] = str(_HF_CACHE)
 os.environ["HUGGINGFACE_HUB_CACHE"] = str(_HF_CACHE)
 
+# Offline mode: only use models already in the cache, never contact the Hub
+if os.getenv("MANUALAI_OFFLINE", "false").lower() in ("true", "1", "yes"):
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+
 # NOW import HuggingFace libraries - they'll use our cache
 from functools import lru_cache
-from typing import List, Optional
+from typing import Callable, List, Optional, Sequence
+import logging
 import shutil
+import time
 
 from langchain_chroma import Chroma
 from sentence_transformers import SentenceTransformer
 
+from batching import MicroBatcher, encode_in_buckets
+from bulk_embedding import BULK_EMBED_ENABLED, BULK_EMBED_MIN_CHUNKS, encode_bulk
+from embedding_server import EMBEDDING_SOCKET, EmbeddingClient
+from inference_backend import load_sentence_transformer
+from resource_governor import governor
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL = os.getenv("MANUAL_EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+
+# Chunks per forward pass when embedding a manual during ingestion
+EMBED_BATCH_SIZE = int(os.getenv("MANUAL_EMBED_BATCH_SIZE", "32"))
+
+# Concurrent query embeddings are coalesced into one forward pass (max batch 1 disables)
+QUERY_BATCH_MAX = int(os.getenv("MANUAL_QUERY_BATCH_MAX", "32"))
+QUERY_BATCH_WAIT_MS = float(os.getenv("MANUAL_QUERY_BATCH_WAIT_MS", "4"))
+
+# Representative manual-sized text used to prime inference kernels during warm-up
+_WARMUP_TEXT = "Check the tire pressure when the tires are cold and adjust it to the value on the label. " * 4
+
 
 @lru_cache(maxsize=1)
-def _get_model(model_name: str = "all-MiniLM-L6-v2") -> SentenceTransformer:
+def _get_model(model_name: str = EMBEDDING_MODEL) -> SentenceTransformer:
     """Load a better embedding model for improved semantic understanding"""
     # Using a more powerful model for better semantic search
     # Options: "all-MiniLM-L6-v2" (fast), "all-mpnet-base-v2" (better quality)
-    return SentenceTransformer(model_name, cache_folder=str(_HF_CACHE))
+    # Backend (torch / onnx / onnx-int8) is chosen with MANUAL_INFERENCE_BACKEND
+    return load_sentence_transformer(model_name, cache_folder=str(_HF_CACHE))
+
+
+@lru_cache(maxsize=1)
+def _sidecar_client() -> EmbeddingClient:
+    logger.info("Using embedding sidecar at %s", EMBEDDING_SOCKET)
+    return EmbeddingClient(EMBEDDING_SOCKET)
+
+
+def _get_encoder(remote: bool = True):
+    """Object with an ``encode(texts, batch_size=...)`` method used for all embeddings.
+
+    With MANUAL_EMBEDDING_SOCKET set, encoding is forwarded to the shared sidecar
+    (see embedding_server.py) so worker processes don't each load the weights.
+    ``remote=False`` always returns the local model; the sidecar itself uses it.
+    """
+    if remote and EMBEDDING_SOCKET:
+        return _sidecar_client()
+    return _get_model()
+
+
+def _as_lists(vectors) -> List[List[float]]:
+    return vectors.tolist() if hasattr(vectors, "tolist") else vectors
+
+
+@lru_cache(maxsize=1)
+def _get_query_batcher() -> Optional[MicroBatcher]:
+    if QUERY_BATCH_MAX <= 1:
+        return None
+    encoder = _get_encoder()
+    return MicroBatcher(
+        lambda texts: _as_lists(encoder.encode(texts, batch_size=len(texts))),
+        max_batch=QUERY_BATCH_MAX,
+        max_wait_ms=QUERY_BATCH_WAIT_MS,
+        name="query-embedder",
+    )
+
+
+def embed_query(text: str) -> List[float]:
+    """Embed one query, batched together with any concurrent queries."""
+    batcher = _get_query_batcher()
+    if batcher is None:
+        return _as_lists(_get_encoder().encode([text]))[0]
+    return batcher(text)
+
+
+def _token_lengths(texts: Sequence[str]) -> List[int]:
+    """Token counts from the model's tokenizer, or character counts when it isn't local."""
+    tokenizer = getattr(_get_encoder(), "tokenizer", None)
+    if tokenizer is not None:
+        try:
+            return [len(ids) for ids in tokenizer(list(texts), add_special_tokens=False)["input_ids"]]
+        except Exception:  # pragma: no cover - fall back to characters
+            pass
+    return [len(text) for text in texts]
+
+
+def embed_documents(
+    texts: Sequence[str],
+    *,
+    batch_size: int = EMBED_BATCH_SIZE,
+    cancel_callback: Optional[Callable[[], bool]] = None,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+) -> List[List[float]]:
+    """Embed chunks in token-length buckets, checking ``cancel_callback`` between batches.
+
+    Raises EncodingCancelledError when cancelled.
+    """
+    if BULK_EMBED_ENABLED and not EMBEDDING_SOCKET and len(texts) >= BULK_EMBED_MIN_CHUNKS:
+        return encode_bulk(
+            _get_model(),
+            texts,
+            batch_size=batch_size,
+            cores=governor.ingestion_cores(),
+            length_fn=_token_lengths,
+            cancel_callback=cancel_callback,
+            progress_callback=progress_callback,
+        )
+    encoder = _get_encoder()
+
+    def encode(batch: List[str]) -> List[List[float]]:
+        # Shrinks torch's pool while chat requests are active, grows it back once they stop
+        governor.refresh()
+        return _as_lists(encoder.encode(batch, batch_size=len(batch)))
+
+    return encode_in_buckets(
+        encode,
+        list(texts),
+        batch_size=batch_size,
+        length_fn=_token_lengths,
+        cancel_callback=cancel_callback,
+        progress_callback=progress_callback,
+    )
+
+
+def warm_up(batch_sizes: Sequence[int] = (1, 8, 32), *, remote: bool = True) -> float:
+    """Load the embedding model and run dummy batches so first requests skip load and JIT costs.
+
+    ``remote`` is passed to :func:`_get_encoder`. Returns the seconds spent.
+    """
+    started = time.perf_counter()
+    model = _get_encoder(remote=remote)
+    loaded = time.perf_counter()
+    for size in batch_sizes:
+        model.encode([_WARMUP_TEXT] * size, batch_size=size)
+    finished = time.perf_counter()
+    logger.info(
+        "Embedding model warm: load %.2fs, dummy batches %s in %.2fs",
+        loaded - started,
+        list(batch_sizes),
+        finished - loaded,
+    )
+    return finished - started
 
 
 def build_vector_store(
@@ -44,15 +184,15 @@ def build_vector_store(
     persist_directory: Optional[str] = None,
     collection_name: str = "default",
     recreate: bool = False,
+    cancel_callback: Optional[Callable[[], bool]] = None,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
 ):
-    base = _get_model()
-
     class Embedder:
         def embed_documents(self, texts: List[str]):
-            return base.encode(texts).tolist()
+            return embed_documents(texts, cancel_callback=cancel_callback, progress_callback=progress_callback)
 
         def embed_query(self, text: str):
-            return base.encode([text])[0].tolist()
+            return embed_query(text)
 
     embeddings = Embedder()
     if persist_directory:
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import json
+import logging
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+WARNINGS_FILE = "warnings.json"
+
+# Quoted dashboard messages: “Braking Power Low Stop in a Safe Place”, "Engine Coolant Temp High"
+_QUOTED = re.compile(r"[“\"]([A-Z][^“”\"\n]{3,80}?)[”\"]")
+# Indicator names as they head their explanation: "Brake system warning light", "Slip indicator"
+_INDICATOR = re.compile(r"^([A-Za-z][A-Za-z0-9 /()-]{2,60}?\s(?:warning light|indicator light|indicator))\b", re.IGNORECASE)
+
+# Pages that actually explain dashboard messages or indicators; a passing "see the display" is not enough
+_WARNING_PAGE = re.compile(
+    r"\b(?:warning|indicator) lights?\b|\bwarning messages?\b|\b(?:multi-)?information display\b", re.IGNORECASE
+)
+# ... and list more than one of them
+_MIN_PAGE_MESSAGES = 2
+
+_KINDS = ("quoted", "indicator")
+_MIN_WORDS = 2
+_MAX_WORDS = 12
+_TERMINAL = "$"
+# Question words that say nothing about which message is meant
+_FILLER = {
+    "a", "about", "an", "and", "appeared", "appears", "came", "car", "come", "dash", "dashboard", "display",
+    "displayed", "do", "does", "i", "in", "is", "it", "light", "lit", "mean", "meaning", "means", "message",
+    "my", "on", "says", "see", "showing", "shows", "the", "this", "truck", "up", "vehicle", "what", "when", "why",
+}
+
+
+def normalize_message(text: str) -> str:
+    return " ".join(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+@dataclass
+class WarningEntry:
+    message: str
+    kind: str
+    pages: List[int] = field(default_factory=list)
+    context: str = ""
+
+
+def _plausible(text: str) -> bool:
+    words = normalize_message(text).split()
+    if not _MIN_WORDS <= len(words) <= _MAX_WORDS:
+        return False
+    letters = sum(ch.isalpha() for ch in text)
+    return letters >= 0.6 * len(text.replace(" ", "")) and not text.rstrip().endswith((".", ":", ","))
+
+
+def extract_messages(lines: Sequence[str]) -> List[Tuple[str, str]]:
+    """``(message, kind)`` candidates on one page: quoted strings and indicator names.
+
+    Bold text is deliberately not used: it marks procedural headings
+    ("Checking the engine oil") as often as messages.
+    """
+    found: Dict[str, Tuple[str, str]] = {}
+    for line in lines:
+        for match in _QUOTED.finditer(line):
+            found.setdefault(normalize_message(match.group(1)), (match.group(1).strip(), "quoted"))
+        match = _INDICATOR.match(line.strip())
+        if match:
+            found.setdefault(normalize_message(match.group(1)), (match.group(1).strip(), "indicator"))
+    return [(message, kind) for key, (message, kind) in found.items() if key and _plausible(message)]
+
+
+def page_messages(text: str) -> List[Tuple[str, str]]:
+    """Messages of a page that explains warning lights or display messages; nothing for other pages."""
+    if not _WARNING_PAGE.search(text):
+        return []
+    found = extract_messages(text.splitlines())
+    return found if len(found) >= _MIN_PAGE_MESSAGES else []
+
+
+class WarningIndex:
+    """Dashboard messages and indicator names of one manual.
+
+    A hash map from normalised message to entry answers exact questions; a
+    word trie finds any known message inside a longer question in one scan
+    of the question's words. Either way lookups take microseconds, so the
+    chat chain checks this index before dense retrieval; only
+    :meth:`direct_matches` are answered without it.
+    """
+
+    def __init__(self) -> None:
+        self.entries: Dict[str, WarningEntry] = {}
+        self._trie: Dict[str, dict] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, message: str, kind: str, page: Optional[int] = None, context: str = "") -> None:
+        key = normalize_message(message)
+        if not key:
+            return
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = self.entries[key] = WarningEntry(message, kind, [], context)
+            node = self._trie
+            for word in key.split():
+                node = node.setdefault(word, {})
+            node[_TERMINAL] = key
+        if page is not None and page not in entry.pages:
+            entry.pages.append(page)
+            entry.pages.sort()
+        if context and not entry.context:
+            entry.context = context
+
+    def lookup(self, question: str) -> List[WarningEntry]:
+        """Known messages contained in ``question``, longest first (overlaps resolved left to right)."""
+        words = normalize_message(question).split()
+        exact = self.entries.get(" ".join(words))
+        if exact is not None:
+            return [exact]
+        matches: List[WarningEntry] = []
+        start = 0
+        while start < len(words):
+            node, longest, end = self._trie, None, start
+            for index in range(start, len(words)):
+                node = node.get(words[index])
+                if node is None:
+                    break
+                if _TERMINAL in node:
+                    longest, end = node[_TERMINAL], index + 1
+            if longest is None:
+                start += 1
+                continue
+            matches.append(self.entries[longest])
+            start = end
+        return sorted(matches, key=lambda entry: -len(entry.message))
+
+    def direct_matches(self, question: str, min_coverage: float = 0.75) -> List[WarningEntry]:
+        """:meth:`lookup` hits, but only when they make up most of the question.
+
+        "What does Engine Coolant Temp High mean?" qualifies; a longer question
+        that merely contains a message asks for more than its explanation.
+        """
+        matches = self.lookup(question)
+        if not matches:
+            return []
+        matched = {word for entry in matches for word in normalize_message(entry.message).split()}
+        words = [word for word in normalize_message(question).split() if word not in _FILLER or word in matched]
+        covered = sum(1 for word in words if word in matched)
+        return matches if covered >= min_coverage * len(words) else []
+
+    def to_json(self) -> str:
+        rows = [[e.message, e.kind, e.pages, e.context] for e in self.entries.values()]
+        return json.dumps({"version": 1, "messages": rows}, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, payload: str) -> "WarningIndex":
+        index = cls()
+        for message, kind, pages, context in json.loads(payload).get("messages", []):
+            if kind not in _KINDS:  # bold runs written by older versions
+                continue
+            for page in pages or [None]:
+                index.add(message, kind, page, context)
+        return index
+
+    def save(self, path: Path) -> None:
+        Path(path).write_text(self.to_json(), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: Path) -> "WarningIndex":
+        path = Path(path)
+        if not path.exists():
+            return cls()
+        try:
+            return cls.from_json(path.read_text(encoding="utf-8"))
+        except Exception as exc:  # pragma: no cover - defensive
+            logger.warning("Unable to read warning index %s: %s", path, exc)
+            return cls()
+
+
+def message_context(page_text: str, message: str, limit: int = 400) -> str:
+    """The sentence mentioning ``message`` on its page and what follows, cut at a sentence end within ``limit``."""
+    flat = " ".join(page_text.split())
+    needle = " ".join(message.split())
+    position = flat.lower().find(needle.lower())
+    if position == -1:
+        return ""
+    start = flat.rfind(". ", max(0, position - 200), position)
+    start = start + 2 if start != -1 else max(0, position - 200)
+    snippet = flat[start:start + limit]
+    cut = snippet.rfind(". ")
+    minimum = position - start + len(needle)
+    if cut >= minimum:
+        return snippet[:cut + 1]
+    return snippet.strip() if len(snippet) > minimum else ""
+
+
+def format_answer(entries: Iterable[WarningEntry]) -> str:
+    parts = []
+    for entry in entries:
+        pages = ", ".join(str(page) for page in entry.pages)
+        header = f"\"{entry.message}\"" + (f" (manual page {pages})" if pages else "")
+        parts.append(f"{header}: {entry.context}" if entry.context else f"{header} is covered in the manual.")
+    return "\n\n".join(parts)
@@ -0,0 +1,71 @@
+"""
+Test script for the resumable upload API.
+Sends the manual in fixed-size ranges and resumes from the server-reported
+offset after any failed request, instead of restarting the whole upload.
+"""
+
+import os
+import time
+import requests
+from pathlib import Path
+
+# Configuration
+API_BASE_URL = os.getenv("API_URL", "https://agapemiteu-manualai.hf.space")
+PDF_PATH = Path(__file__).parent / "data" / "2023-Toyota-4runner-Manual.pdf"
+CHUNK_SIZE = 4 * 1024 * 1024
+MAX_RETRIES = 5
+
+def main():
+    print("=" * 60)
+    print("🧪 Testing Resumable Upload")
+    print("=" * 60)
+
+    if not PDF_PATH.exists():
+        print(f"❌ Error: File not found at {PDF_PATH}")
+        return
+
+    total = PDF_PATH.stat().st_size
+    response = requests.post(
+        f"{API_BASE_URL}/api/uploads",
+        json={"filename": PDF_PATH.name, "size": total, "brand": "Toyota", "model": "4Runner", "year": "2023"},
+        timeout=30,
+    )
+    if response.status_code != 201:
+        print(f"❌ Could not create upload session: {response.status_code} {response.text}")
+        return
+    upload_id = response.json()["upload_id"]
+    print(f"📤 Session {upload_id} for {total / (1024 * 1024):.2f} MB")
+
+    offset = 0
+    retries = 0
+    with open(PDF_PATH, "rb") as f:
+        while offset < total:
+            f.seek(offset)
+            chunk = f.read(CHUNK_SIZE)
+            headers = {"Content-Range": f"bytes {offset}-{offset + len(chunk) - 1}/{total}"}
+            try:
+                response = requests.put(f"{API_BASE_URL}/api/uploads/{upload_id}", data=chunk, headers=headers, timeout=120)
+                response.raise_for_status()
+                retries = 0
+            except requests.exceptions.RequestException as e:
+                retries += 1
+                if retries > MAX_RETRIES:
+                    print(f"❌ Giving up after {MAX_RETRIES} retries: {e}")
+                    return
+                print(f"   ⚠️  Chunk failed ({e}); resuming from server offset")
+                time.sleep(2 * retries)
+                response = requests.get(f"{API_BASE_URL}/api/uploads/{upload_id}", timeout=30)
+            offset = response.json()["offset"]
+            print(f"   {offset / total:.0%} uploaded")
+
+    response = requests.post(f"{API_BASE_URL}/api/uploads/{upload_id}/finalize", timeout=60)
+    if response.status_code != 202:
+        print(f"❌ Finalize failed: {response.status_code} {response.text}")
+        return
+    data = response.json()
+    print("✅ Upload finalized!")
+    print(f"   Manual ID: {data.get('manual_id')}")
+    print(f"   Status: {data.get('status')} (queue position {data.get('queue_position')})")
+
+if __name__ == "__main__":
+    main()